@@ -0,0 +1,92 @@
+"""Process-wide event loop that runs the async agent path for sync callers.
+
+Firebase Functions serves requests on Flask worker threads, and an SSE
+response is a plain generator Flask iterates. The async agent path
+(`graph.astream`, native-coroutine tools, async Azure and Firestore clients)
+runs on one long-lived event loop in a daemon thread instead: each request's
+async generator is scheduled there and its items are handed back through a
+queue. Concurrent chats then share the loop rather than holding a thread for
+every blocking call, parallel tool calls really overlap, and async clients
+stay bound to the one loop they were created on.
+"""
+
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+from utils.logging_setup import setup_logging
+
+
+logger = setup_logging()
+
+# Queue marker for the end of an async generator.
+_END = object()
+
+
+class AgentEventLoop:
+    """Singleton-patterned event loop running in a daemon thread."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="agent-event-loop", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def shared(cls) -> "AgentEventLoop":
+        """Return the process-wide loop, starting it on first use."""
+        instance = cls._instance
+        if instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+                    logger.info("Started agent event loop")
+                instance = cls._instance
+        return instance
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the loop and wait (up to `timeout` seconds) for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def iterate(self, agen: AsyncIterator[Any]) -> Iterator[Any]:
+        """Iterate the async generator `agen` on the loop from a sync caller.
+
+        Items are yielded as the loop produces them, and an exception raised by
+        `agen` is re-raised here. Closing the returned generator early (e.g. the
+        SSE client went away) cancels `agen` on the loop.
+        """
+        items: queue.Queue = queue.Queue()
+
+        async def pump() -> None:
+            try:
+                async for item in agen:
+                    items.put((item, None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                items.put((_END, exc))
+                return
+            finally:
+                await agen.aclose()
+            items.put((_END, None))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                item, error = items.get()
+                if item is _END:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            if not future.done():
+                future.cancel()
+
+
+def get_agent_loop() -> AgentEventLoop:
+    """Return the process-wide agent event loop."""
+    return AgentEventLoop.shared()
@@ -1,17 +1,35 @@
-from typing import Any, Iterator
+import os
+from typing import Any, AsyncIterator, Iterator
 
 from integrations import FirebaseManager
 from langchain_core.messages import HumanMessage
 
+from .async_bridge import get_agent_loop
 from .event_type import AgentStreamEventType
-from .router import RouterAgentGraph
+from .router import get_router_graph
 from .tracing import load_langfuse_client_and_handler
 
 
+# "false" runs the graph synchronously (`graph.stream`) on the request thread
+# instead of with `graph.astream` on the shared agent event loop.
+AGENT_ASYNC_STREAM = os.getenv("AGENT_ASYNC_STREAM", "true").lower() != "false"
+
+
 def restore_messages_state(graph: Any, thread_id: str) -> dict[str, Any]:
     """Restore persisted messages for the thread."""
 
     snapshot = graph.get_state(config={"configurable": {"thread_id": thread_id}})
+    return _messages_state(snapshot)
+
+
+async def arestore_messages_state(graph: Any, thread_id: str) -> dict[str, Any]:
+    """Async `restore_messages_state`."""
+
+    snapshot = await graph.aget_state(config={"configurable": {"thread_id": thread_id}})
+    return _messages_state(snapshot)
+
+
+def _messages_state(snapshot: Any) -> dict[str, Any]:
     values = getattr(snapshot, "values", {}) if snapshot is not None else {}
     values = values if isinstance(values, dict) else {}
 
@@ -50,45 +68,72 @@ def process_streaming_chunk(chunk: dict) -> dict:
     return {}
 
 
+def _chunk_event(chunk: Any) -> dict | None:
+    """The event to yield for one graph stream chunk, or None to skip it."""
+    # Process message chunks into text events
+    if isinstance(chunk, dict) and chunk.get("type") == "messages":
+        return process_streaming_chunk(chunk) or None
+
+    # Yield custom chunks raw for handler parsing
+    if isinstance(chunk, dict) and chunk.get("type") == "custom":
+        return chunk.get("data", {})
+    return None
+
+
+def _stream_config(session_id: str) -> dict[str, Any]:
+    _, langfuse_handler = load_langfuse_client_and_handler()
+    return {
+        "callbacks": [langfuse_handler] if langfuse_handler else [],
+        "configurable": {"thread_id": session_id},
+    }
+
+
+async def astream_chat_events(graph: Any, input_text: str, session_id: str) -> AsyncIterator[dict[str, Any]]:
+    """Async generator that streams events from `graph.astream`, shaped as in `stream_chat_events`."""
+    state = await arestore_messages_state(graph, session_id)
+    state["messages"].append(HumanMessage(content=input_text))
+
+    async for chunk in graph.astream(
+        state, config=_stream_config(session_id), stream_mode=["messages", "custom"], version="v2"
+    ):
+        event = _chunk_event(chunk)
+        if event is not None:
+            yield event
+
+    yield {"type": AgentStreamEventType.DONE, "data": {}}
+
+
 def stream_chat_events(input_text: str, session_id: str) -> Iterator[dict[str, Any]]:
     """Sync generator that streams events from the graph.
 
     Yields dicts shaped like: {"type": "text", "data": {...}} or {"type": "custom", "data": ...}
+
+    With AGENT_ASYNC_STREAM the graph runs on the shared agent event loop
+    (see async_bridge) and this generator only relays its events.
     """
-    firebase_manager = FirebaseManager()
-    main_agent_graph = RouterAgentGraph(firestore_client=firebase_manager.firestore_client)
-    graph = main_agent_graph.graph
+    # Shared across requests: compiled once per process, with a persistent node cache.
+    graph = get_router_graph(FirebaseManager()).graph
 
-    _, langfuse_handler = load_langfuse_client_and_handler()
+    if AGENT_ASYNC_STREAM:
+        yield from get_agent_loop().iterate(astream_chat_events(graph, input_text, session_id))
+        return
 
     demo_state = restore_messages_state(graph, session_id)
     demo_state["messages"].append(HumanMessage(content=input_text))
 
     for chunk in graph.stream(
         demo_state,
-        config={
-            "callbacks": [langfuse_handler] if langfuse_handler else [],
-            "configurable": {"thread_id": session_id},
-        },
+        config=_stream_config(session_id),
         stream_mode=["messages", "custom"],
         version="v2",
     ):
-        # Process message chunks into text events
-        if isinstance(chunk, dict) and chunk.get("type") == "messages":
-            result = process_streaming_chunk(chunk)
-            if result:
-                yield result
-            continue
-
-        # Yield custom chunks raw for handler parsing
-        if isinstance(chunk, dict) and chunk.get("type") == "custom":
-            yield chunk.get("data", {})
-            continue
+        event = _chunk_event(chunk)
+        if event is not None:
+            yield event
 
     # final state fetch (optional) - yield a DONE marker
     yield {"type": AgentStreamEventType.DONE, "data": {}}
 
-
 test = (
     "Do you know any schemes for hawkers in Singapore?"
     "If so, can you find me some that are still open for application?"
@@ -2,15 +2,31 @@
 Referenced https://github.com/skamalj/langgraph_checkpoint_firestore/tree/main
 
 Supports both sync and async LangGraph checkpoint APIs.
+
+Checkpoints are stored incrementally. The graph checkpoints at every
+superstep, and the append-only channels (the messages and the history
+mirrors) only grow, so most checkpoint documents are deltas: the entries
+appended since their parent, plus the small remaining channels. Every
+CHECKPOINT_SNAPSHOT_INTERVAL deltas (and whenever the parent is not the one
+this instance last wrote or read) a full snapshot is written instead. A delta
+names its snapshot and the deltas between them (`chain`), so reading it is
+one batched `get_all`, and each write stays proportional to the step rather
+than to the conversation. The root document names the latest checkpoint along
+with its snapshot and chain, so reading the latest state is the root read plus
+one `get_all`, and reads take no lock shared between threads.
 """
 
 import asyncio
 import base64
 import json
+import os
 import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, List, Optional, Tuple
 
+from integrations import FirebaseManager
 from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
@@ -22,11 +38,19 @@ from langgraph.checkpoint.base import (
     CheckpointTuple,
     PendingWrite,
 )
+from search.session_results import compact_results, hydrate_scheme_ids, is_compact
 from utils.logging_setup import setup_logging
 
 
 logger = setup_logging()
 
+# Channels that only ever grow; delta checkpoints store just their new entries.
+APPEND_ONLY_CHANNELS = ("messages", "search_history", "tool_history", "schemes_history")
+# Delta checkpoints written on top of a snapshot before the next full snapshot.
+CHECKPOINT_SNAPSHOT_INTERVAL = int(os.getenv("CHAT_CHECKPOINT_SNAPSHOT_INTERVAL", "20"))
+# Threads whose latest checkpoint an instance remembers, to write deltas against.
+CHECKPOINT_HEADS_MAXSIZE = 1024
+
 
 class FirestoreSerializer:
     def __init__(self, serde):
@@ -99,17 +123,113 @@ class FirestoreSerializer:
             return serialized_obj
 
 
+@dataclass(frozen=True)
+class CheckpointHead:
+    """What the next delta needs to know about the checkpoint it extends."""
+
+    checkpoint_id: str
+    snapshot_id: str
+    # Delta checkpoint IDs after the snapshot, oldest first (ends with checkpoint_id for a delta).
+    chain: tuple
+    # Entries in each append-only channel, and the ID of the last one (None if it has none).
+    counts: dict
+    last_ids: dict
+
+
+def _append_only_lists(channel_values: Any) -> dict:
+    if not isinstance(channel_values, dict):
+        return {}
+    return {
+        channel: channel_values[channel]
+        for channel in APPEND_ONLY_CHANNELS
+        if isinstance(channel_values.get(channel), list)
+    }
+
+
+def _head(checkpoint_id: str, snapshot_id: str, chain: tuple, lists: dict) -> CheckpointHead:
+    return CheckpointHead(
+        checkpoint_id=checkpoint_id,
+        snapshot_id=snapshot_id,
+        chain=chain,
+        counts={channel: len(entries) for channel, entries in lists.items()},
+        last_ids={
+            channel: getattr(entries[-1], "id", None) if entries else None for channel, entries in lists.items()
+        },
+    )
+
+
+def _appended_entries(head: Optional[CheckpointHead], parent_checkpoint_id: str, lists: dict) -> Optional[dict]:
+    """New entries per append-only channel since `head`, or None when a full snapshot is needed."""
+    if head is None or head.checkpoint_id != parent_checkpoint_id or len(head.chain) >= CHECKPOINT_SNAPSHOT_INTERVAL:
+        return None
+    if set(head.counts) - set(lists):
+        return None
+    appended = {}
+    for channel, entries in lists.items():
+        count = head.counts.get(channel, 0)
+        # A shorter list, or a different entry where the parent's list ended, means it was rewritten.
+        if len(entries) < count or (count and getattr(entries[count - 1], "id", None) != head.last_ids.get(channel)):
+            return None
+        if len(entries) > count:
+            appended[channel] = entries[count:]
+    return appended
+
+
+def _firestore_messages(messages_source: Any) -> list:
+    """Plain role/content mirror of LangChain messages."""
+    firestore_messages = []
+    for msg in messages_source or []:
+        if hasattr(msg, "type") and hasattr(msg, "content"):
+            if msg.type == "human":
+                firestore_messages.append({"role": "user", "content": msg.content})
+            elif msg.type == "ai":
+                payload = {"role": "assistant", "content": msg.content}
+                tool_calls = getattr(msg, "tool_calls", None)
+                if isinstance(tool_calls, list) and tool_calls:
+                    payload["tool_calls"] = tool_calls
+                firestore_messages.append(payload)
+            elif msg.type == "tool":
+                firestore_messages.append(
+                    {
+                        "role": "tool",
+                        "content": msg.content,
+                        "name": getattr(msg, "name", None),
+                        "tool_call_id": getattr(msg, "tool_call_id", None),
+                    }
+                )
+        else:
+            firestore_messages.append(str(msg))
+    return firestore_messages
+
+
+def _compact_schemes_history(schemes_history: Any) -> list:
+    # The mirror keeps scheme IDs and scores only (see search.session_results);
+    # the full scheme dicts are already in channel_values.
+    if not isinstance(schemes_history, list):
+        return []
+    return [compact_results(turn if isinstance(turn, list) else []) for turn in schemes_history]
+
+
+def _concatenated_mirrors(sources: list) -> dict:
+    """Plain mirrors of a snapshot followed by its deltas' appended entries, for `_channel_values_from_mirrors`."""
+    return {
+        key: [entry for source in sources if isinstance(source.get(key), list) for entry in source[key]]
+        for key in ("messages", "search_history", "tool_history", "schemes_history")
+    }
+
+
 class FirestoreChatSaver(BaseCheckpointSaver):
     """Firestore-based checkpoint saver that maintains compatibility with existing chat history."""
 
-    _lock = threading.Lock()
-
     def __init__(self, client, checkpoints_collection: str = "chatHistory", writes_collection: str = "chatWrites"):
         super().__init__()
         self.client = client
         self.serializer = FirestoreSerializer(self.serde)
         self.checkpoints_collection = checkpoints_collection
         self.writes_collection = writes_collection
+        # Latest checkpoint per thread this instance wrote or read, LRU-bounded.
+        self._heads: OrderedDict = OrderedDict()
+        self._heads_lock = threading.Lock()
 
     def get_session_history(self, session_id: str) -> ChatMessageHistory:
         """
@@ -175,100 +295,123 @@ class FirestoreChatSaver(BaseCheckpointSaver):
 
     def _initialize_session(self, session_id: str) -> None:
         """Initialize a new session in Firestore."""
-        with self.__class__._lock:
-            try:
-                ref = self.client.collection(self.checkpoints_collection).document(session_id)
-                current_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-                ref.set(
-                    {
-                        "v": 4,
-                        "messages": [],
-                        "last_updated": current_timestamp + " UTC",
-                        "checkpoint_id": "initial",
-                        "parent_checkpoint_id": "",
-                        "metadata": {},
-                    }
-                )
-            except Exception as e:
-                logger.exception("Error initializing chat session in Firestore", e)
+        try:
+            ref = self.client.collection(self.checkpoints_collection).document(session_id)
+            current_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            ref.set(
+                {
+                    "v": 4,
+                    "messages": [],
+                    "last_updated": current_timestamp + " UTC",
+                    "checkpoint_id": "initial",
+                    "parent_checkpoint_id": "",
+                    "metadata": {},
+                }
+            )
+        except Exception as e:
+            logger.exception("Error initializing chat session in Firestore", e)
 
-    def put(
-        self,
-        config: RunnableConfig,
-        checkpoint: Checkpoint,
-        metadata: CheckpointMetadata,
-        new_versions: ChannelVersions,
-    ) -> RunnableConfig:
-        """Save a checkpoint to a subcollection to avoid hitting the 1MB document limit."""
-        thread_id = config["configurable"]["thread_id"]
-        checkpoint_ns = config["configurable"].get("checkpoint_ns", "chat")
-        checkpoint_id = checkpoint["id"]
-        parent_checkpoint_id = config["configurable"].get("checkpoint_id", "")
+    def _remembered_head(self, thread_id: str) -> Optional[CheckpointHead]:
+        with self._heads_lock:
+            return self._heads.get(thread_id)
 
-        channel_values = checkpoint.get("channel_values", {}) if isinstance(checkpoint, dict) else {}
-        firestore_messages = []
-        messages_source = None
+    def _remember_head(self, thread_id: str, head: CheckpointHead) -> None:
+        with self._heads_lock:
+            self._heads[thread_id] = head
+            self._heads.move_to_end(thread_id)
+            while len(self._heads) > CHECKPOINT_HEADS_MAXSIZE:
+                self._heads.popitem(last=False)
 
+    def _checkpoints(self, thread_id: str):
+        return self.client.collection(self.checkpoints_collection).document(thread_id).collection("checkpoints")
+
+    def _snapshot_data(self, checkpoint: Checkpoint, channel_values: Any) -> dict:
+        messages_source = None
         if isinstance(checkpoint, dict):
             if "channel_values" in checkpoint and "messages" in checkpoint["channel_values"]:
                 messages_source = checkpoint["channel_values"]["messages"]
             elif "messages" in checkpoint:
                 messages_source = checkpoint["messages"]
 
-        if messages_source:
-            for msg in messages_source:
-                if hasattr(msg, "type") and hasattr(msg, "content"):
-                    if msg.type == "human":
-                        firestore_messages.append({"role": "user", "content": msg.content})
-                    elif msg.type == "ai":
-                        payload = {"role": "assistant", "content": msg.content}
-                        tool_calls = getattr(msg, "tool_calls", None)
-                        if isinstance(tool_calls, list) and tool_calls:
-                            payload["tool_calls"] = tool_calls
-                        firestore_messages.append(payload)
-                    elif msg.type == "tool":
-                        firestore_messages.append(
-                            {
-                                "role": "tool",
-                                "content": msg.content,
-                                "name": getattr(msg, "name", None),
-                                "tool_call_id": getattr(msg, "tool_call_id", None),
-                            }
-                        )
-                else:
-                    firestore_messages.append(str(msg))
-
         # --- OPTIMIZATION: Extract mirrors, but keep payload lightweight if needed ---
         search_history = channel_values.get("search_history", []) if isinstance(channel_values, dict) else []
         tool_history = channel_values.get("tool_history", []) if isinstance(channel_values, dict) else []
         schemes_history = channel_values.get("schemes_history", []) if isinstance(channel_values, dict) else []
 
-        schemes_history_docs = []
-        if isinstance(schemes_history, list):
-            for turn in schemes_history:
-                if isinstance(turn, list):
-                    schemes_history_docs.append({"schemes": [s for s in turn if isinstance(s, dict)]})
-                else:
-                    schemes_history_docs.append({"schemes": []})
-
-        data = {
-            "v": checkpoint.get("v", 4),
-            "messages": firestore_messages,
+        return {
+            "format": "snapshot",
+            "messages": _firestore_messages(messages_source),
             # Serialized full state (This is the heavy hitter)
             "channel_values": self.serializer.dumps(channel_values),
             # If UI mirrors are making you exceed 1MB *per turn*, consider omitting them,
             # or trust the new subcollection architecture to give them breathing room.
             "search_history": search_history if isinstance(search_history, list) else [],
             "tool_history": tool_history if isinstance(tool_history, list) else [],
-            "schemes_history": schemes_history_docs,
+            "schemes_history": _compact_schemes_history(schemes_history),
             "schemes_history_count": len(schemes_history) if isinstance(schemes_history, list) else 0,
-            "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
-            "checkpoint_id": checkpoint_id,
-            "parent_checkpoint_id": parent_checkpoint_id,
-            "metadata": self.serializer.dumps(metadata),
-            "versions": self.serializer.dumps(new_versions),
+            "snapshot_id": checkpoint["id"],
+            "chain": [],
+        }
+
+    def _delta_data(self, head: CheckpointHead, channel_values: dict, lists: dict, appended: dict) -> dict:
+        return {
+            "format": "delta",
+            # Mirrors hold only this step's new entries.
+            "messages": _firestore_messages(appended.get("messages")),
+            "search_history": appended.get("search_history", []),
+            "tool_history": appended.get("tool_history", []),
+            "schemes_history": _compact_schemes_history(appended.get("schemes_history", [])),
+            "schemes_history_count": len(lists.get("schemes_history", [])),
+            # The small non-append channels are stored whole.
+            "channel_values": self.serializer.dumps(
+                {key: value for key, value in channel_values.items() if key not in lists}
+            ),
+            "appended": self.serializer.dumps(appended),
+            "base_counts": {channel: head.counts.get(channel, 0) for channel in appended},
+            "snapshot_id": head.snapshot_id,
+            "chain": list(head.chain),
         }
 
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint to a subcollection to avoid hitting the 1MB document limit.
+
+        Written as a delta on top of the parent checkpoint when this instance
+        knows it, otherwise (and every CHECKPOINT_SNAPSHOT_INTERVAL deltas) as
+        a full snapshot.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "chat")
+        checkpoint_id = checkpoint["id"]
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id", "")
+
+        channel_values = checkpoint.get("channel_values", {}) if isinstance(checkpoint, dict) else {}
+        lists = _append_only_lists(channel_values)
+        head = self._remembered_head(thread_id)
+        appended = _appended_entries(head, parent_checkpoint_id, lists)
+        if appended is None:
+            data = self._snapshot_data(checkpoint, channel_values)
+            new_head = _head(checkpoint_id, checkpoint_id, (), lists)
+        else:
+            data = self._delta_data(head, channel_values, lists, appended)
+            new_head = _head(checkpoint_id, head.snapshot_id, head.chain + (checkpoint_id,), lists)
+
+        data.update(
+            {
+                "v": checkpoint.get("v", 4),
+                "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+                "checkpoint_id": checkpoint_id,
+                "parent_checkpoint_id": parent_checkpoint_id,
+                "metadata": self.serializer.dumps(metadata),
+                "versions": self.serializer.dumps(new_versions),
+            }
+        )
+
         # Store additional checkpoint fields
         for key, value in checkpoint.items():
             if key not in ["id", "ts", "channel_values", "channel_versions", "versions_seen", "v"]:
@@ -283,138 +426,198 @@ class FirestoreChatSaver(BaseCheckpointSaver):
 
         # --- OPTIMIZATION: Save as a unique document inside a subcollection ---
         # Path: chatHistory/{thread_id}/checkpoints/{checkpoint_id}
-        ref = (
-            self.client.collection(self.checkpoints_collection)
-            .document(thread_id)
-            .collection("checkpoints")
-            .document(checkpoint_id)
-        )
-        ref.set(data)
+        self._checkpoints(thread_id).document(checkpoint_id).set(data)
 
-        # Also update a lightweight pointer on the root document for "latest" status
+        # Also update a lightweight pointer on the root document for "latest" status. It names the
+        # checkpoint's snapshot and chain too, so reading the latest state is one batched read after it.
         root_ref = self.client.collection(self.checkpoints_collection).document(thread_id)
-        root_ref.set({"latest_checkpoint_id": checkpoint_id, "last_updated": data["last_updated"]}, merge=True)
+        root_ref.set(
+            {
+                "latest_checkpoint_id": checkpoint_id,
+                "latest_snapshot_id": data["snapshot_id"],
+                "latest_chain": data["chain"],
+                "last_updated": data["last_updated"],
+            },
+            merge=True,
+        )
+        self._remember_head(thread_id, new_head)
 
         return {
             "configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
         }
 
+    def _channel_values_from_mirrors(self, raw_data: dict) -> dict:
+        """Rebuild channel values from the plain mirrors when the serialized state is unusable."""
+        mirror_schemes_history = raw_data.get("schemes_history", [])
+        mirror_search_history = raw_data.get("search_history", [])
+        mirror_tool_history = raw_data.get("tool_history", [])
+
+        reconstructed_schemes_history = []
+        if isinstance(mirror_schemes_history, list):
+            for item in mirror_schemes_history:
+                if is_compact(item):
+                    reconstructed_schemes_history.append(
+                        hydrate_scheme_ids(FirebaseManager(), item.get("scheme_ids") or [], item.get("scores"))
+                    )
+                elif isinstance(item, dict) and isinstance(item.get("schemes"), list):
+                    reconstructed_schemes_history.append([s for s in item.get("schemes", []) if isinstance(s, dict)])
+
+        return {
+            "messages": raw_data.get("messages", []),
+            "search_history": mirror_search_history if isinstance(mirror_search_history, list) else [],
+            "tool_history": mirror_tool_history if isinstance(mirror_tool_history, list) else [],
+            "schemes_history": reconstructed_schemes_history,
+        }
+
+    def _read_checkpoints(self, thread_id: str, checkpoint_ids: list) -> dict:
+        """Checkpoint documents by id, fetched in one batched `get_all`; missing ones are left out."""
+        checkpoints = self._checkpoints(thread_id)
+        refs = [checkpoints.document(checkpoint_id) for checkpoint_id in dict.fromkeys(checkpoint_ids)]
+        return {doc.id: doc.to_dict() for doc in self.client.get_all(refs) if doc.exists}
+
+    def _delta_sources(self, thread_id: str, raw_data: dict, docs: Optional[dict] = None) -> list:
+        """A delta checkpoint's snapshot, the deltas between them and the delta itself, oldest first.
+
+        Documents already in `docs` are not read again.
+        """
+        docs = dict(docs or {})
+        ids = [raw_data["snapshot_id"], *(raw_data.get("chain") or [])]
+        unread = [checkpoint_id for checkpoint_id in ids if checkpoint_id not in docs]
+        if unread:
+            docs.update(self._read_checkpoints(thread_id, unread))
+        missing = [checkpoint_id for checkpoint_id in ids if checkpoint_id not in docs]
+        if missing:
+            raise ValueError(f"Checkpoint {raw_data.get('checkpoint_id')} is missing its base checkpoints {missing}")
+        return [docs[checkpoint_id] for checkpoint_id in ids] + [raw_data]
+
+    def _rebuild_channel_values(self, sources: list) -> dict:
+        """Snapshot channel values with every delta's appended entries, plus the last delta's other channels."""
+        channel_values = dict(self.serializer.loads(sources[0].get("channel_values")))
+        for delta in sources[1:]:
+            base_counts = delta.get("base_counts") or {}
+            for channel, entries in self.serializer.loads(delta.get("appended")).items():
+                current = list(channel_values.get(channel, []))
+                base = base_counts.get(channel, 0)
+                if len(current) < base:
+                    raise ValueError(f"Checkpoint {delta.get('checkpoint_id')} does not follow its parent")
+                channel_values[channel] = current[:base] + list(entries)
+        channel_values.update(self.serializer.loads(sources[-1].get("channel_values")))
+        return channel_values
+
     def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
-        """Retrieve a checkpoint tuple from the Firestore subcollection."""
+        """Retrieve a checkpoint tuple from the Firestore subcollection.
+
+        Reads take no lock: they are idempotent, and the only shared state they
+        touch (the remembered heads) has its own lock, so concurrent chats do
+        not wait on each other's Firestore round trips.
+        """
         thread_id = config["configurable"]["thread_id"]
         checkpoint_ns = config["configurable"].get("checkpoint_ns", "chat")
         checkpoint_id = config["configurable"].get("checkpoint_id")
 
-        with self.__class__._lock:
-            try:
-                # 1. If checkpoint_id isn't provided, find the latest one from the root doc
+        try:
+            # 1. If checkpoint_id isn't provided, find the latest one from the root doc
+            if not checkpoint_id:
+                root_doc = self.client.collection(self.checkpoints_collection).document(thread_id).get()
+                if not root_doc.exists:
+                    return None
+                root_data = root_doc.to_dict()
+                checkpoint_id = root_data.get("latest_checkpoint_id")
                 if not checkpoint_id:
-                    root_ref = self.client.collection(self.checkpoints_collection).document(thread_id)
-                    root_doc = root_ref.get()
-                    if not root_doc.exists:
-                        return None
-                    checkpoint_id = root_doc.to_dict().get("latest_checkpoint_id")
-                    if not checkpoint_id:
-                        return None
-
-                # 2. Fetch the specific checkpoint document from the subcollection
-                ref = (
-                    self.client.collection(self.checkpoints_collection)
-                    .document(thread_id)
-                    .collection("checkpoints")
-                    .document(checkpoint_id)
-                )
-                doc = ref.get()
-
-                if not doc.exists:
                     return None
+                # The root names the latest checkpoint's snapshot and chain, so one batched read fetches it whole.
+                base_ids = []
+                if root_data.get("latest_snapshot_id"):
+                    base_ids = [root_data["latest_snapshot_id"], *(root_data.get("latest_chain") or [])]
+                docs = self._read_checkpoints(thread_id, [*base_ids, checkpoint_id])
+            else:
+                docs = self._read_checkpoints(thread_id, [checkpoint_id])
+
+            # 2. The checkpoint document from the subcollection
+            raw_data = docs.get(checkpoint_id)
+            if raw_data is None:
+                return None
 
-                raw_data = doc.to_dict()
-
-                # Reconstruct channel_versions
-                versions_data = raw_data.get("versions", {})
-                channel_versions = (
-                    self.serializer.loads(versions_data) if isinstance(versions_data, str) else versions_data
-                )
-
-                # Reconstruct checkpoint
-                channel_values_data = raw_data.get("channel_values")
-                mirror_schemes_history = raw_data.get("schemes_history", [])
-                mirror_search_history = raw_data.get("search_history", [])
-                mirror_tool_history = raw_data.get("tool_history", [])
-
-                reconstructed_schemes_history = []
-                if isinstance(mirror_schemes_history, list):
-                    for item in mirror_schemes_history:
-                        if isinstance(item, dict) and isinstance(item.get("schemes"), list):
-                            reconstructed_schemes_history.append(
-                                [s for s in item.get("schemes", []) if isinstance(s, dict)]
-                            )
-
-                fallback_channel_values = {
-                    "messages": raw_data.get("messages", []),
-                    "search_history": mirror_search_history if isinstance(mirror_search_history, list) else [],
-                    "tool_history": mirror_tool_history if isinstance(mirror_tool_history, list) else [],
-                    "schemes_history": reconstructed_schemes_history,
-                }
+            # Reconstruct channel_versions
+            versions_data = raw_data.get("versions", {})
+            channel_versions = (
+                self.serializer.loads(versions_data) if isinstance(versions_data, str) else versions_data
+            )
+
+            # Reconstruct checkpoint
+            channel_values_data = raw_data.get("channel_values")
+            is_delta = raw_data.get("format") == "delta"
+            if is_delta:
+                sources = self._delta_sources(thread_id, raw_data, docs)
+                try:
+                    channel_values = self._rebuild_channel_values(sources)
+                except Exception as e:
+                    logger.warning(f"Could not rebuild channel_values from checkpoint deltas: {e}")
+                    channel_values = self._channel_values_from_mirrors(_concatenated_mirrors(sources))
+            elif isinstance(channel_values_data, str):
+                try:
+                    channel_values = self.serializer.loads(channel_values_data)
+                except Exception as e:
+                    logger.warning(f"Could not deserialize channel_values: {e}")
+                    channel_values = self._channel_values_from_mirrors(raw_data)
+            elif isinstance(channel_values_data, dict):
+                channel_values = channel_values_data
+            else:
+                channel_values = self._channel_values_from_mirrors(raw_data)
+
+            checkpoint = {
+                "v": raw_data.get("v", 4),
+                "id": raw_data.get("checkpoint_id", ""),
+                "ts": datetime.now(timezone.utc).timestamp(),
+                "channel_values": channel_values,
+                "channel_versions": channel_versions,
+                "versions_seen": {},
+            }
 
-                if isinstance(channel_values_data, str):
+            # Restore additional fields
+            for key, value in raw_data.items():
+                if key.startswith("checkpoint_"):
+                    original_key = key.replace("checkpoint_", "", 1)
                     try:
-                        channel_values = self.serializer.loads(channel_values_data)
-                    except Exception as e:
-                        logger.warning(f"Could not deserialize channel_values: {e}")
-                        channel_values = fallback_channel_values
-                elif isinstance(channel_values_data, dict):
-                    channel_values = channel_values_data
-                else:
-                    channel_values = fallback_channel_values
-
-                checkpoint = {
-                    "v": raw_data.get("v", 4),
-                    "id": raw_data.get("checkpoint_id", ""),
-                    "ts": datetime.now(timezone.utc).timestamp(),
-                    "channel_values": channel_values,
-                    "channel_versions": channel_versions,
-                    "versions_seen": {},
-                }
-
-                # Restore additional fields
-                for key, value in raw_data.items():
-                    if key.startswith("checkpoint_"):
-                        original_key = key.replace("checkpoint_", "", 1)
-                        try:
-                            if isinstance(value, str) and original_key not in ["id", "ts", "v"]:
-                                checkpoint[original_key] = self.serializer.loads(value)
-                            else:
-                                checkpoint[original_key] = value
-                        except Exception as e:
-                            logger.warning(f"Could not deserialize checkpoint field {original_key}: {e}")
+                        if isinstance(value, str) and original_key not in ["id", "ts", "v"]:
+                            checkpoint[original_key] = self.serializer.loads(value)
+                        else:
                             checkpoint[original_key] = value
-
-                metadata_data = raw_data.get("metadata", {})
-                metadata = self.serializer.loads(metadata_data) if isinstance(metadata_data, str) else metadata_data
-
-                parent_checkpoint_id = raw_data.get("parent_checkpoint_id", "")
-                parent_config = None
-                if parent_checkpoint_id:
-                    parent_config = {
-                        "configurable": {
-                            "thread_id": thread_id,
-                            "checkpoint_ns": checkpoint_ns,
-                            "checkpoint_id": parent_checkpoint_id,
-                        }
+                    except Exception as e:
+                        logger.warning(f"Could not deserialize checkpoint field {original_key}: {e}")
+                        checkpoint[original_key] = value
+
+            metadata_data = raw_data.get("metadata", {})
+            metadata = self.serializer.loads(metadata_data) if isinstance(metadata_data, str) else metadata_data
+
+            # The next put extends this checkpoint with a delta when it is the parent.
+            read_id = raw_data.get("checkpoint_id", "")
+            chain = tuple(raw_data.get("chain") or ()) + ((read_id,) if is_delta else ())
+            lists = _append_only_lists(channel_values)
+            self._remember_head(thread_id, _head(read_id, raw_data.get("snapshot_id") or read_id, chain, lists))
+
+            parent_checkpoint_id = raw_data.get("parent_checkpoint_id", "")
+            parent_config = None
+            if parent_checkpoint_id:
+                parent_config = {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
                     }
+                }
 
-                return CheckpointTuple(
-                    config=config,
-                    checkpoint=checkpoint,
-                    metadata=metadata,
-                    parent_config=parent_config,
-                    pending_writes=None,
-                )
-            except Exception as e:
-                logger.error(f"Error retrieving checkpoint tuple: {e}")
-                return None
+            return CheckpointTuple(
+                # Name the checkpoint read, so the next put records it as the parent.
+                config={"configurable": {**config["configurable"], "checkpoint_id": read_id}},
+                checkpoint=checkpoint,
+                metadata=metadata,
+                parent_config=parent_config,
+                pending_writes=None,
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving checkpoint tuple: {e}")
+            return None
 
     def put_writes(self, config: RunnableConfig, writes: List[Tuple[str, Any]], task_id: str) -> None:
         """Fault-tolerance
@@ -2,6 +2,7 @@ import json
 import logging
 import re
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph.state import StateGraph, START
 from integrations.llm_manager import LLMManager
 from .prompts.followup import (
@@ -126,23 +127,20 @@ def replace_message_content(message, content: object):
 class FollowupSubgraph:
     def __init__(self):
         self.subgraph_builder = StateGraph(RouterAgentState)
-        llm_loader = LLMManager(MODEL_NAME)
-        llm_loader.modify_llm(
-            **{
-                "temperature": MODEL_TEMPERATURE,
-                "max_tokens": DEFAULT_FOLLOWUP_MAX_COMPLETION_TOKENS,
-            }
+        self.llm = LLMManager.get_client(
+            MODEL_NAME,
+            temperature=MODEL_TEMPERATURE,
+            max_tokens=DEFAULT_FOLLOWUP_MAX_COMPLETION_TOKENS,
         )
-        self.llm = llm_loader.get_llm()
 
-        self.subgraph_builder.add_node("followup_bot", self.followup_bot)
+        self.subgraph_builder.add_node("followup_bot", RunnableLambda(self.followup_bot, afunc=self.afollowup_bot))
         self.subgraph_builder.add_edge(START, "followup_bot")
         self.subgraph = self.subgraph_builder.compile()
 
     def invoke(self, state: RouterAgentState):
         return self.subgraph.invoke(state)
 
-    def followup_bot(self, state: RouterAgentState):
+    def _followup_prompt(self, state: RouterAgentState) -> list[dict[str, str]]:
         # Determine language from the user's own (human) messages only. The
         # scheme list and even the assistant's replies carry CJK/Tamil scheme
         # names that would otherwise flip English chats to Chinese suggestions.
@@ -160,12 +158,20 @@ class FollowupSubgraph:
         )
         parsed_schemes = parse_schemes_json(state.get("current_results_json", ""))
         prompt = FOLLOWUP_PROMPT_TEMPLATE.format(schemes_json=parsed_schemes, transcript=transcript)
-        response = self.llm.invoke(
-            [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt},
-            ]
-        )
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt},
+        ]
+
+    def followup_bot(self, state: RouterAgentState):
+        response = self.llm.invoke(self._followup_prompt(state))
+        response = replace_message_content(response, sanitize_followup_content(response.content))
+        return {
+            "messages": [response]
+        }
+
+    async def afollowup_bot(self, state: RouterAgentState):
+        response = await self.llm.ainvoke(self._followup_prompt(state))
         response = replace_message_content(response, sanitize_followup_content(response.content))
         return {
             "messages": [response]
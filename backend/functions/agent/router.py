@@ -1,8 +1,10 @@
 import json
+import threading
 from typing import Annotated, Any, TypedDict
 
 from integrations import LLMManager
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
@@ -18,6 +20,7 @@ from .tools import (
     fetch_webpage_tool,
     filter_rerank_by_directive_tool,
     load_skills_tool,
+    prefetch_searches,
     retrieve_schemes_by_ids_tool,
     search_schemes_tool,
 )
@@ -54,7 +57,14 @@ class RouterAgentState(TypedDict):
 
 
 class RouterAgentGraph:
-    """Main agent graph that encapsulates the full agent loop with tools and follow-up logic."""
+    """Main agent graph that encapsulates the full agent loop with tools and follow-up logic.
+
+    Chat requests share one process-wide instance (see `shared`), so the graph
+    is compiled once and its checkpointer and node cache persist across turns.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
 
     def __init__(self, *, firestore_client: Any | None = None, cache_maxsize: int = 1000):
         self._tools = [
@@ -69,6 +79,22 @@ class RouterAgentGraph:
         self._cache = InMemoryCacheWithMaxsize(maxsize=cache_maxsize)
         self.graph = self._build_graph()
 
+    @classmethod
+    def shared(cls, firestore_client: Any | None = None) -> "RouterAgentGraph":
+        """Return the process-wide graph, building it on first use.
+
+        Double-checked so warm requests never take the lock, and concurrent
+        cold requests build the graph only once.
+        """
+        instance = cls._instance
+        if instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls(firestore_client=firestore_client)
+                    logger.info("Compiled process-wide agent graph")
+                instance = cls._instance
+        return instance
+
     @staticmethod
     def initial_state() -> RouterAgentState:
         return {
@@ -76,29 +102,44 @@ class RouterAgentGraph:
         }
 
     def _build_llm_with_tools(self):
-        llm_loader = LLMManager(MODEL_NAME)
-        llm_loader.modify_llm(
-            **{
-                "temperature": DEFAULT_TEMPERATURE,
-                "max_tokens": DEFAULT_MAX_COMPLETION_TOKENS,
-            }
+        # Shared across steps and requests: the client and its tool schemas are built once.
+        return LLMManager.get_client_with_tools(
+            MODEL_NAME,
+            self._tools,
+            parallel_tool_calls=True,
+            temperature=DEFAULT_TEMPERATURE,
+            max_tokens=DEFAULT_MAX_COMPLETION_TOKENS,
         )
-        llm = llm_loader.get_llm()
-        return llm.bind_tools(self._tools, parallel_tool_calls=True)
+
+    def _chat_messages(self, state: RouterAgentState) -> list:
+        return [SystemMessage(ROUTER_AGENT_SYSTEM_TEMPLATE)] + state.get("messages", [])
+
+    @staticmethod
+    def _chat_llm_failure(err: Exception) -> dict[str, Any]:
+        # Azure OpenAI blocks disallowed prompts/responses (hate, sexual,
+        # etc.) with a content_filter error. Turn that into a calm refusal
+        # so the stream ends cleanly instead of hanging on an exception.
+        if _is_content_filter_error(err):
+            logger.info("Content filter triggered; returning safe refusal")
+            return {"messages": [AIMessage(content=CONTENT_FILTER_REFUSAL)]}
+        raise RuntimeError(f"LLM invocation failed: {err}") from err
 
     def call_chat_llm(self, state: RouterAgentState) -> dict[str, Any]:
         llm_with_tools = self._build_llm_with_tools()
-        all_messages = state.get("messages", [])
         try:
-            response = llm_with_tools.invoke([SystemMessage(ROUTER_AGENT_SYSTEM_TEMPLATE)] + all_messages)
+            response = llm_with_tools.invoke(self._chat_messages(state))
+        except Exception as err:
+            return self._chat_llm_failure(err)
+
+        return {"messages": [response]}
+
+    async def acall_chat_llm(self, state: RouterAgentState) -> dict[str, Any]:
+        """`call_chat_llm` for `graph.astream`, awaiting the async Azure client."""
+        llm_with_tools = self._build_llm_with_tools()
+        try:
+            response = await llm_with_tools.ainvoke(self._chat_messages(state))
         except Exception as err:
-            # Azure OpenAI blocks disallowed prompts/responses (hate, sexual,
-            # etc.) with a content_filter error. Turn that into a calm refusal
-            # so the stream ends cleanly instead of hanging on an exception.
-            if _is_content_filter_error(err):
-                logger.info("Content filter triggered; returning safe refusal")
-                return {"messages": [AIMessage(content=CONTENT_FILTER_REFUSAL)]}
-            raise RuntimeError(f"LLM invocation failed: {err}") from err
+            return self._chat_llm_failure(err)
 
         return {"messages": [response]}
 
@@ -107,16 +148,25 @@ class RouterAgentGraph:
         last = state.get("messages", [])[-1] if state.get("messages") else None
         tool_calls = getattr(last, "tool_calls", None)
         if isinstance(tool_calls, list) and tool_calls:
-            return "tools"
+            # Parallel searches in one turn are run as a single batch first.
+            searches = sum(1 for call in tool_calls if call.get("name") == search_schemes_tool.name)
+            return "search_batch" if searches > 1 else "tools"
         return "followup_subgraph"
 
+    @staticmethod
+    def run_search_batch(state: RouterAgentState, config: RunnableConfig) -> dict[str, Any]:
+        """Prefetch the turn's search_schemes calls as one batch; the tool node then returns those results."""
+        last = state.get("messages", [])[-1]
+        session_id = (config or {}).get("configurable", {}).get("thread_id")
+        prefetch_searches(getattr(last, "tool_calls", None) or [], session_id)
+        return {}
+
     def _build_graph(self):
         from langgraph.config import get_stream_writer
 
         followup_subgraph = FollowupSubgraph().get_subgraph()
 
-        def run_followup(state) -> dict[str, Any]:
-            result = followup_subgraph.invoke(state)
+        def followup_update(result) -> dict[str, Any]:
             try:
                 writer = get_stream_writer()
                 writer(
@@ -135,20 +185,38 @@ class RouterAgentGraph:
                 return {"followup_result": {"messages": []}}
             return {"followup_result": {"messages": [followup_message]}}
 
+        def run_followup(state) -> dict[str, Any]:
+            return followup_update(followup_subgraph.invoke(state))
+
+        async def arun_followup(state) -> dict[str, Any]:
+            return followup_update(await followup_subgraph.ainvoke(state))
+
+        # LLM nodes carry a native coroutine for `graph.astream` beside the sync
+        # function `graph.stream` uses; other nodes run on a worker thread under astream.
         builder = StateGraph(RouterAgentState)
-        builder.add_node("agent", self.call_chat_llm, cache_policy=CachePolicy())
+        builder.add_node(
+            "agent", RunnableLambda(self.call_chat_llm, afunc=self.acall_chat_llm), cache_policy=CachePolicy()
+        )
+        builder.add_node("search_batch", self.run_search_batch)
         builder.add_node("tools", ToolNode(self._tools))
-        builder.add_node("followup_subgraph", run_followup)
+        builder.add_node("followup_subgraph", RunnableLambda(run_followup, afunc=arun_followup))
 
         builder.add_edge(START, "agent")
         builder.add_conditional_edges(
             "agent",
             self._route_after_agent,
             {
+                "search_batch": "search_batch",
                 "tools": "tools",
                 "followup_subgraph": "followup_subgraph",
             },
         )
+        builder.add_edge("search_batch", "tools")
         builder.add_edge("tools", "agent")
         builder.add_edge("followup_subgraph", END)
         return builder.compile(checkpointer=self._checkpointer, cache=self._cache)
+
+
+def get_router_graph(firebase_manager: Any) -> RouterAgentGraph:
+    """Return the process-wide agent graph, checkpointing to the manager's Firestore client."""
+    return RouterAgentGraph.shared(firestore_client=firebase_manager.firestore_client)
@@ -2,7 +2,7 @@ from .fetch_webpage import fetch_webpage_tool
 from .filter_rerank import filter_rerank_by_directive_tool
 from .load_skill import load_skills_tool
 from .retrieve_scheme import retrieve_schemes_by_ids_tool
-from .search import search_schemes_tool
+from .search import prefetch_searches, search_schemes_tool
 from .websearch import duckduckgo_web_search_tool
 
 __all__ = [
@@ -10,6 +10,7 @@ __all__ = [
     "filter_rerank_by_directive_tool",
     "load_skills_tool",
     "retrieve_schemes_by_ids_tool",
+    "prefetch_searches",
     "search_schemes_tool",
     "duckduckgo_web_search_tool",
 ]
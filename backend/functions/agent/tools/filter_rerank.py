@@ -8,8 +8,10 @@ from datetime import datetime, timezone
 from langchain_core.tools import StructuredTool
 from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
+from utils.json_utils import safe_json_dumps
 from utils.logging_setup import setup_logging
 from integrations import FirebaseManager, LLMManager
+from search.session_results import compact_results, hydrate_results
 
 
 logger = setup_logging()
@@ -47,35 +49,62 @@ Only include indices of schemes that meet the criteria, and order them according
 
 
 def _retrieve_search_results_by_doc_id(doc_id: str) -> str:
-    """Fetch the schemes list JSON string from the database using the provided document ID."""
+    """Fetch the schemes list for the provided document ID, re-hydrated from the scheme store."""
     try:
         firebase_manager = FirebaseManager()
         print(f"Retrieving schemes context for doc_id: {doc_id}")
-        doc_ref = firebase_manager.firestore_client.collection(QUERY_COLLECTION_NAME).document(doc_id)
-        doc = doc_ref.get()
-        if doc.exists:
-            return doc.to_dict().get("schemes_response", [])
-        else:
+        doc = firebase_manager.firestore_client.collection(QUERY_COLLECTION_NAME).document(doc_id).get()
+        if not doc.exists:
             logger.warning(f"No document found for doc_id: {doc_id}")
             return ""
+        return hydrate_results(firebase_manager, doc.to_dict()).get("schemes_response", [])
     except Exception as e:
         logger.error(f"Error retrieving schemes list for doc_id {doc_id}: {e}")
         return ""
 
 
+async def _aretrieve_search_results_by_doc_id(doc_id: str) -> str:
+    """`_retrieve_search_results_by_doc_id` reading the record through the async Firestore client."""
+    try:
+        firebase_manager = FirebaseManager()
+        collection = firebase_manager.async_firestore_client.collection(QUERY_COLLECTION_NAME)
+        doc = await collection.document(doc_id).get()
+        if not doc.exists:
+            logger.warning(f"No document found for doc_id: {doc_id}")
+            return ""
+        # Re-hydration reads the scheme store (or Firestore on a miss) synchronously.
+        hydrated = await asyncio.to_thread(hydrate_results, firebase_manager, doc.to_dict())
+        return hydrated.get("schemes_response", [])
+    except Exception as e:
+        logger.error(f"Error retrieving schemes list for doc_id {doc_id}: {e}")
+        return ""
+
+
+def _filter_rerank_llm():
+    return LLMManager.get_client(MODEL_NAME, temperature=0.0, max_tokens=500)
+
+
 def _filter_rerank(
     schemes_dict: str,
     directive: str,
 ) -> dict[str, Any]:
-    llm_manager = LLMManager(MODEL_NAME)
-    llm_manager.modify_llm(
-        **{
-            "temperature": 0.0,
-            "max_tokens": 500,
-        }
+    llm_response = _filter_rerank_llm().invoke(
+        RERANKER_TEMPLATE.format(schemes_json=safe_json_dumps(schemes_dict), directive=directive)
     )
-    llm = llm_manager.get_llm()
-    llm_response = llm.invoke(RERANKER_TEMPLATE.format(schemes_json=json.dumps(schemes_dict), directive=directive))
+    return _parse_filter_rerank_response(llm_response)
+
+
+async def _afilter_rerank(
+    schemes_dict: str,
+    directive: str,
+) -> dict[str, Any]:
+    llm_response = await _filter_rerank_llm().ainvoke(
+        RERANKER_TEMPLATE.format(schemes_json=safe_json_dumps(schemes_dict), directive=directive)
+    )
+    return _parse_filter_rerank_response(llm_response)
+
+
+def _parse_filter_rerank_response(llm_response: Any) -> dict[str, Any]:
     llm_text = llm_response.content if hasattr(llm_response, "content") else str(llm_response)
 
     try:
@@ -100,16 +129,20 @@ def _sort_json_array_by_indices(schemes_dict: list, indices: list[int]) -> str:
         return []
 
 
+def _filtered_reranked_record(doc_id: str, schemes: list) -> dict[str, Any]:
+    return {
+        "llmquery_doc_id": doc_id,
+        "filter_rerank_timestamp": datetime.now(tz=timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        **compact_results(schemes),
+    }
+
+
 def _save_filtered_reranked_schemes(doc_id: str, schemes: list) -> None:
     """Save the filtered and reranked schemes list back to the database under the same document ID."""
     try:
         firebase_manager = FirebaseManager()
         _, doc_ref = firebase_manager.firestore_client.collection(RERANKER_COLLECTION_NAME).add(
-            {
-                "llmquery_doc_id": doc_id,
-                "schemes_response": schemes,
-                "filter_rerank_timestamp": datetime.now(tz=timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"),
-            }
+            _filtered_reranked_record(doc_id, schemes)
         )
         logger.info(
             f"Successfully saved filtered/reranked schemes for doc_id {doc_id} to Firestore with new doc_id {doc_ref.id}"
@@ -120,10 +153,23 @@ def _save_filtered_reranked_schemes(doc_id: str, schemes: list) -> None:
         return None
 
 
-def filter_rerank_by_directive(
-    doc_id: str,
-    directive: str,
-) -> dict[str, Any]:
+async def _asave_filtered_reranked_schemes(doc_id: str, schemes: list) -> None:
+    """`_save_filtered_reranked_schemes` through the async Firestore client."""
+    try:
+        firebase_manager = FirebaseManager()
+        _, doc_ref = await firebase_manager.async_firestore_client.collection(RERANKER_COLLECTION_NAME).add(
+            _filtered_reranked_record(doc_id, schemes)
+        )
+        logger.info(
+            f"Successfully saved filtered/reranked schemes for doc_id {doc_id} to Firestore with new doc_id {doc_ref.id}"
+        )
+        return doc_ref.id
+    except Exception as e:
+        logger.error(f"Error saving filtered/reranked schemes for doc_id {doc_id} to Firestore: {e}")
+        return None
+
+
+def _emit_filter_rerank_started(directive: str) -> None:
     try:
         writer = get_stream_writer()
         writer(
@@ -138,15 +184,9 @@ def filter_rerank_by_directive(
         )
     except Exception as e:
         logger.debug(f"Failed to emit filter/rerank start message to stream: {e}")
-    schemes_dict = _retrieve_search_results_by_doc_id(doc_id)
-    if not schemes_dict:
-        return {"error": "No schemes context found for the provided doc_id."}
 
-    result = _filter_rerank(schemes_dict, directive)
-    if result.get("error"):
-        return {"error": result["error"], "llm_response": result.get("llm_response", "")}
-    indices = result.get("indices", [])
-    sorted_schemes = _sort_json_array_by_indices(schemes_dict, indices)
+
+def _emit_filter_rerank_finished(sorted_schemes: list) -> None:
     try:
         writer = get_stream_writer()
         writer(
@@ -169,19 +209,58 @@ def filter_rerank_by_directive(
         )
     except Exception as e:
         logger.debug(f"Failed to emit filter/rerank completion message to stream: {e}")
-    new_doc_id = _save_filtered_reranked_schemes(doc_id, sorted_schemes)
+
+
+def _filter_rerank_result(new_doc_id: str | None, sorted_schemes: list, llm_response: str) -> dict[str, Any]:
     sorted_schemes_dicts = []
     for scheme in sorted_schemes:
         sorted_schemes_dicts.append({k: v for k, v in scheme.items() if k in MINIMAL_LLM_KEYS})
     return {
         "filtered_reranked_doc_id": new_doc_id,
         "schemes": sorted_schemes_dicts,
-        "llm_response": result.get("llm_response", ""),
+        "llm_response": llm_response,
     }
 
 
+def filter_rerank_by_directive(
+    doc_id: str,
+    directive: str,
+) -> dict[str, Any]:
+    _emit_filter_rerank_started(directive)
+    schemes_dict = _retrieve_search_results_by_doc_id(doc_id)
+    if not schemes_dict:
+        return {"error": "No schemes context found for the provided doc_id."}
+
+    result = _filter_rerank(schemes_dict, directive)
+    if result.get("error"):
+        return {"error": result["error"], "llm_response": result.get("llm_response", "")}
+    sorted_schemes = _sort_json_array_by_indices(schemes_dict, result.get("indices", []))
+    _emit_filter_rerank_finished(sorted_schemes)
+    new_doc_id = _save_filtered_reranked_schemes(doc_id, sorted_schemes)
+    return _filter_rerank_result(new_doc_id, sorted_schemes, result.get("llm_response", ""))
+
+
+async def afilter_rerank_by_directive(
+    doc_id: str,
+    directive: str,
+) -> dict[str, Any]:
+    _emit_filter_rerank_started(directive)
+    schemes_dict = await _aretrieve_search_results_by_doc_id(doc_id)
+    if not schemes_dict:
+        return {"error": "No schemes context found for the provided doc_id."}
+
+    result = await _afilter_rerank(schemes_dict, directive)
+    if result.get("error"):
+        return {"error": result["error"], "llm_response": result.get("llm_response", "")}
+    sorted_schemes = _sort_json_array_by_indices(schemes_dict, result.get("indices", []))
+    _emit_filter_rerank_finished(sorted_schemes)
+    new_doc_id = await _asave_filtered_reranked_schemes(doc_id, sorted_schemes)
+    return _filter_rerank_result(new_doc_id, sorted_schemes, result.get("llm_response", ""))
+
+
 filter_rerank_by_directive_tool = StructuredTool.from_function(
     func=filter_rerank_by_directive,
+    coroutine=afilter_rerank_by_directive,
     name="filter_rerank_by_directive",
     description=(
         "Filter and reorder an existing schemes list based on a natural language directive. "
@@ -7,7 +7,7 @@ from langgraph.config import get_stream_writer
 from pydantic import BaseModel, Field
 
 from integrations import FirebaseManager
-from search import fetch_schemes_by_ids
+from search import afetch_schemes_by_ids, fetch_schemes_by_ids
 from utils.logging_setup import setup_logging
 
 
@@ -45,22 +45,11 @@ def _emit_action_message(label: str, message: str) -> None:
         logger.debug(f"Failed to emit retrieve scheme action message to stream: {e}")
 
 
-def retrieve_schemes_by_ids(scheme_ids: list[str]) -> dict[str, Any]:
-    logger.info("retrieve_schemes_by_ids tool invoked")
-    normalized_scheme_ids = list(dict.fromkeys([scheme_id.strip() for scheme_id in scheme_ids if scheme_id.strip()]))
-
-    _emit_action_message(ACTION_MESSAGE_LABEL_ON_START, ACTION_MESSAGE_ON_START)
-
-    if not normalized_scheme_ids:
-        _emit_action_message(ACTION_MESSAGE_LABEL_ON_END, ACTION_MESSAGE_ON_END.format(result_count=0))
-        return {
-            "schemes": [],
-            "missing_scheme_ids": [],
-            "result_count": 0,
-        }
+def _normalize_scheme_ids(scheme_ids: list[str]) -> list[str]:
+    return list(dict.fromkeys([scheme_id.strip() for scheme_id in scheme_ids if scheme_id.strip()]))
 
-    schemes, missing_scheme_ids = fetch_schemes_by_ids(FirebaseManager(), normalized_scheme_ids)
 
+def _retrieve_result(schemes: list[dict], missing_scheme_ids: list[str]) -> dict[str, Any]:
     _emit_action_message(ACTION_MESSAGE_LABEL_ON_END, ACTION_MESSAGE_ON_END.format(result_count=len(schemes)))
 
     return {
@@ -70,8 +59,33 @@ def retrieve_schemes_by_ids(scheme_ids: list[str]) -> dict[str, Any]:
     }
 
 
+def retrieve_schemes_by_ids(scheme_ids: list[str]) -> dict[str, Any]:
+    logger.info("retrieve_schemes_by_ids tool invoked")
+    normalized_scheme_ids = _normalize_scheme_ids(scheme_ids)
+
+    _emit_action_message(ACTION_MESSAGE_LABEL_ON_START, ACTION_MESSAGE_ON_START)
+
+    if not normalized_scheme_ids:
+        return _retrieve_result([], [])
+
+    return _retrieve_result(*fetch_schemes_by_ids(FirebaseManager(), normalized_scheme_ids))
+
+
+async def aretrieve_schemes_by_ids(scheme_ids: list[str]) -> dict[str, Any]:
+    logger.info("retrieve_schemes_by_ids tool invoked")
+    normalized_scheme_ids = _normalize_scheme_ids(scheme_ids)
+
+    _emit_action_message(ACTION_MESSAGE_LABEL_ON_START, ACTION_MESSAGE_ON_START)
+
+    if not normalized_scheme_ids:
+        return _retrieve_result([], [])
+
+    return _retrieve_result(*await afetch_schemes_by_ids(FirebaseManager(), normalized_scheme_ids))
+
+
 retrieve_schemes_by_ids_tool = StructuredTool.from_function(
     func=retrieve_schemes_by_ids,
+    coroutine=aretrieve_schemes_by_ids,
     name="retrieve_schemes_by_ids",
     description=(
         "Retrieve the stored database record for one or more known schemes by scheme_id "
@@ -2,6 +2,8 @@
 
 import asyncio
 import os
+import threading
+import time
 from typing import Any
 
 # Import ToolRuntime from langgraph.prebuilt
@@ -19,6 +21,14 @@ ACTION_MESSAGE_ON_START = 'Finding the schemes that best match "{query}"'
 ACTION_MESSAGE_ON_END = 'Found {result_count} schemes matching "{query}".'
 SHORT_ACTION_MESSAGE_ON_START = "Searching schemes database"
 SHORT_ACTION_MESSAGE_ON_END = "{result_count} schemes found"
+# Prefetched batch results not picked up by their tool call within this many
+# seconds (e.g. the tool node failed first) are dropped.
+PREFETCH_TTL_SECONDS = 300
+
+# Results of search_schemes calls the agent graph ran as one batch (see
+# prefetch_searches), keyed by tool_call_id until the tool call picks them up.
+_prefetched: dict[str, tuple[float, dict[str, Any]]] = {}
+_prefetched_lock = threading.Lock()
 
 
 class SchemeSearchToolInput(BaseModel):
@@ -45,6 +55,80 @@ class SchemeSearchToolInput(BaseModel):
     model_config = {"arbitrary_types_allowed": True}
 
 
+def _emit_search_started(query: str) -> None:
+    try:
+        write = get_stream_writer()
+        write(
+            {
+                "type": "action_message",
+                "data": {
+                    "phase": "action_message",
+                    "label": SHORT_ACTION_MESSAGE_ON_START,
+                    "message": ACTION_MESSAGE_ON_START.format(query=query),
+                },
+            },
+        )
+    except Exception as e:
+        logger.debug(f"Failed to emit search input to stream: {e}")
+
+
+def prefetch_searches(tool_calls: list[dict[str, Any]], session_id: str | None = None) -> int:
+    """Run an agent turn's parallel search_schemes calls as one batched search.
+
+    The LLM often emits several search_schemes calls in one turn. Running them
+    through `QueryHandler.predict_many_for_agent` embeds, scores and hydrates
+    them together; each tool call then returns its prefetched result instead
+    of searching on its own. Returns the number of calls prefetched (0 if
+    there was nothing to batch or the batch failed, in which case every call
+    searches individually as before).
+    """
+    calls, params_list = [], []
+    for call in tool_calls:
+        if call.get("name") != "search_schemes" or not call.get("id"):
+            continue
+        try:
+            args = SchemeSearchToolInput(**(call.get("args") or {}))
+        except Exception:
+            continue  # left for the tool node to report
+        calls.append(call)
+        params_list.append(
+            PredictParams(
+                query=args.query,
+                requested_target=args.requested_count,
+                is_warmup=False,
+                session_id=session_id,
+            )
+        )
+    if len(calls) < 2:
+        return 0
+
+    logger.info(f"search_schemes batch of {len(calls)} queries")
+    for params in params_list:
+        _emit_search_started(params.query)
+    try:
+        responses = QueryHandler(FirebaseManager()).predict_many_for_agent(params_list)
+    except Exception as e:
+        logger.warning(f"Batched search failed, searching each query separately: {e}")
+        return 0
+
+    now = time.monotonic()
+    with _prefetched_lock:
+        for tool_call_id, (fetched_at, _) in list(_prefetched.items()):
+            if now - fetched_at > PREFETCH_TTL_SECONDS:
+                del _prefetched[tool_call_id]
+        for call, response in zip(calls, responses):
+            _prefetched[call["id"]] = (now, response)
+    return len(calls)
+
+
+def _take_prefetched(tool_call_id: str | None) -> dict[str, Any] | None:
+    if not tool_call_id:
+        return None
+    with _prefetched_lock:
+        entry = _prefetched.pop(tool_call_id, None)
+    return entry[1] if entry is not None else None
+
+
 def _search_schemes_sync(
     query: str,
     requested_count: int | None = None,
@@ -60,29 +144,19 @@ def _search_schemes_sync(
     if runtime and runtime.config:
         session_id = runtime.config.get("configurable", {}).get("thread_id")
 
-    try:
-        write = get_stream_writer()
-        write(
-            {
-                "type": "action_message",
-                "data": {
-                    "phase": "action_message",
-                    "label": SHORT_ACTION_MESSAGE_ON_START,
-                    "message": ACTION_MESSAGE_ON_START.format(query=query),
-                },
-            },
+    # Already searched as part of this turn's batch (see prefetch_searches)
+    results = _take_prefetched(getattr(runtime, "tool_call_id", None))
+    if results is None:
+        _emit_search_started(query)
+
+        model = QueryHandler(FirebaseManager())
+        params = PredictParams(
+            query=query,
+            requested_target=requested_target,
+            is_warmup=False,
+            session_id=session_id,  # Passes the extracted session_id here
         )
-    except Exception as e:
-        logger.debug(f"Failed to emit search input to stream: {e}")
-
-    model = QueryHandler(FirebaseManager())
-    params = PredictParams(
-        query=query,
-        requested_target=requested_target,
-        is_warmup=False,
-        session_id=session_id,  # Passes the extracted session_id here
-    )
-    results = model.predict_for_agent(params)
+        results = model.predict_for_agent(params)
     try:
         writer = get_stream_writer()
         writer(
@@ -114,8 +188,20 @@ def _search_schemes_sync(
     return results
 
 
+async def _search_schemes_async(
+    query: str,
+    requested_count: int | None = None,
+    runtime: ToolRuntime = None,
+):
+    # Retrieval (in-process NumPy scoring, Firestore hydration) is synchronous,
+    # so it runs on a worker thread and leaves the agent event loop to the
+    # turn's other tool calls.
+    return await asyncio.to_thread(_search_schemes_sync, query, requested_count, runtime)
+
+
 search_schemes_tool = StructuredTool.from_function(
     func=_search_schemes_sync,
+    coroutine=_search_schemes_async,
     name="search_schemes",
     description=("Search for schemes relevant to the user's query. "),
     args_schema=SchemeSearchToolInput,
@@ -3,7 +3,7 @@ import threading
 
 import firebase_admin
 from dotenv import load_dotenv
-from firebase_admin import credentials, firestore, initialize_app
+from firebase_admin import credentials, firestore, firestore_async, initialize_app
 
 
 load_dotenv()
@@ -54,3 +54,17 @@ class FirebaseManager:
             initialize_app(cred)
 
         self.firestore_client = firestore.client()
+        self._async_firestore_client = None
+
+    @property
+    def async_firestore_client(self):
+        """Async Firestore client for the async agent path, created on first use.
+
+        Its gRPC channel binds to the event loop that first uses it, so only
+        code running on the agent event loop (agent/async_bridge.py) uses it.
+        """
+        if self._async_firestore_client is None:
+            with self._lock:
+                if self._async_firestore_client is None:
+                    self._async_firestore_client = firestore_async.client()
+        return self._async_firestore_client
@@ -3,17 +3,31 @@ Load Azure OpenAI LLMs dynamically by deployment name.
 
 This module validates model config, initializes the selected Azure LLM,
 and makes it easy to add new deployed models in the future.
+
+Clients are expensive to build (each opens its own HTTP connection pool, so
+the first request pays a TLS handshake to Azure) and binding tools re-converts
+every tool schema. `LLMManager.get_client` and `get_client_with_tools` keep
+process-wide registries keyed by deployment and parameters, and every client
+shares one pooled `httpx` client per Azure endpoint (plus one async client for
+`ainvoke`/`astream`, which the async agent path uses on its event loop).
 """
 
 import os
+import threading
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, Sequence
 
-from langchain_openai import AzureChatOpenAI
+import httpx
 from dotenv import load_dotenv
+from langchain_openai import AzureChatOpenAI
+
 
 load_dotenv()
 
+# Connection pool bounds for the shared httpx client of each Azure endpoint.
+HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
 PRESET_LLM_CONFIGS = {
     "gpt-5.4": {
         "endpoint": os.getenv("AZURE_OPENAI_ENDPOINT_EASTUS2"),
@@ -76,10 +90,19 @@ class LLMManager:
     """Manager that loads configs from presets and initializes Azure OpenAI LLMs.
 
     Preferred usage:
-    - `LLMManager(deployment_name="gpt-5.4")` for one-step load from presets.
+    - `LLMManager.get_client("gpt-5.4", temperature=0.0)` for a shared client.
+    - `LLMManager.get_client_with_tools(...)` for a shared tool-bound client.
+    - `LLMManager(deployment_name="gpt-5.4")` for a private client that
+      `modify_llm` may change (it still uses the shared connection pool).
     - Or pass an explicit validated `LLMConfig` object.
     """
 
+    _lock = threading.Lock()
+    _http_clients: Dict[str, httpx.Client] = {}
+    _async_http_clients: Dict[str, httpx.AsyncClient] = {}
+    _clients: Dict[tuple, AzureChatOpenAI] = {}
+    _bound_clients: Dict[tuple, Any] = {}
+
     def __init__(
         self,
         deployment_name: str | None = None,
@@ -94,15 +117,69 @@ class LLMManager:
         self.config = llm_config
         self.model = self._initialize_model(self.config)
 
-    @staticmethod
-    def _initialize_model(config: LLMConfig) -> AzureChatOpenAI:
+    @classmethod
+    def _shared_http_client(cls, endpoint: str, asynchronous: bool = False) -> httpx.Client | httpx.AsyncClient:
+        """The pooled (sync or async) HTTP client for `endpoint`, created on first use."""
+        clients = cls._async_http_clients if asynchronous else cls._http_clients
+        client = clients.get(endpoint)
+        if client is None:
+            with cls._lock:
+                client = clients.get(endpoint)
+                if client is None:
+                    limits = httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    )
+                    client_class = httpx.AsyncClient if asynchronous else httpx.Client
+                    client = clients[endpoint] = client_class(limits=limits)
+        return client
+
+    @classmethod
+    def _initialize_model(cls, config: LLMConfig, **params: Any) -> AzureChatOpenAI:
+        # Not under `_lock`: `_shared_http_client` takes it.
         return AzureChatOpenAI(
             api_version=config.api_version,
             azure_endpoint=config.endpoint,
             api_key=config.api_key,
             model_name=config.deployment_name,
+            http_client=cls._shared_http_client(config.endpoint),
+            http_async_client=cls._shared_http_client(config.endpoint, asynchronous=True),
+            **params,
         )
 
+    @classmethod
+    def get_client(cls, deployment_name: str, **params: Any) -> AzureChatOpenAI:
+        """Shared client for `deployment_name` with model parameters `params` (e.g. temperature, max_tokens).
+
+        Built once per distinct deployment and parameters. Callers must not
+        modify the returned client; ask for different parameters instead.
+        """
+        key = (deployment_name, tuple(sorted(params.items())))
+        client = cls._clients.get(key)
+        if client is None:
+            # Built outside the lock; a racing duplicate is dropped and the first one kept.
+            built = cls._initialize_model(LLMConfig.from_preset(deployment_name), **params)
+            with cls._lock:
+                client = cls._clients.setdefault(key, built)
+        return client
+
+    @classmethod
+    def get_client_with_tools(
+        cls, deployment_name: str, tools: Sequence[Any], parallel_tool_calls: bool = True, **params: Any
+    ) -> Any:
+        """Shared `get_client(deployment_name, **params)` with `tools` bound, built once per tool set."""
+        tool_names = tuple(getattr(tool, "name", repr(tool)) for tool in tools)
+        key = (deployment_name, tuple(sorted(params.items())), tool_names, parallel_tool_calls)
+        bound = cls._bound_clients.get(key)
+        if bound is None:
+            client = cls.get_client(deployment_name, **params)
+            with cls._lock:
+                bound = cls._bound_clients.get(key)
+                if bound is None:
+                    bound = client.bind_tools(list(tools), parallel_tool_calls=parallel_tool_calls)
+                    cls._bound_clients[key] = bound
+        return bound
+
     def get_llm(self) -> AzureChatOpenAI:
         """Return the initialized LLM instance."""
         return self.model
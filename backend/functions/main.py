@@ -57,6 +57,7 @@ from schemes.catalog import catalog  # noqa: F401
 from schemes.schemes import schemes  # noqa: F401
 from schemes.search import schemes_search  # noqa: F401
 from schemes.search_queries import retrieve_search_queries  # noqa: F401
+from search.query_log import install_shutdown_flush
 from slack_integration.slack import (  # noqa: F401
     slack_interactive,
     slack_scan_and_notify,
@@ -79,6 +80,9 @@ logger.info("Logger initialised")
 # Initialise the Firebase Admin SDK and Connection to firestore
 firebase_manager = FirebaseManager()
 
+# Flush queued query-log records when the instance is sent SIGTERM
+install_shutdown_flush()
+
 
 @https_fn.on_request(
     region="asia-southeast1",
@@ -17,8 +17,13 @@ from firebase_functions import https_fn, options
 from google.cloud.firestore_v1 import FieldFilter
 from loguru import logger
 from new_scheme.constants import SCHEME_CATEGORY_MAPPING
+from search.scheme_store import SchemeStore, get_scheme_store
 from utils.auth import verify_auth_token
-from utils.catalog_pagination import PaginationResult, get_paginated_results
+from utils.catalog_pagination import (
+    PaginationResult,
+    get_paginated_results,
+    get_paginated_store_results,
+)
 from utils.cors_config import get_cors_headers, handle_cors_preflight
 from utils.json_utils import safe_json_dumps
 from werkzeug.datastructures import MultiDict
@@ -28,11 +33,12 @@ DEFAULT_LIMIT = 10
 
 @dataclass(frozen=True)
 class CatalogFilterSpec:
-    """Describes how a supported catalog query param maps to Firestore."""
+    """Describes how a supported catalog query param maps to Firestore and the scheme store."""
 
     firestore_field: str
     operator: str
     normalize: Callable[[str], str | list[str]]
+    store_lookup: Callable[[SchemeStore, str | list[str]], list[str]]
 
 
 @dataclass(kw_only=True)
@@ -93,16 +99,19 @@ FILTER_SPECS = {
         firestore_field="agency",
         operator="==",
         normalize=lambda value: value.title(),
+        store_lookup=SchemeStore.ids_by_agency,
     ),
     "area": CatalogFilterSpec(
         firestore_field="planning_area",
         operator="array_contains",
         normalize=lambda value: value.upper(),
+        store_lookup=SchemeStore.ids_by_planning_area,
     ),
     "category": CatalogFilterSpec(
         firestore_field="scheme_type",
         operator="array_contains_any",
         normalize=_expand_category,
+        store_lookup=SchemeStore.ids_by_scheme_type,
     ),
 }
 ALLOWED_QUERY_PARAMS = set(FILTER_SPECS) | {"limit", "cursor", "is_warmup", "sort"}
@@ -271,6 +280,9 @@ def _handle_catalog_request(
 ) -> PaginationResult:
     """Retrieve catalog entries with optional filter-based pagination.
 
+    Pages come from the in-memory scheme store when it is loaded, otherwise
+    from a Firestore query; both use the same ordering and cursors.
+
     Args:
         firebase_manager: Firebase manager providing Firestore access.
         query_params: Parsed catalog parameters, including any active filter.
@@ -281,6 +293,42 @@ def _handle_catalog_request(
             next_cursor: Cursor for the next page, or None if exhausted.
             has_more: Whether more results exist.
     """
+    store = get_scheme_store(firebase_manager)
+    if store is not None:
+        results = _paginate_from_store(store, query_params)
+    else:
+        results = _paginate_from_firestore(firebase_manager, query_params)
+
+    if query_params.filter_name == "category" and isinstance(
+        query_params.filter_value, list
+    ):
+        return _filter_scheme_types_for_category(results, query_params.filter_value)
+
+    return results
+
+
+def _paginate_from_store(
+    store: SchemeStore, query_params: CatalogRequestParams
+) -> PaginationResult:
+    """Serve a catalog page from the in-memory scheme store."""
+    if not query_params.filter_name or query_params.filter_value is None:
+        scheme_ids = store.all_ids()
+    else:
+        spec = FILTER_SPECS[query_params.filter_name]
+        scheme_ids = spec.store_lookup(store, query_params.filter_value)
+
+    return get_paginated_store_results(
+        store=store,
+        scheme_ids=scheme_ids,
+        cursor=query_params.cursor,
+        limit=query_params.limit,
+    )
+
+
+def _paginate_from_firestore(
+    firebase_manager: FirebaseManager, query_params: CatalogRequestParams
+) -> PaginationResult:
+    """Serve a catalog page with a Firestore query (used when the store is unavailable)."""
     col = firebase_manager.firestore_client.collection("schemes")
 
     if not query_params.filter_name or query_params.filter_value is None:
@@ -297,16 +345,9 @@ def _handle_catalog_request(
         )
     )
 
-    results = get_paginated_results(
+    return get_paginated_results(
         collection_ref=col,
         base_query=query,
         cursor=query_params.cursor,
         limit=query_params.limit,
     )
-
-    if query_params.filter_name == "category" and isinstance(
-        query_params.filter_value, list
-    ):
-        return _filter_scheme_types_for_category(results, query_params.filter_value)
-
-    return results
@@ -8,6 +8,7 @@ import json
 from fb_manager.firebaseManager import FirebaseManager
 from firebase_functions import https_fn, options
 from loguru import logger
+from search.scheme_store import get_scheme_store
 from utils.auth import verify_auth_token
 from utils.cors_config import get_cors_headers, handle_cors_preflight
 from utils.json_utils import safe_json_dumps
@@ -84,8 +85,14 @@ def schemes(req: https_fn.Request) -> https_fn.Response:
         )
 
     try:
-        ref = firebase_manager.firestore_client.collection("schemes").document(schemes_id)
-        doc = ref.get()
+        store = get_scheme_store(firebase_manager)
+        if store is not None:
+            scheme = store.get(schemes_id)
+            if scheme is not None:
+                scheme.pop("scheme_id", None)
+        else:
+            doc = firebase_manager.firestore_client.collection("schemes").document(schemes_id).get()
+            scheme = doc.to_dict() if doc.exists else None
     except Exception as e:
         logger.exception("Unable to fetch scheme from firestore", e)
         return https_fn.Response(
@@ -95,7 +102,7 @@ def schemes(req: https_fn.Request) -> https_fn.Response:
             headers=headers,
         )
 
-    if not doc.exists:
+    if scheme is None:
         return https_fn.Response(
             response=safe_json_dumps({"error": "Scheme with provided id does not exist"}),
             status=404,
@@ -103,7 +110,7 @@ def schemes(req: https_fn.Request) -> https_fn.Response:
             headers=headers,
         )
 
-    results = {"data": doc.to_dict()}
+    results = {"data": scheme}
     return https_fn.Response(
         response=safe_json_dumps(results),
         status=200,
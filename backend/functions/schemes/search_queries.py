@@ -8,6 +8,7 @@ import json
 from fb_manager.firebaseManager import FirebaseManager
 from firebase_functions import https_fn, options
 from loguru import logger
+from search.session_results import hydrate_results
 from utils.auth import verify_auth_token
 from utils.cors_config import get_cors_headers, handle_cors_preflight
 from utils.json_utils import safe_json_dumps
@@ -103,7 +104,16 @@ def retrieve_search_queries(req: https_fn.Request) -> https_fn.Response:
             headers=headers,
         )
 
-    results = {"data": doc.to_dict()}
+    try:
+        results = {"data": hydrate_results(firebase_manager, doc.to_dict())}
+    except Exception as e:
+        logger.exception("Unable to load schemes for search results", e)
+        return https_fn.Response(
+            response=json.dumps({"error": "Internal server error, unable to load schemes for search results"}),
+            status=500,
+            mimetype="application/json",
+            headers=headers,
+        )
     return https_fn.Response(
         response=safe_json_dumps(results), status=200, mimetype="application/json", headers=headers
     )
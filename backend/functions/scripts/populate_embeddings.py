@@ -1,7 +1,8 @@
 """
 Populate schemes_embeddings collection for Firestore vector search.
 
-Creates a separate collection with only doc_id + embedding.
+Creates a separate collection with doc_id + embedding, plus the scheme fields
+search pre-filters find_nearest on.
 Original 'schemes' collection is unchanged.
 
 Usage:
@@ -61,6 +62,9 @@ def load_environment(is_prod: bool):
 
 COLLECTION_SOURCE = "schemes"
 COLLECTION_EMBEDDINGS = "schemes_embeddings"
+# Copied onto each embeddings document for find_nearest pre-filters; keep in
+# sync with utils/reindex_embeddings.py.
+EMBEDDING_FILTER_FIELDS = ["agency", "planning_area", "scheme_type", "who_is_it_for", "what_it_gives"]
 
 
 def build_desc_booster(row) -> str:
@@ -171,17 +175,24 @@ def populate_embeddings() -> Dict[str, Any]:
         for i in range(0, len(df), batch_size):
             batch = df.iloc[i : i + batch_size]
             texts = batch["desc_booster"].tolist()
-            doc_ids = batch["doc_id"].tolist()
+            rows = batch.to_dict("records")
 
             # Generate embeddings for batch
             logger.info(f"Generating embeddings for batch {i // batch_size + 1}/{(len(df) - 1) // batch_size + 1}...")
             vectors = embeddings.embed_documents(texts)
 
-            # Write to embeddings collection (only doc_id + embedding)
+            # Write to embeddings collection (embedding + filter fields)
             batch_writer = db.batch()
-            for doc_id, vector in zip(doc_ids, vectors):
-                doc_ref = db.collection(COLLECTION_EMBEDDINGS).document(doc_id)
-                batch_writer.set(doc_ref, {"embedding": Vector(vector)})
+            for row, vector in zip(rows, vectors):
+                document = {"embedding": Vector(vector)}
+                for field in EMBEDDING_FILTER_FIELDS:
+                    value = row.get(field)
+                    if isinstance(value, str):
+                        document[field] = value
+                    elif isinstance(value, list):
+                        document[field] = [item for item in value if isinstance(item, str)]
+                doc_ref = db.collection(COLLECTION_EMBEDDINGS).document(row["doc_id"])
+                batch_writer.set(doc_ref, document)
 
             batch_writer.commit()
             indexed += len(batch)
@@ -0,0 +1,706 @@
+"""
+Offline benchmark for search relevance, latency and allocations.
+
+Runs `SearchModel.aggregate_and_rank_results` against a frozen corpus snapshot
+(schemes + precomputed embeddings) and a fixed query set with cached query
+embeddings and recorded relevance labels. Nothing touches Firestore or Azure
+during a run, so results are reproducible and comparable across changes.
+
+Reports, per (fusion, relevance threshold, retrieval limit) configuration:
+p50/p95 latency of uncached queries, mean peak traced allocation per query,
+recall@k, nDCG@k, recall of everything returned, and mean result count.
+
+The `quantization` command reports recall against memory for the quantized
+vector index (search/quantized_index.py): for each mode and first-pass prefix
+length, the overlap of its top k with exact float32 search, resident bytes per
+vector and search latency. The `backends` command does the same for the
+approximate nearest-neighbour backends (search/ann_index.py), with build time;
+grow the synthetic corpus (--schemes-per-topic) to see them past 1000 rows.
+
+Snapshot directory layout:
+    manifest.json           source, model, dimension, counts, created_at
+    schemes.json            list of scheme dicts (with scheme_id, no scraped_text)
+    embeddings.npz          ids (str) + vectors (float32, one row per scheme)
+    queries.json            [{"query": str, "relevant": {scheme_id: grade}}]
+    query_embeddings.npz    queries (str) + vectors (float32)
+
+Usage:
+    cd backend/functions
+
+    # Freeze a snapshot from dev (needs .env.dev; the only step that goes online).
+    # labels.json holds the query set: [{"query": ..., "relevant": {"<scheme_id>": 2, ...}}]
+    uv run python scripts/search_benchmark.py snapshot --dev --labels labels.json --out benchmarks/dev
+
+    # Or generate a deterministic synthetic snapshot (no credentials)
+    uv run python scripts/search_benchmark.py synthetic --out benchmarks/synthetic
+
+    # Benchmark offline
+    uv run python scripts/search_benchmark.py run benchmarks/synthetic \\
+        --fusion weighted_sum rrf zscore --threshold 0.5 0.6 --retrieval-limit 100 1000
+
+    # Recall vs memory of the quantized vector index
+    uv run python scripts/search_benchmark.py quantization benchmarks/dev \\
+        --mode float16 int8 --first-pass-dims 0 256 512 --k 10 100
+
+    # Recall vs latency of the approximate backends on a 20k-row corpus
+    uv run python scripts/search_benchmark.py synthetic --out benchmarks/large --schemes-per-topic 2000
+    uv run python scripts/search_benchmark.py backends benchmarks/large --backend ivf hnsw --k 10 1000
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from search import retriever  # noqa: E402
+from search.ann_index import VECTOR_BACKENDS, build_vector_backend  # noqa: E402
+from search.bm25_index import BM25Index  # noqa: E402
+from search.cache import QueryResultCache  # noqa: E402
+from search.fusion import FUSION_STRATEGIES  # noqa: E402
+from search.quantized_index import QUANTIZATION_MODES, QuantizedVectorIndex  # noqa: E402
+from search.retriever import SearchIndexes, SearchModel  # noqa: E402
+from search.vector_index import VectorIndex  # noqa: E402
+
+
+# ----- snapshot -----
+
+
+@dataclass
+class Snapshot:
+    """A frozen corpus and query set loaded into memory."""
+
+    manifest: Dict[str, Any]
+    schemes: Dict[str, Dict]
+    embedding_ids: List[str]
+    embeddings: np.ndarray
+    queries: List[Dict[str, Any]]
+    query_embeddings: Dict[str, np.ndarray]
+
+
+def save_snapshot(
+    out_dir: str,
+    schemes: Sequence[Dict],
+    embedding_ids: Sequence[str],
+    embeddings: np.ndarray,
+    queries: Sequence[Dict[str, Any]],
+    query_vectors: np.ndarray,
+    source: str,
+    model: str,
+) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        "source": source,
+        "model": model,
+        "dimensions": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+        "schemes": len(schemes),
+        "embeddings": len(embedding_ids),
+        "queries": len(queries),
+        "created_at": datetime.now(tz=timezone.utc).isoformat(),
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(out_dir, "schemes.json"), "w") as f:
+        json.dump(list(schemes), f, default=str)
+    with open(os.path.join(out_dir, "queries.json"), "w") as f:
+        json.dump(list(queries), f, indent=2)
+    np.savez_compressed(
+        os.path.join(out_dir, "embeddings.npz"),
+        ids=np.array(embedding_ids),
+        vectors=np.asarray(embeddings, dtype=np.float32),
+    )
+    np.savez_compressed(
+        os.path.join(out_dir, "query_embeddings.npz"),
+        queries=np.array([q["query"] for q in queries]),
+        vectors=np.asarray(query_vectors, dtype=np.float32),
+    )
+
+
+def load_snapshot(snapshot_dir: str) -> Snapshot:
+    with open(os.path.join(snapshot_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    with open(os.path.join(snapshot_dir, "schemes.json")) as f:
+        schemes = {scheme["scheme_id"]: scheme for scheme in json.load(f)}
+    with open(os.path.join(snapshot_dir, "queries.json")) as f:
+        queries = json.load(f)
+    embeddings = np.load(os.path.join(snapshot_dir, "embeddings.npz"))
+    query_embeddings = np.load(os.path.join(snapshot_dir, "query_embeddings.npz"))
+    return Snapshot(
+        manifest=manifest,
+        schemes=schemes,
+        embedding_ids=embeddings["ids"].tolist(),
+        embeddings=embeddings["vectors"],
+        queries=queries,
+        query_embeddings=dict(zip(query_embeddings["queries"].tolist(), query_embeddings["vectors"])),
+    )
+
+
+SYNTHETIC_TOPICS = {
+    "childcare": ["childcare", "infant", "preschool", "subsidy"],
+    "eldercare": ["elderly", "caregiver", "seniors", "eldercare"],
+    "disability": ["disability", "assistive", "mobility", "therapy"],
+    "housing": ["housing", "rental", "flat", "shelter"],
+    "employment": ["job", "employment", "training", "career"],
+    "medical": ["medical", "hospital", "bills", "healthcare"],
+    "education": ["student", "bursary", "school", "tuition"],
+    "food": ["food", "meals", "groceries", "rations"],
+    "mental_health": ["counselling", "mental", "wellbeing", "stress"],
+    "financial": ["financial", "cash", "assistance", "debt"],
+}
+SYNTHETIC_FILLER = ["support", "scheme", "singapore", "help", "programme", "community", "apply", "eligible"]
+
+
+def build_synthetic_snapshot(
+    out_dir: str,
+    schemes_per_topic: int = 40,
+    dimension: int = 256,
+    queries_per_topic: int = 3,
+    seed: int = 7,
+) -> None:
+    """Write a deterministic snapshot with topic-clustered embeddings and graded labels.
+
+    Each topic has a random centroid; schemes and queries are noisy copies of
+    it. A scheme is relevant (grade 1) to every query on its topic and highly
+    relevant (grade 2) when its text also contains both query terms.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = {topic: rng.normal(size=dimension) for topic in SYNTHETIC_TOPICS}
+
+    schemes, ids, vectors = [], [], []
+    for topic, words in SYNTHETIC_TOPICS.items():
+        for i in range(schemes_per_topic):
+            scheme_id = f"{topic}-{i:03d}"
+            text_words = list(rng.choice(words, size=3)) + list(rng.choice(SYNTHETIC_FILLER, size=4))
+            schemes.append(
+                {
+                    "scheme_id": scheme_id,
+                    "scheme": f"{topic.replace('_', ' ').title()} Scheme {i}",
+                    "agency": "Synthetic Agency",
+                    "summary": " ".join(text_words),
+                    "search_booster": " ".join(text_words),
+                    "status": "active",
+                }
+            )
+            ids.append(scheme_id)
+            vectors.append(centroids[topic] + rng.normal(scale=1.2, size=dimension))
+
+    queries, query_vectors = [], []
+    for topic, words in SYNTHETIC_TOPICS.items():
+        for j in range(queries_per_topic):
+            terms = [words[j % len(words)], words[(j + 1) % len(words)]]
+            relevant = {}
+            for scheme in schemes:
+                if scheme["scheme_id"].startswith(f"{topic}-"):
+                    text = scheme["search_booster"].split()
+                    relevant[scheme["scheme_id"]] = 2 if all(term in text for term in terms) else 1
+            queries.append({"query": f"{' '.join(terms)} help", "relevant": relevant})
+            query_vectors.append(centroids[topic] + rng.normal(scale=0.8, size=dimension))
+
+    save_snapshot(
+        out_dir,
+        schemes,
+        ids,
+        np.array(vectors, dtype=np.float32),
+        queries,
+        np.array(query_vectors, dtype=np.float32),
+        source=f"synthetic(seed={seed})",
+        model="synthetic",
+    )
+
+
+def build_live_snapshot(out_dir: str, labels_path: str, is_prod: bool) -> None:
+    """Freeze the live corpus, its embeddings and the labelled query set (needs credentials)."""
+    from populate_embeddings import load_environment
+
+    load_environment(is_prod)
+
+    # Imported after the env file is loaded; both read credentials at import/init.
+    from integrations import EmbeddingsManager, FirebaseManager
+    from search.scheme_store import SCHEME_FIELDS, SCHEMES_COLLECTION
+
+    with open(labels_path) as f:
+        queries = json.load(f)
+
+    db = FirebaseManager().firestore_client
+    schemes = []
+    for doc in db.collection(SCHEMES_COLLECTION).select(SCHEME_FIELDS).stream():
+        schemes.append({**(doc.to_dict() or {}), "scheme_id": doc.id})
+    logger.info(f"Read {len(schemes)} schemes")
+
+    index = VectorIndex.from_documents(db.collection(retriever.EMBEDDINGS_COLLECTION).stream())
+    logger.info(f"Read {len(index)} embeddings")
+
+    embeddings_manager = EmbeddingsManager("text-embedding-3-large")
+    query_vectors = embeddings_manager.model.embed_documents([q["query"] for q in queries])
+
+    # VectorIndex rows are normalised, which leaves cosine distances unchanged.
+    save_snapshot(
+        out_dir,
+        schemes,
+        index.ids,
+        index.matrix,
+        queries,
+        np.array(query_vectors, dtype=np.float32),
+        source="prod" if is_prod else "dev",
+        model=embeddings_manager.config.deployment_name,
+    )
+
+
+# ----- offline model -----
+
+
+class FrozenEmbeddings:
+    """Embeddings client that only knows the snapshot's cached query vectors."""
+
+    def __init__(self, vectors: Dict[str, np.ndarray]):
+        self.vectors = vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        if text not in self.vectors:
+            raise KeyError(f"No cached embedding for query {text!r}; re-create the snapshot")
+        return self.vectors[text].tolist()
+
+    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class OfflineSearchModel(SearchModel):
+    """SearchModel wired to a snapshot instead of Firestore and Azure.
+
+    Class attributes live on this subclass, so the real SearchModel singleton
+    is left untouched.
+    """
+
+    _instance = None
+
+    def __new__(cls, snapshot: Snapshot):
+        return object.__new__(cls)
+
+    def __init__(self, snapshot: Snapshot):
+        cls = self.__class__
+        cls.embeddings = FrozenEmbeddings(snapshot.query_embeddings)
+        active = [scheme for scheme in snapshot.schemes.values() if scheme.get("status") != "inactive"]
+        cls.indexes = SearchIndexes(
+            index=VectorIndex(snapshot.embedding_ids, snapshot.embeddings),
+            bm25_index=BM25Index(
+                [scheme["scheme_id"] for scheme in active], [scheme.get("search_booster") for scheme in active]
+            ),
+        )
+        cls.initialised = True
+        cls.generation_checked_at = None
+        self.schemes = snapshot.schemes
+        self.query_cache = QueryResultCache()
+
+    def fetch_schemes_batch(self, scheme_ids: List[str]) -> List[Dict]:
+        return [self.schemes[scheme_id] for scheme_id in scheme_ids if scheme_id in self.schemes]
+
+
+# ----- metrics -----
+
+
+def recall_at_k(ranked_ids: Sequence[str], relevant: Dict[str, int], k: Optional[int]) -> float:
+    """Share of relevant schemes found in the top k (k=None: everything returned)."""
+    relevant_ids = {scheme_id for scheme_id, grade in relevant.items() if grade > 0}
+    if not relevant_ids:
+        return 0.0
+    top = ranked_ids if k is None else ranked_ids[:k]
+    return len(relevant_ids.intersection(top)) / len(relevant_ids)
+
+
+def ndcg_at_k(ranked_ids: Sequence[str], relevant: Dict[str, int], k: int) -> float:
+    """Normalized discounted cumulative gain over graded labels, gain = 2^grade - 1."""
+
+    def dcg(grades: Sequence[int]) -> float:
+        return sum((2**grade - 1) / math.log2(position + 2) for position, grade in enumerate(grades))
+
+    ideal = dcg(sorted(relevant.values(), reverse=True)[:k])
+    if ideal == 0:
+        return 0.0
+    return dcg([relevant.get(scheme_id, 0) for scheme_id in ranked_ids[:k]]) / ideal
+
+
+@dataclass
+class BenchmarkResult:
+    fusion: str
+    threshold: float
+    retrieval_limit: int
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    mean_peak_kib: float
+    recall_at_k: float
+    ndcg_at_k: float
+    recall_returned: float
+    mean_results: float
+    k: int
+
+
+def run_configuration(
+    model: OfflineSearchModel,
+    queries: Sequence[Dict[str, Any]],
+    fusion: str,
+    threshold: float,
+    retrieval_limit: int,
+    k: int = 10,
+    repeat: int = 5,
+) -> BenchmarkResult:
+    """Benchmark one configuration; every timed query runs with an empty result cache."""
+    original_limit = retriever.RETRIEVAL_LIMIT
+    retriever.RETRIEVAL_LIMIT = retrieval_limit
+    try:
+        # Relevance (and a warm-up pass for imports and lazy allocations).
+        recalls, ndcgs, returned_recalls, counts = [], [], [], []
+        for query in queries:
+            model.query_cache.clear()
+            results = model.aggregate_and_rank_results(query["query"], threshold, None, fusion=fusion)
+            recalls.append(recall_at_k(results.ids, query["relevant"], k))
+            ndcgs.append(ndcg_at_k(results.ids, query["relevant"], k))
+            returned_recalls.append(recall_at_k(results.ids, query["relevant"], None))
+            counts.append(len(results))
+
+        # Latency, without tracing overhead.
+        timings = []
+        for _ in range(repeat):
+            for query in queries:
+                model.query_cache.clear()
+                started = time.perf_counter()
+                model.aggregate_and_rank_results(query["query"], threshold, None, fusion=fusion)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        # Allocations: peak traced memory per query.
+        peaks = []
+        tracemalloc.start()
+        try:
+            for query in queries:
+                model.query_cache.clear()
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                model.aggregate_and_rank_results(query["query"], threshold, None, fusion=fusion)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append((peak - baseline) / 1024)
+        finally:
+            tracemalloc.stop()
+    finally:
+        retriever.RETRIEVAL_LIMIT = original_limit
+
+    return BenchmarkResult(
+        fusion=fusion,
+        threshold=threshold,
+        retrieval_limit=retrieval_limit,
+        queries=len(queries),
+        p50_ms=float(np.percentile(timings, 50)),
+        p95_ms=float(np.percentile(timings, 95)),
+        mean_peak_kib=float(np.mean(peaks)),
+        recall_at_k=float(np.mean(recalls)),
+        ndcg_at_k=float(np.mean(ndcgs)),
+        recall_returned=float(np.mean(returned_recalls)),
+        mean_results=float(np.mean(counts)),
+        k=k,
+    )
+
+
+def run_benchmark(
+    snapshot: Snapshot,
+    fusions: Sequence[str],
+    thresholds: Sequence[float],
+    retrieval_limits: Sequence[int],
+    k: int = 10,
+    repeat: int = 5,
+) -> List[BenchmarkResult]:
+    model = OfflineSearchModel(snapshot)
+    return [
+        run_configuration(model, snapshot.queries, fusion, threshold, limit, k=k, repeat=repeat)
+        for fusion, threshold, limit in product(fusions, thresholds, retrieval_limits)
+    ]
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    k = results[0].k if results else 10
+    header = (
+        f"{'fusion':<13}{'thresh':>7}{'limit':>7}{'p50 ms':>9}{'p95 ms':>9}{'peak KiB':>10}"
+        f"{f'R@{k}':>7}{f'nDCG@{k}':>9}{'R@ret':>7}{'n':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.fusion:<13}{r.threshold:>7.2f}{r.retrieval_limit:>7}{r.p50_ms:>9.2f}{r.p95_ms:>9.2f}"
+            f"{r.mean_peak_kib:>10.1f}{r.recall_at_k:>7.3f}{r.ndcg_at_k:>9.3f}{r.recall_returned:>7.3f}"
+            f"{r.mean_results:>7.1f}"
+        )
+    return "\n".join(lines)
+
+
+# ----- quantization -----
+
+
+@dataclass
+class QuantizationResult:
+    mode: str
+    first_pass_dims: int
+    rerank_depth: int
+    k: int
+    queries: int
+    recall_at_k: float
+    bytes_per_vector: float
+    total_mib: float
+    p50_ms: float
+    p95_ms: float
+
+
+def _time_searches(index: Any, query_vectors: Sequence[np.ndarray], k: int, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        for vector in query_vectors:
+            started = time.perf_counter()
+            index.search(vector, k)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_quantization_report(
+    snapshot: Snapshot,
+    modes: Sequence[str] = QUANTIZATION_MODES,
+    first_pass_dims: Sequence[int] = (0,),
+    ks: Sequence[int] = (10,),
+    rerank_depth: int = retriever.VECTOR_RERANK_DEPTH,
+    repeat: int = 5,
+) -> List[QuantizationResult]:
+    """Measure recall@k against exact float32 search, and memory, for each quantized configuration.
+
+    Recall here is retrieval recall: the share of the exact top k that the
+    quantized index also returns in its top k, averaged over the snapshot's
+    queries. A first_pass_dims of 0 scans the full dimension. The float32
+    row is the baseline (recall 1 by definition).
+    """
+    exact = VectorIndex(snapshot.embedding_ids, snapshot.embeddings)
+    query_vectors = [snapshot.query_embeddings[query["query"]] for query in snapshot.queries]
+    rows = max(len(exact), 1)
+
+    configurations: List[tuple] = [("float32", 0, exact)]
+    for mode, dims in product(modes, first_pass_dims):
+        index = QuantizedVectorIndex.from_index(
+            exact, mode=mode, first_pass_dims=dims or None, rerank_depth=rerank_depth
+        )
+        configurations.append((mode, index.first_pass_dims, index))
+
+    results = []
+    for k in ks:
+        truth = [set(exact.search(vector, k)[0]) for vector in query_vectors]
+        for mode, dims, index in configurations:
+            recalls = [
+                len(expected.intersection(index.search(vector, k)[0])) / len(expected) if expected else 1.0
+                for vector, expected in zip(query_vectors, truth)
+            ]
+            timings = _time_searches(index, query_vectors, k, repeat) or [0.0]
+            nbytes = exact.matrix.nbytes if index is exact else index.nbytes
+            results.append(
+                QuantizationResult(
+                    mode=mode,
+                    first_pass_dims=dims or exact.dimension,
+                    rerank_depth=0 if index is exact else rerank_depth,
+                    k=k,
+                    queries=len(query_vectors),
+                    recall_at_k=float(np.mean(recalls)) if recalls else 1.0,
+                    bytes_per_vector=nbytes / rows,
+                    total_mib=nbytes / (1024 * 1024),
+                    p50_ms=float(np.percentile(timings, 50)),
+                    p95_ms=float(np.percentile(timings, 95)),
+                )
+            )
+    return results
+
+
+def format_quantization_results(results: Sequence[QuantizationResult]) -> str:
+    header = (
+        f"{'mode':<9}{'dims':>6}{'rerank':>8}{'k':>5}{'recall':>8}{'B/vec':>8}{'MiB':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.mode:<9}{r.first_pass_dims:>6}{r.rerank_depth:>8}{r.k:>5}{r.recall_at_k:>8.3f}"
+            f"{r.bytes_per_vector:>8.0f}{r.total_mib:>9.2f}{r.p50_ms:>9.2f}{r.p95_ms:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+# ----- approximate backends -----
+
+
+@dataclass
+class BackendResult:
+    backend: str
+    k: int
+    queries: int
+    rows: int
+    build_seconds: float
+    recall_at_k: float
+    p50_ms: float
+    p95_ms: float
+
+
+def run_backend_report(
+    snapshot: Snapshot,
+    backends: Sequence[str] = ("ivf",),
+    ks: Sequence[int] = (10,),
+    repeat: int = 5,
+    options: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[BackendResult]:
+    """Measure recall@k against exact search, build time and latency for each vector backend.
+
+    Recall is the share of the exact top k that the backend also returns in
+    its top k. The exact backend is always reported first as the baseline.
+    """
+    exact = VectorIndex(snapshot.embedding_ids, snapshot.embeddings)
+    query_vectors = [snapshot.query_embeddings[query["query"]] for query in snapshot.queries]
+
+    built = [("exact", exact, 0.0)]
+    for name in backends:
+        if name == "exact":
+            continue
+        started = time.perf_counter()
+        try:
+            index = build_vector_backend(name, exact, **(options or {}).get(name, {}))
+        except ImportError as e:
+            logger.warning(f"Skipping {name}: {e}")
+            continue
+        built.append((name, index, time.perf_counter() - started))
+
+    results = []
+    for k in ks:
+        truth = [set(exact.search(vector, k)[0]) for vector in query_vectors]
+        for name, index, build_seconds in built:
+            recalls = [
+                len(expected.intersection(index.search(vector, k)[0])) / len(expected) if expected else 1.0
+                for vector, expected in zip(query_vectors, truth)
+            ]
+            timings = _time_searches(index, query_vectors, k, repeat) or [0.0]
+            results.append(
+                BackendResult(
+                    backend=name,
+                    k=k,
+                    queries=len(query_vectors),
+                    rows=len(exact),
+                    build_seconds=build_seconds,
+                    recall_at_k=float(np.mean(recalls)) if recalls else 1.0,
+                    p50_ms=float(np.percentile(timings, 50)),
+                    p95_ms=float(np.percentile(timings, 95)),
+                )
+            )
+    return results
+
+
+def format_backend_results(results: Sequence[BackendResult]) -> str:
+    header = f"{'backend':<9}{'rows':>8}{'k':>6}{'recall':>8}{'build s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.backend:<9}{r.rows:>8}{r.k:>6}{r.recall_at_k:>8.3f}{r.build_seconds:>9.2f}"
+            f"{r.p50_ms:>9.2f}{r.p95_ms:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+# ----- CLI -----
+
+
+def parse_args(argv: Optional[Sequence[str]] = None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Offline search relevance and latency benchmark.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = subparsers.add_parser("snapshot", help="Freeze the live corpus and labelled queries (needs credentials)")
+    env_group = snapshot.add_mutually_exclusive_group(required=True)
+    env_group.add_argument("--dev", action="store_true", help="Read from dev using .env.dev")
+    env_group.add_argument("--prod", action="store_true", help="Read from production using .env.prod")
+    snapshot.add_argument("--labels", required=True, help="JSON query set with relevance labels")
+    snapshot.add_argument("--out", required=True, help="Snapshot directory to write")
+
+    synthetic = subparsers.add_parser("synthetic", help="Write a deterministic synthetic snapshot")
+    synthetic.add_argument("--out", required=True, help="Snapshot directory to write")
+    synthetic.add_argument("--seed", type=int, default=7)
+    synthetic.add_argument("--schemes-per-topic", type=int, default=40, help="Corpus size is 10x this")
+
+    run = subparsers.add_parser("run", help="Benchmark a snapshot offline")
+    run.add_argument("snapshot_dir")
+    run.add_argument("--fusion", nargs="+", default=["weighted_sum"], choices=sorted(FUSION_STRATEGIES))
+    run.add_argument("--threshold", nargs="+", type=float, default=[retriever.RELEVANCE_THRESHOLD])
+    run.add_argument("--retrieval-limit", nargs="+", type=int, default=[retriever.RETRIEVAL_LIMIT])
+    run.add_argument("--k", type=int, default=10, help="Cutoff for recall@k and nDCG@k")
+    run.add_argument("--repeat", type=int, default=5, help="Timed passes over the query set")
+    run.add_argument("--json", help="Also write results to this JSON file")
+
+    quantization = subparsers.add_parser("quantization", help="Recall vs memory of the quantized vector index")
+    quantization.add_argument("snapshot_dir")
+    quantization.add_argument("--mode", nargs="+", default=list(QUANTIZATION_MODES), choices=QUANTIZATION_MODES)
+    quantization.add_argument(
+        "--first-pass-dims", nargs="+", type=int, default=[0], help="Prefix lengths for the first pass (0 = full)"
+    )
+    quantization.add_argument("--rerank-depth", type=int, default=retriever.VECTOR_RERANK_DEPTH)
+    quantization.add_argument("--k", nargs="+", type=int, default=[10], help="Cutoffs for recall@k")
+    quantization.add_argument("--repeat", type=int, default=5, help="Timed passes over the query set")
+    quantization.add_argument("--json", help="Also write results to this JSON file")
+
+    backends = subparsers.add_parser("backends", help="Recall vs latency of the approximate vector backends")
+    backends.add_argument("snapshot_dir")
+    backends.add_argument("--backend", nargs="+", default=["ivf"], choices=sorted(VECTOR_BACKENDS))
+    backends.add_argument("--k", nargs="+", type=int, default=[10, retriever.RETRIEVAL_LIMIT])
+    backends.add_argument("--ivf-probe", type=int, default=0, help="IVF lists probed per query (0 = default)")
+    backends.add_argument("--repeat", type=int, default=5, help="Timed passes over the query set")
+    backends.add_argument("--json", help="Also write results to this JSON file")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+
+    if args.command == "snapshot":
+        build_live_snapshot(args.out, args.labels, is_prod=args.prod)
+        logger.info(f"Snapshot written to {args.out}")
+        return
+
+    if args.command == "synthetic":
+        build_synthetic_snapshot(args.out, schemes_per_topic=args.schemes_per_topic, seed=args.seed)
+        logger.info(f"Synthetic snapshot written to {args.out}")
+        return
+
+    snapshot = load_snapshot(args.snapshot_dir)
+    logger.info(
+        f"Loaded snapshot from {snapshot.manifest['source']}: {len(snapshot.schemes)} schemes, "
+        f"{len(snapshot.queries)} queries"
+    )
+    if args.command == "backends":
+        options = {"ivf": {"n_probe": args.ivf_probe or None}}
+        results = run_backend_report(snapshot, args.backend, args.k, repeat=args.repeat, options=options)
+        print(format_backend_results(results))
+    elif args.command == "quantization":
+        results = run_quantization_report(
+            snapshot, args.mode, args.first_pass_dims, args.k, rerank_depth=args.rerank_depth, repeat=args.repeat
+        )
+        print(format_quantization_results(results))
+    else:
+        results = run_benchmark(
+            snapshot, args.fusion, args.threshold, args.retrieval_limit, k=args.k, repeat=args.repeat
+        )
+        print(format_results(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"manifest": snapshot.manifest, "results": [asdict(r) for r in results]}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from .handler import QueryHandler
 from .types import PaginatedSearchParams, PredictParams
-from .retriever import SearchModel, fetch_schemes_by_ids, LLM_RESULT_LIMIT
+from .results import SearchResults
+from .retriever import SearchModel, afetch_schemes_by_ids, fetch_schemes_by_ids, LLM_RESULT_LIMIT
+from .scheme_store import SchemeStore, get_scheme_store
+from .query_log import QueryLogWriter, get_query_log, install_shutdown_flush, wait_until_written
 from .llm_projection import slim_for_llm, MINIMAL_LLM_KEYS
 
 __all__ = [
@@ -8,7 +11,15 @@ __all__ = [
     "PaginatedSearchParams",
     "PredictParams",
     "SearchModel",
+    "SearchResults",
     "fetch_schemes_by_ids",
+    "afetch_schemes_by_ids",
+    "SchemeStore",
+    "get_scheme_store",
+    "QueryLogWriter",
+    "get_query_log",
+    "install_shutdown_flush",
+    "wait_until_written",
     "LLM_RESULT_LIMIT",
     "slim_for_llm",
     "MINIMAL_LLM_KEYS",
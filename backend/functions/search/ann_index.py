@@ -0,0 +1,198 @@
+"""Approximate nearest-neighbour backends for the in-process vector index.
+
+Exact search scores every row, which is cheap for a few thousand schemes but
+grows linearly with the corpus (and with per-chunk embeddings). These
+backends trade a little recall for sub-linear search, and expose the same
+interface as VectorIndex (see vector_index.VectorBackend):
+
+- ivf: inverted file over spherical k-means centroids (pure NumPy). A query
+  scores the centroids, then only the rows in its closest lists, probing more
+  lists until there are at least `limit` candidates.
+- hnsw: hierarchical navigable small-world graph from the optional `hnswlib`
+  package.
+
+Distances are exact cosine distances on Firestore's COSINE scale, so scoring
+downstream is unchanged. A search restricted to `rows` (filter pushdown)
+scores those rows exactly: filters already shrink the set, and a graph or
+list walk could otherwise miss eligible rows.
+"""
+
+import math
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from .vector_index import VectorIndex, nearest_order
+
+
+try:
+    import hnswlib
+except ImportError:  # optional; only needed for SEARCH_VECTOR_BACKEND=hnsw
+    hnswlib = None
+
+
+class _ExactRows:
+    """Shared helpers for backends that keep the normalised float matrix."""
+
+    ids: list[str]
+    matrix: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def _query(self, query_vector: Sequence[float]) -> np.ndarray:
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            raise ValueError(f"Query vector has shape {query.shape}, index dimension is {self.dimension}")
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def _exact(self, query: np.ndarray, rows: np.ndarray, limit: int) -> tuple[list[str], list[float]]:
+        distances = 1.0 - self.matrix[rows] @ query
+        order = nearest_order(distances, limit)
+        return [self.ids[i] for i in rows[order]], distances[order].astype(float).tolist()
+
+    def search_many(self, query_vectors: Sequence[Sequence[float]], limit: int) -> list[tuple[list[str], list[float]]]:
+        return [self.search(query_vector, limit) for query_vector in query_vectors]
+
+
+class IVFVectorIndex(_ExactRows):
+    """Inverted-file index: rows bucketed by their nearest k-means centroid."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        n_lists: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        candidate_factor: float = 3.0,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        exact = VectorIndex(ids, vectors)
+        self.ids = exact.ids
+        self.matrix = exact.matrix
+        n = len(self.ids)
+        # sqrt(n) lists keeps both the centroid scan and each list scan near sqrt(n) rows.
+        self.n_lists = max(1, min(n_lists or int(round(math.sqrt(n))), n)) if n else 0
+        self.n_probe = max(1, min(n_probe or math.ceil(self.n_lists / 8), self.n_lists)) if n else 0
+        # Rows near a list boundary sit in a neighbouring list, so a pool of
+        # `limit` is drawn from about candidate_factor * limit scanned rows.
+        self.candidate_factor = candidate_factor
+
+        if not n:
+            self.centroids = np.empty((0, self.matrix.shape[1]), dtype=np.float32)
+            self.list_rows = np.empty(0, dtype=np.int64)
+            self.list_offsets = np.zeros(1, dtype=np.int64)
+            return
+
+        self.centroids = self._train(iterations, np.random.default_rng(seed))
+        assignments = np.argmax(self.matrix @ self.centroids.T, axis=1)
+        # Rows grouped by list (CSR layout): list i is list_rows[list_offsets[i]:list_offsets[i + 1]].
+        self.list_rows = np.argsort(assignments, kind="stable")
+        self.list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=self.n_lists))))
+
+    def _train(self, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        """Spherical k-means: centroids are normalised means of the rows assigned to them."""
+        centroids = self.matrix[rng.choice(len(self.ids), size=self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+            sums = self._list_sums(assignments)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            if empty.any():
+                # Re-seed empty lists from random rows rather than losing them.
+                sums[empty] = self.matrix[rng.choice(len(self.ids), size=int(empty.sum()))]
+                norms[empty] = 1.0
+            centroids = (sums / norms[:, None]).astype(np.float32)
+        return centroids
+
+    def _list_sums(self, assignments: np.ndarray) -> np.ndarray:
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=self.n_lists)
+        sums = np.zeros((self.n_lists, self.matrix.shape[1]), dtype=np.float32)
+        present = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+        sums[present] = np.add.reduceat(self.matrix[order], starts, axis=0)
+        return sums
+
+    def _candidates(self, query: np.ndarray, limit: int) -> np.ndarray:
+        order = np.argsort(-(self.centroids @ query), kind="stable")
+        sizes = np.diff(self.list_offsets)[order]
+        # Probe at least n_probe lists, and enough lists to fill the requested pool.
+        wanted = min(math.ceil(limit * self.candidate_factor), len(self.ids))
+        probes = max(self.n_probe, int(np.searchsorted(np.cumsum(sizes), wanted)) + 1)
+        lists = order[:probes]
+        return np.concatenate([self.list_rows[self.list_offsets[i] : self.list_offsets[i + 1]] for i in lists])
+
+    def search(
+        self, query_vector: Sequence[float], limit: int, rows: Optional[np.ndarray] = None
+    ) -> tuple[list[str], list[float]]:
+        """Return about the `limit` nearest ids and their cosine distances, nearest first."""
+        if not self.ids or limit <= 0 or (rows is not None and not len(rows)):
+            return [], []
+        query = self._query(query_vector)
+        if rows is not None:
+            return self._exact(query, np.asarray(rows), limit)
+        return self._exact(query, self._candidates(query, limit), limit)
+
+
+class HNSWVectorIndex(_ExactRows):
+    """HNSW graph over the normalised rows (inner product = cosine similarity), via hnswlib."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 128,
+    ):
+        if hnswlib is None:
+            raise ImportError("The hnsw vector backend needs the hnswlib package")
+        exact = VectorIndex(ids, vectors)
+        self.ids = exact.ids
+        self.matrix = exact.matrix
+        self.graph = hnswlib.Index(space="ip", dim=self.matrix.shape[1])
+        self.graph.init_index(max_elements=max(len(self.ids), 1), ef_construction=ef_construction, M=m)
+        if self.ids:
+            self.graph.add_items(self.matrix, np.arange(len(self.ids)))
+        # hnswlib searches with max(ef, k), so larger pools widen the search on their own.
+        self.graph.set_ef(ef_search)
+
+    def search(
+        self, query_vector: Sequence[float], limit: int, rows: Optional[np.ndarray] = None
+    ) -> tuple[list[str], list[float]]:
+        """Return about the `limit` nearest ids and their cosine distances, nearest first."""
+        if not self.ids or limit <= 0 or (rows is not None and not len(rows)):
+            return [], []
+        query = self._query(query_vector)
+        if rows is not None:
+            return self._exact(query, np.asarray(rows), limit)
+        k = min(limit, len(self.ids))
+        labels, _ = self.graph.knn_query(query, k=k)
+        # Re-score exactly so distances match the other backends bit for bit.
+        return self._exact(query, labels[0].astype(np.int64), k)
+
+
+VECTOR_BACKENDS = {
+    "exact": VectorIndex,
+    "ivf": IVFVectorIndex,
+    "hnsw": HNSWVectorIndex,
+}
+
+
+def build_vector_backend(name: str, index: VectorIndex, **options: Any):
+    """Build backend `name` over a loaded exact index ("exact" returns it unchanged)."""
+    if name not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector backend {name!r}; expected one of {sorted(VECTOR_BACKENDS)}")
+    if name == "exact":
+        return index
+    backend = VECTOR_BACKENDS[name](index.ids, index.matrix, **options)
+    logger.info(f"Built {name} vector backend over {len(backend)} rows")
+    return backend
@@ -0,0 +1,173 @@
+"""Corpus-level BM25 index over scheme `search_booster` text.
+
+The index (vocabulary, postings, document lengths) is built once over the whole
+scheme corpus instead of once per query over the candidate pool. Each posting
+stores its precomputed BM25 term weight, so scoring a query is one vectorised
+scatter-add per query term. Raw (unnormalised) scores are exposed for any subset
+of scheme IDs so the combiner can work with real relevance values.
+"""
+
+import re
+from collections import Counter
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Standard Okapi BM25 parameters.
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """Lower-case word tokens; punctuation and whitespace are separators."""
+    if not isinstance(text, str) or not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Sparse BM25 index with postings in CSR layout (term -> docs, weights)."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[Optional[str]],
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+    ):
+        if len(ids) != len(texts):
+            raise ValueError(f"Got {len(ids)} ids but {len(texts)} texts")
+
+        self.ids = list(ids)
+        self.positions = {scheme_id: i for i, scheme_id in enumerate(self.ids)}
+        self.k1 = k1
+        self.b = b
+
+        term_counts = [Counter(tokenize(text)) for text in texts]
+        self.doc_lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float32)
+        total_length = float(self.doc_lengths.sum())
+        self.avg_doc_length = total_length / len(self.ids) if total_length else 1.0
+
+        # Group (doc, tf) pairs by term to build the postings lists.
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_index, counts in enumerate(term_counts):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_index, tf))
+
+        self.vocabulary = {term: term_id for term_id, term in enumerate(postings)}
+        self.idf = np.zeros(len(self.vocabulary), dtype=np.float32)
+        indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        doc_indices = []
+        term_freqs = []
+        n_docs = len(self.ids)
+
+        for term, term_id in self.vocabulary.items():
+            term_postings = postings[term]
+            df = len(term_postings)
+            # Lucene-style IDF: always positive, so common terms never subtract.
+            self.idf[term_id] = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            indptr[term_id + 1] = indptr[term_id] + df
+            for doc_index, tf in term_postings:
+                doc_indices.append(doc_index)
+                term_freqs.append(tf)
+
+        self.indptr = indptr
+        self.doc_indices = np.array(doc_indices, dtype=np.int32)
+        tf = np.array(term_freqs, dtype=np.float32)
+        idf_per_posting = np.repeat(self.idf, np.diff(indptr))
+        self.weights = (idf_per_posting * self._saturate(tf, self.doc_lengths[self.doc_indices])).astype(np.float32)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        ids: Sequence[str],
+        vocabulary: Sequence[str],
+        idf: np.ndarray,
+        indptr: np.ndarray,
+        doc_indices: np.ndarray,
+        weights: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        avg_doc_length: float = 1.0,
+    ) -> "BM25Index":
+        """Rebuild an index from its saved arrays (see search.index_artifact); terms are in term-id order."""
+        if len(indptr) != len(vocabulary) + 1 or len(doc_lengths) != len(ids):
+            raise ValueError("BM25 arrays do not match the vocabulary and ids")
+        index = cls.__new__(cls)
+        index.ids = list(ids)
+        index.positions = {scheme_id: i for i, scheme_id in enumerate(index.ids)}
+        index.k1 = k1
+        index.b = b
+        index.avg_doc_length = avg_doc_length
+        index.vocabulary = {term: term_id for term_id, term in enumerate(vocabulary)}
+        index.idf = idf
+        index.indptr = indptr
+        index.doc_indices = doc_indices
+        index.weights = weights
+        index.doc_lengths = doc_lengths
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _saturate(self, tf: np.ndarray, doc_lengths: np.ndarray) -> np.ndarray:
+        """BM25 term-frequency saturation with document-length normalisation."""
+        norm = self.k1 * (1.0 - self.b + self.b * doc_lengths / self.avg_doc_length)
+        return tf * (self.k1 + 1.0) / (tf + norm)
+
+    def _query_terms(self, query_text: str) -> Counter:
+        return Counter(tokenize(query_text))
+
+    def score_all(self, query_text: str) -> np.ndarray:
+        """Raw BM25 scores for every document in the corpus, aligned with `ids`."""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term, query_tf in self._query_terms(query_text).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # Each doc appears at most once per postings list, so plain fancy
+            # indexing is a correct scatter-add here.
+            scores[self.doc_indices[start:end]] += query_tf * self.weights[start:end]
+        return scores
+
+    def score_text(self, query_text: str, text: Optional[str]) -> float:
+        """Score a document that is not in the index against the corpus statistics."""
+        counts = Counter(tokenize(text))
+        if not counts:
+            return 0.0
+        doc_length = np.float32(sum(counts.values()))
+        score = 0.0
+        for term, query_tf in self._query_terms(query_text).items():
+            term_id = self.vocabulary.get(term)
+            tf = counts.get(term)
+            if term_id is None or not tf:
+                continue
+            score += query_tf * float(self.idf[term_id] * self._saturate(np.float32(tf), doc_length))
+        return score
+
+    def scores(
+        self,
+        query_text: str,
+        scheme_ids: Sequence[str],
+        texts: Optional[Sequence[Optional[str]]] = None,
+    ) -> np.ndarray:
+        """Raw BM25 scores for `scheme_ids`, in the given order.
+
+        IDs missing from the index (e.g. schemes added since it was built) are
+        scored from `texts` when provided, otherwise they score 0.
+        """
+        all_scores = self.score_all(query_text)
+        positions = np.array([self.positions.get(scheme_id, -1) for scheme_id in scheme_ids], dtype=np.int64)
+        known = positions >= 0
+        result = np.zeros(len(positions), dtype=np.float32)
+        result[known] = all_scores[positions[known]]
+
+        if texts is not None and not known.all():
+            for i in np.flatnonzero(~known):
+                result[i] = self.score_text(query_text, texts[i])
+        return result
@@ -0,0 +1,168 @@
+"""Bounded LRU + TTL cache for search results.
+
+`SearchModel` used to keep ranked DataFrames in a plain class-level dict that
+grew without limit and survived reindexes. This cache bounds both the entry
+count and an approximate memory budget, expires entries after a TTL, and drops
+everything when the index generation changes. Hit/miss/eviction counters are
+exposed through `stats()`.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import pandas as pd
+
+from .results import SCORE_FIELDS, SearchResults
+
+
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+# Containers longer than this are sized from an evenly spaced sample.
+SIZE_SAMPLE = 16
+
+
+def normalize_query(query_text: str) -> str:
+    """Canonical form of a query for cache keys: case, punctuation and spacing removed.
+
+    "Elderly  financial help?" and "elderly financial help" share one entry.
+    """
+    return " ".join(_PUNCTUATION_PATTERN.sub(" ", query_text.lower()).split())
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate the in-memory footprint of a cached value in bytes.
+
+    DataFrames report their own deep usage, SearchResults their score arrays
+    plus scheme dicts; containers are walked a few levels deep, which is plenty
+    for lists of scheme dicts.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, SearchResults):
+        arrays = sum(getattr(value, name).nbytes for name in SCORE_FIELDS if getattr(value, name) is not None)
+        return sys.getsizeof(value) + arrays + estimate_size(value.ids) + estimate_size(value.schemes)
+    size = sys.getsizeof(value)
+    if _depth >= 3:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        items = list(value) if isinstance(value, set) else value
+        if len(items) > SIZE_SAMPLE:
+            # Long lists of similar scheme dicts: extrapolate from an even sample
+            # instead of walking every item on each cache write.
+            step = len(items) / SIZE_SAMPLE
+            sample = [items[int(i * step)] for i in range(SIZE_SAMPLE)]
+            size += int(sum(estimate_size(item, _depth + 1) for item in sample) * len(items) / SIZE_SAMPLE)
+        else:
+            size += sum(estimate_size(item, _depth + 1) for item in items)
+    return size
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache with a TTL, a memory budget and a generation stamp."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[Any, int, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation: Any = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it recently used, or `default` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                self._remove(key, size)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least-recently-used entries to stay within budget."""
+        size = self._sizeof(value)
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, self._entries[key][1])
+            if size > self.max_bytes:
+                # A single oversized value would flush the whole cache; skip it (the old value is stale either way).
+                return
+            self._entries[key] = (value, size, expires_at)
+            self.total_bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                oldest_key, (_, oldest_size, _) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_size)
+                self.evictions += 1
+
+    __setitem__ = set
+
+    def _remove(self, key: Hashable, size: int) -> None:
+        del self._entries[key]
+        self.total_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def set_generation(self, generation: Any) -> bool:
+        """Adopt a new index generation, dropping every entry if it changed.
+
+        Returns True when the cache was invalidated.
+        """
+        with self._lock:
+            if generation == self.generation:
+                return False
+            self.generation = generation
+            self._entries.clear()
+            self.total_bytes = 0
+            self.invalidations += 1
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and occupancy for logging/metrics."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
@@ -0,0 +1,170 @@
+"""Two-tier cache for query embeddings.
+
+Popular queries ("elderly financial help") and the agent's near-identical
+re-searches would otherwise pay an Azure embedding round trip every time.
+`CachedEmbeddings` wraps an embeddings client with an in-memory LRU and an
+optional persistent store (local disk or Firestore) holding float16-compressed
+vectors. Keys combine the embedding model, its dimension and the normalized
+query text, so changing either never serves a stale vector.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+
+from .cache import QueryResultCache, normalize_query
+
+
+# Firestore collection backing the persistent tier when SEARCH_EMBEDDING_CACHE=firestore.
+EMBEDDING_CACHE_COLLECTION = "queryEmbeddingCache"
+
+
+def embedding_cache_key(text: str, model_name: str, dimensions: int) -> str:
+    normalized = normalize_query(text)
+    return hashlib.sha256(f"{model_name}:{dimensions}:{normalized}".encode()).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """Persistent tier as one float16 `.npy` file per key under `directory`."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self.directory / f"{key}.npy"
+        if not path.exists():
+            return None
+        return np.load(path).astype(np.float32)
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        # Write then rename so concurrent readers never see a partial file.
+        tmp_path = self.directory / f"{key}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, vector.astype(np.float16))
+        os.replace(tmp_path, self.directory / f"{key}.npy")
+
+
+class FirestoreEmbeddingStore:
+    """Persistent tier shared across instances, one small document per key."""
+
+    def __init__(self, db: Any, collection: str = EMBEDDING_CACHE_COLLECTION):
+        self.db = db
+        self.collection = collection
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        doc = self.db.collection(self.collection).document(key).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict() or {}
+        return np.frombuffer(data["vector"], dtype=np.float16).astype(np.float32)
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        self.db.collection(self.collection).document(key).set(
+            {
+                "vector": vector.astype(np.float16).tobytes(),
+                "dimensions": int(vector.shape[0]),
+                "created_at": datetime.now(tz=timezone.utc),
+            }
+        )
+
+
+def build_embedding_store(spec: Optional[str], db: Any = None):
+    """Build the persistent tier from a config string.
+
+    "" / None -> memory only, "firestore" -> FirestoreEmbeddingStore,
+    "disk:<directory>" -> DiskEmbeddingStore.
+    """
+    if not spec:
+        return None
+    if spec == "firestore":
+        return FirestoreEmbeddingStore(db)
+    if spec.startswith("disk:"):
+        return DiskEmbeddingStore(spec[len("disk:") :])
+    raise ValueError(f"Unknown embedding cache store '{spec}'")
+
+
+class CachedEmbeddings:
+    """Drop-in wrapper for a LangChain embeddings client that caches query vectors."""
+
+    def __init__(
+        self,
+        model: Any,
+        model_name: str,
+        dimensions: int,
+        max_entries: int = 2048,
+        store: Any = None,
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.store = store
+        # float32 2048-dim vectors are ~8 KB each; the entry limit is the real bound.
+        self.memory = QueryResultCache(
+            max_entries=max_entries,
+            ttl_seconds=None,
+            sizeof=lambda vector: vector.nbytes,
+        )
+        self.store_hits = 0
+
+    def _key(self, text: str) -> str:
+        return embedding_cache_key(text, self.model_name, self.dimensions)
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self.memory.get(key)
+        if vector is not None or self.store is None:
+            return vector
+        try:
+            vector = self.store.get(key)
+        except Exception as e:
+            logger.warning(f"Embedding cache store read failed: {e}")
+            return None
+        if vector is not None:
+            self.store_hits += 1
+            self.memory[key] = vector
+        return vector
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self.memory[key] = vector
+        if self.store is None:
+            return
+        try:
+            self.store.put(key, vector)
+        except Exception as e:
+            logger.warning(f"Embedding cache store write failed: {e}")
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = np.asarray(self.model.embed_query(text), dtype=np.float32)
+            self._remember(key, vector)
+        return vector.tolist()
+
+    def embed_documents(self, texts: Sequence[str]) -> list[list[float]]:
+        """Embed many texts, sending only cache misses to the model in one batch."""
+        keys = [self._key(text) for text in texts]
+        vectors: list[Optional[np.ndarray]] = [self._lookup(key) for key in keys]
+
+        # Deduplicate misses so repeated texts in one batch are embedded once.
+        missing: dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+
+        if missing:
+            embedded = self.model.embed_documents(list(missing.values()))
+            fresh = {}
+            for key, vector in zip(missing, embedded):
+                fresh[key] = np.asarray(vector, dtype=np.float32)
+                self._remember(key, fresh[key])
+            vectors = [vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)]
+
+        return [vector.tolist() for vector in vectors]
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.memory.stats(), "store_hits": self.store_hits}
@@ -0,0 +1,126 @@
+"""Posting indexes for pushing `/schemes_search` filters down into retrieval.
+
+Filters are `{field: [allowed values]}`. A scheme matches a field when its
+value (or, for array fields, any element of it) is one of the allowed values,
+and it must match every field. `FilterIndex` keeps, for each filterable field
+and value, the sorted row positions of the schemes that carry it, aligned with
+the rows of the in-process `VectorIndex`. Intersecting those postings before
+scoring means only eligible rows are scored and ranked, instead of ranking the
+whole pool and discarding most of it afterwards.
+
+The same filters are translated into pre-filter `where` clauses for Firestore
+`find_nearest` (see `firestore_prefilters`). Neither path is trusted to be
+exact: postings are only rebuilt with the indexes, and Firestore can express a
+subset of the filters, so candidates are always re-checked with
+`matches_filters` after hydration.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+from google.cloud.firestore_v1 import FieldFilter
+
+
+# Scheme fields that can be pushed down. `agency` is a string; the rest are arrays.
+FILTER_FIELDS = ("agency", "planning_area", "scheme_type", "who_is_it_for", "what_it_gives")
+ARRAY_FILTER_FIELDS = FILTER_FIELDS[1:]
+# Firestore caps `in` / `array_contains_any` at 30 values, and the product of
+# all disjunctions in one query at 30 as well.
+FIRESTORE_DISJUNCTION_LIMIT = 30
+
+
+def field_values(value: Any) -> List[str]:
+    """The filterable values of one scheme field: a string, or the strings in an array."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+
+def matches_filters(scheme: Mapping[str, Any], filters: Mapping[str, Sequence[Any]]) -> bool:
+    """True if `scheme` has an allowed value for every filtered field."""
+    for field, allowed in filters.items():
+        allowed = set(allowed)
+        if not any(value in allowed for value in field_values(scheme.get(field))):
+            return False
+    return True
+
+
+def filter_key(filters: Optional[Mapping[str, Sequence[Any]]]) -> tuple:
+    """Order-independent, hashable form of `filters`, for cache keys."""
+    if not filters:
+        return ()
+    return tuple(sorted((field, tuple(sorted(set(allowed)))) for field, allowed in filters.items()))
+
+
+class FilterIndex:
+    """Per-field posting lists of row positions, aligned with a VectorIndex's rows."""
+
+    def __init__(self, ids: Sequence[str], schemes: Mapping[str, Mapping[str, Any]]):
+        rows: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+        for row, scheme_id in enumerate(ids):
+            scheme = schemes.get(scheme_id) or {}
+            for field in FILTER_FIELDS:
+                for value in dict.fromkeys(field_values(scheme.get(field))):
+                    rows[field].setdefault(value, []).append(row)
+
+        self.size = len(ids)
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {
+            field: {value: np.asarray(positions, dtype=np.int64) for value, positions in values.items()}
+            for field, values in rows.items()
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def rows(self, filters: Mapping[str, Sequence[Any]]) -> np.ndarray:
+        """Sorted row positions matching every indexed field in `filters`.
+
+        Values within a field are OR-ed (union of postings) and fields are
+        AND-ed (intersection). Fields that are not indexed are ignored here.
+        """
+        eligible: Optional[np.ndarray] = None
+        for field, allowed in filters.items():
+            postings = self.postings.get(field)
+            if postings is None:
+                continue
+            lists = [postings[value] for value in set(allowed) if value in postings]
+            matched = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+            eligible = matched if eligible is None else np.intersect1d(eligible, matched, assume_unique=True)
+            if not len(eligible):
+                break
+        return np.arange(self.size, dtype=np.int64) if eligible is None else eligible
+
+
+def firestore_prefilters(
+    filters: Mapping[str, Sequence[Any]], fields: Iterable[str] = FILTER_FIELDS
+) -> List[FieldFilter]:
+    """`where` clauses for find_nearest that narrow the candidates to (a superset of) `filters`.
+
+    Only `fields` (those the embeddings documents carry) are used. Firestore
+    allows a single `array_contains_any` per query and bounds the disjunction
+    size, so this pushes down `agency` (`in`) and the first array field that
+    fits; whatever is left is applied after hydration.
+    """
+    fields = set(fields)
+    clauses: List[FieldFilter] = []
+    budget = FIRESTORE_DISJUNCTION_LIMIT
+
+    agency = list(dict.fromkeys(filters.get("agency") or ()))
+    if "agency" in fields and agency and len(agency) <= budget:
+        clauses.append(FieldFilter("agency", "in", agency))
+        budget //= len(agency)
+
+    for field in ARRAY_FILTER_FIELDS:
+        values = list(dict.fromkeys(filters.get(field) or ()))
+        if field in fields and values and len(values) <= budget:
+            clauses.append(FieldFilter(field, "array_contains_any", values))
+            break
+    return clauses
+
+
+def build_filter_index(ids: Sequence[str], schemes: Iterable[Mapping[str, Any]]) -> FilterIndex:
+    """FilterIndex over `ids` from scheme dicts carrying a `scheme_id`."""
+    by_id = {scheme["scheme_id"]: scheme for scheme in schemes if scheme.get("scheme_id")}
+    return FilterIndex(ids, by_id)
@@ -0,0 +1,102 @@
+"""Strategies for fusing vector and BM25 scores into one relevance score.
+
+Every strategy works on the precomputed, position-aligned score arrays of a
+candidate pool, so switching strategy is a few vectorised operations and never
+another retrieval pass. All strategies return scores in 0-1 (best candidate
+near 1) so the relevance threshold keeps its meaning, although the score
+distributions differ and the threshold should be tuned per strategy.
+
+- weighted_sum: 0.7 * vector relevance + 0.3 * max-normalized BM25.
+- rrf: reciprocal rank fusion over the vector and BM25 rankings; candidates
+  with no term overlap get no BM25 contribution.
+- zscore: weighted sum of per-signal z-scores, rescaled to 0-1 over the pool.
+"""
+
+import os
+from typing import Callable, Optional
+
+import numpy as np
+
+
+VEC_SIMILARITY_WEIGHT = 0.7
+BM25_SIMILARITY_WEIGHT = 0.3
+# Standard RRF damping constant; larger values flatten the rank curve.
+RRF_K = 60
+
+DEFAULT_FUSION_STRATEGY = os.getenv("SEARCH_FUSION_STRATEGY", "weighted_sum")
+
+
+def normalize_bm25_scores(raw_scores: np.ndarray) -> np.ndarray:
+    """Scale raw BM25 scores to 0-1 by the best score in the pool.
+
+    Dividing by the maximum (rather than min-max) keeps "no term overlap" at 0
+    and preserves the relative gaps between matching documents.
+    """
+    best = float(raw_scores.max()) if len(raw_scores) else 0.0
+    if best <= 0:
+        return np.zeros(len(raw_scores), dtype=np.float32)
+    return raw_scores / best
+
+
+def _rescale(scores: np.ndarray) -> np.ndarray:
+    """Min-max scale to 0-1; a flat pool scores 1 everywhere."""
+    if not len(scores):
+        return scores.astype(np.float32)
+    lo, hi = scores.min(), scores.max()
+    if hi <= lo:
+        return np.ones(len(scores), dtype=np.float32)
+    return ((scores - lo) / (hi - lo)).astype(np.float32)
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    """1-based rank of each position, best score first (ties by position)."""
+    order = np.argsort(-scores, kind="stable")
+    ranks = np.empty(len(scores), dtype=np.float32)
+    ranks[order] = np.arange(1, len(scores) + 1, dtype=np.float32)
+    return ranks
+
+
+def _zscores(scores: np.ndarray) -> np.ndarray:
+    std = scores.std()
+    if std == 0:
+        return np.zeros(len(scores), dtype=np.float32)
+    return (scores - scores.mean()) / std
+
+
+def weighted_sum(vec_scores: np.ndarray, bm25_raw_scores: np.ndarray) -> np.ndarray:
+    bm25_scores = normalize_bm25_scores(bm25_raw_scores)
+    return (vec_scores * VEC_SIMILARITY_WEIGHT + bm25_scores * BM25_SIMILARITY_WEIGHT).astype(np.float32)
+
+
+def reciprocal_rank_fusion(vec_scores: np.ndarray, bm25_raw_scores: np.ndarray) -> np.ndarray:
+    fused = 1.0 / (RRF_K + _ranks(vec_scores))
+    matched = bm25_raw_scores > 0
+    fused[matched] += 1.0 / (RRF_K + _ranks(bm25_raw_scores)[matched])
+    return _rescale(fused)
+
+
+def zscore_fusion(vec_scores: np.ndarray, bm25_raw_scores: np.ndarray) -> np.ndarray:
+    fused = VEC_SIMILARITY_WEIGHT * _zscores(vec_scores) + BM25_SIMILARITY_WEIGHT * _zscores(bm25_raw_scores)
+    return _rescale(fused)
+
+
+FUSION_STRATEGIES: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "weighted_sum": weighted_sum,
+    "rrf": reciprocal_rank_fusion,
+    "zscore": zscore_fusion,
+}
+
+
+def resolve_fusion_strategy(strategy: Optional[str] = None) -> str:
+    """Return the strategy name to use, falling back to the configured default."""
+    name = strategy or DEFAULT_FUSION_STRATEGY
+    if name not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy '{name}'; expected one of {sorted(FUSION_STRATEGIES)}")
+    return name
+
+
+def fuse(vec_scores: np.ndarray, bm25_raw_scores: np.ndarray, strategy: Optional[str] = None) -> np.ndarray:
+    """Combined 0-1 relevance for each candidate under the chosen strategy."""
+    vec_scores = np.asarray(vec_scores, dtype=np.float32)
+    bm25_raw_scores = np.asarray(bm25_raw_scores, dtype=np.float32)
+    return FUSION_STRATEGIES[resolve_fusion_strategy(strategy)](vec_scores, bm25_raw_scores)
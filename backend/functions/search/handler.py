@@ -1,31 +1,27 @@
 import os
+import threading
 from datetime import datetime, timezone
 from uuid import uuid1
-from typing import Any
+from typing import Any, Optional
+
+import numpy as np
 
-import pandas as pd
 from loguru import logger
 from integrations import FirebaseManager
-from utils.pagination import decode_cursor, get_paginated_results
+from utils.pagination import decode_cursor, encode_offset_cursor, get_paginated_results
 from .types import PredictParams, PaginatedSearchParams
+from .query_log import get_query_log, wait_until_written
 from .retriever import SearchModel
+from .results import SCORE_FIELDS, SearchResults
+from .session_results import compact_results, hydrate_scheme_ids
+from .session_snapshots import get_session_snapshots
+from .timing import collect_timings, span
 
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "True"
 # LLM_SEARCH_RESULT_KEYS = ["scheme_type", "scheme_id", "agency", "image", "scheme_name", "summary", "description"]
 
 
-# Convert any Timestamp objects in results_json to strings
-def convert_timestamps_to_strings(obj):
-    if isinstance(obj, dict):
-        return {k: convert_timestamps_to_strings(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_timestamps_to_strings(elem) for elem in obj]
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    return obj
-
-
 class QueryHandler:
     """Core handler that delegates search to `SearchModel` (in retriever.py) and
     handles persistence/pagination concerns.
@@ -35,63 +31,60 @@ class QueryHandler:
         self.search_model = SearchModel(firebase_manager)
         self.__class__.firebase_manager = firebase_manager
 
-    def _sanitize_for_firestore(self, data):
-        """
-        Sanitize data for Firestore by removing NaN/NaT values.
+    def _persist_query(self, collection: str, doc_id: str, record: dict) -> Optional[threading.Event]:
+        """Queue a query record for batched writing, or write it inline if the queue is disabled.
+
+        Returns the queued record's completion event, or None if it was written inline.
         """
-        if isinstance(data, dict):
-            return {k: self._sanitize_for_firestore(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self._sanitize_for_firestore(item) for item in data]
-        elif isinstance(data, float) and pd.isna(data):
-            return None
-        elif pd.isna(data):
-            return None
-        elif isinstance(data, datetime):
-            return int(data.timestamp())
-        return data
-
-    def save_user_query(self, query: str, session_id: str, schemes_response: list[dict[str, str | int]]) -> None:
-        """Save user query to firestore"""
-
-        sanitized_response = self._sanitize_for_firestore(schemes_response)
+        query_log = get_query_log(self.__class__.firebase_manager)
+        if query_log is not None:
+            return query_log.submit(collection, doc_id, record)
+        self.__class__.firebase_manager.firestore_client.collection(collection).document(doc_id).set(record)
+        return None
+
+    def save_user_query(
+        self, query: str, session_id: str, schemes_response: list[dict[str, str | int]]
+    ) -> Optional[threading.Event]:
+        """Save user query to firestore (batched; see search.query_log). Pass the result to `wait_until_written`."""
 
         user_query = {
             "query_text": query,
             "query_timestamp": datetime.now(tz=timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"),
-            "schemes_response": sanitized_response,
             "session_id": session_id,
+            # Scheme IDs and scores only; readers re-hydrate via search.session_results
+            **compact_results(schemes_response, SearchModel.index_generation),
         }
 
         try:
             # Add to 'userQuery' collection in firestore with document name = session_id
-            self.__class__.firebase_manager.firestore_client.collection("userQuery").document(session_id).set(
-                user_query
-            )
-            logger.info(f"Successfully saved session {session_id} to Firestore")
+            written = self._persist_query("userQuery", session_id, user_query)
+            logger.info(f"Queued session {session_id} for Firestore")
+            return written
         except Exception as e:
             logger.exception(f"Failed to save session {session_id} to Firestore", e)
             raise e
 
-    def save_llm_query(self, query: str, session_id: str, schemes_response: list[dict[str, str | int]]) -> None:
-        """Save user query to firestore"""
+    def save_llm_query(self, query: str, session_id: str, schemes_response: list[dict[str, str | int]]) -> str:
+        """Save agent query to firestore and return its document ID.
 
-        sanitized_response = self._sanitize_for_firestore(schemes_response)
+        Written before returning, not queued: the agent's filter_rerank tool
+        reads it back in a later request, possibly on another instance.
+        """
 
         user_query = {
             "query_text": query,
             "query_timestamp": datetime.now(tz=timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"),
-            "schemes_response": sanitized_response,
             "session_id": session_id,
+            # Scheme IDs and scores only; readers re-hydrate via search.session_results
+            **compact_results(schemes_response, SearchModel.index_generation),
         }
 
         try:
-            # Add to 'userQuery' collection in firestore with document name = session_id
-            update_time, doc_ref = self.__class__.firebase_manager.firestore_client.collection("llmQuery").add(
-                user_query
-            )
-            logger.info(f"Successfully saved session {session_id} to Firestore")
-            return doc_ref.id
+            # Add to 'llmQuery' collection under an ID allocated client-side
+            ref = self.__class__.firebase_manager.firestore_client.collection("llmQuery").document()
+            ref.set(user_query)
+            logger.info(f"Saved session {session_id} to Firestore")
+            return ref.id
         except Exception as e:
             logger.exception(f"Failed to save session {session_id} to Firestore", e)
             raise e
@@ -99,76 +92,151 @@ class QueryHandler:
     def predict(self, params: PredictParams) -> dict[str, Any]:
         """Main method to be called by endpoint handler"""
 
-        final_results = self.search_model.aggregate_and_rank_results(
-            params.query, params.top_k, params.similarity_threshold
-        )
+        with collect_timings("predict", force=params.debug) as timings:
+            with span("retrieve_and_rank"):
+                final_results = self.search_model.aggregate_and_rank_results(
+                    params.query, params.similarity_threshold, params.top_k, fusion=params.fusion
+                )
 
-        session_id = str(uuid1())
-        results_dict = final_results.to_dict(orient="records")
+            session_id = str(uuid1())
+            results_dict = final_results.to_records()
 
-        if not params.is_warmup:
-            self.save_user_query(params.query, session_id, results_dict)
+            written = None
+            if not params.is_warmup:
+                with span("save_user_query"):
+                    written = self.save_user_query(params.query, session_id, results_dict)
 
-        results_json = {"sessionID": session_id, "data": results_dict, "mh": 0.7}
+            results_json = {"sessionID": session_id, "data": results_dict, "mh": 0.7}
+            # Once the response is sent the instance may get no CPU to write the record (see search.query_log).
+            with span("await_query_log"):
+                wait_until_written(written)
+            if params.debug and timings is not None:
+                results_json["timings"] = timings.as_dict()
 
         return results_json
 
+    def _ranked_for_session(self, params: PaginatedSearchParams) -> SearchResults:
+        """Everything eligible under the request's filters and above the similarity threshold (at most top_k).
+
+        Filters are pushed down into retrieval, so only eligible schemes are
+        scored and the cap applies to them (see search.filter_index).
+        """
+        with span("retrieve_and_rank"):
+            return self.search_model.aggregate_and_rank_results(
+                params.query,
+                params.similarity_threshold,
+                params.top_k,
+                fusion=params.fusion,
+                filters=params.filters or None,
+            )
+
+    def _snapshot_session(self, session_id: str, query: str, results: SearchResults) -> None:
+        """Save the ranked IDs and scores so later pages are slices of this ordering."""
+        scores = results.combined_scores.tolist() if results.combined_scores is not None else [None] * len(results)
+        # Every score the first page's records carry, so later pages have the same fields.
+        component_scores = {
+            key: getattr(results, name).tolist()
+            for name, key in SCORE_FIELDS.items()
+            if name != "combined_scores" and getattr(results, name) is not None
+        }
+        with span("save_snapshot"):
+            get_session_snapshots(self.__class__.firebase_manager).save(
+                session_id, query, results.ids, scores, SearchModel.index_generation, component_scores
+            )
+
     def predict_paginated(self, params: PaginatedSearchParams) -> dict[str, Any]:
-        """Method for paginated search results"""
+        """Method for paginated search results.
 
-        # Use the top_k parameter for vector search
-        internal_top_k = params.top_k
+        The first page ranks the query and snapshots the ranked scheme IDs for
+        the session; cursors hold an offset into that snapshot, so later pages
+        only hydrate their own slice (see search.session_snapshots). If the
+        snapshot has expired, the query is ranked again and sliced at the offset.
+        """
 
-        # Check if we have a cursor and extract session_id from it
+        # Check if we have a cursor and extract session_id (and snapshot offset) from it
         session_id = None
-        if params.cursor:
-            cursor_data = decode_cursor(params.cursor)
-            if cursor_data and "session_id" in cursor_data:
-                session_id = cursor_data.get("session_id")
+        cursor_data = decode_cursor(params.cursor) if params.cursor else None
+        if cursor_data and "session_id" in cursor_data:
+            session_id = cursor_data.get("session_id")
+        offset: Optional[int] = None
+        if session_id and isinstance(cursor_data.get("offset"), int):
+            offset = max(cursor_data["offset"], 0)
 
         # Generate a new session ID if this is a fresh search
         if not session_id:
             session_id = str(uuid1())
 
-        # Get complete results first (using top_k)
-        complete_results = self.search_model.aggregate_and_rank_results(
-            params.query, internal_top_k, params.similarity_threshold
-        )
-
-        filters = params.filters
-        if filters:
-            for field, criteria in filters.items():
-                complete_results = complete_results[complete_results[field].isin(criteria)]
-
-        # Convert to dict records for pagination
-        complete_results_dict = complete_results.to_dict(orient="records")
-
-        # Get paginated results with session ID
-        page_results, next_cursor, has_more, total_count = get_paginated_results(
-            complete_results_dict,
-            limit=params.limit,
-            cursor=params.cursor,
-            session_id=session_id,
-        )
-
-        # Skip saving to Firestore if this is a warmup request
-        if not params.is_warmup and params.cursor is None:
-            results_to_save = page_results if page_results else []
-            self.save_user_query(params.query, session_id, results_to_save)
-
-        # Return the paginated results
-        results_json = {
-            "sessionID": session_id,
-            "data": page_results,
-            "total_count": total_count,
-            "next_cursor": next_cursor,
-            "has_more": has_more,
-        }
-
-        results_json = convert_timestamps_to_strings(results_json)
+        with collect_timings("predict_paginated", force=params.debug) as timings:
+            if params.cursor and offset is None:
+                # Cursor issued before snapshots existed: page by scheme ID and score as before
+                page_results, next_cursor, has_more, total_count = self._paginate_legacy(params, session_id)
+            else:
+                offset = offset or 0
+                snapshot = None
+                if params.cursor:
+                    with span("load_snapshot"):
+                        snapshot = get_session_snapshots(self.__class__.firebase_manager).load(session_id)
+
+                if snapshot is not None:
+                    with span("paginate"):
+                        page_ids, page_scores = snapshot.page(offset, params.limit)
+                        page_results = hydrate_scheme_ids(
+                            self.__class__.firebase_manager,
+                            page_ids,
+                            page_scores,
+                            snapshot.query,
+                            epoch_timestamps=False,
+                            component_scores=snapshot.component_page(offset, params.limit),
+                        )
+                    total_count = len(snapshot)
+                else:
+                    complete_results = self._ranked_for_session(params)
+                    if not params.is_warmup:
+                        self._snapshot_session(session_id, params.query, complete_results)
+                    with span("paginate"):
+                        end = min(offset + params.limit, len(complete_results))
+                        page_results = complete_results.take(np.arange(offset, max(end, offset))).to_records()
+                    total_count = len(complete_results)
+
+                has_more = offset + params.limit < total_count
+                next_cursor = encode_offset_cursor(session_id, offset + params.limit) if has_more else None
+
+            # Skip saving to Firestore if this is a warmup request
+            written = None
+            if not params.is_warmup and params.cursor is None:
+                results_to_save = page_results if page_results else []
+                with span("save_user_query"):
+                    written = self.save_user_query(params.query, session_id, results_to_save)
+
+            # Return the paginated results
+            results_json = {
+                "sessionID": session_id,
+                "data": page_results,
+                "total_count": total_count,
+                "next_cursor": next_cursor,
+                "has_more": has_more,
+            }
+
+            # Once the response is sent the instance may get no CPU to write the record (see search.query_log).
+            with span("await_query_log"):
+                wait_until_written(written)
+            if params.debug and timings is not None:
+                results_json["timings"] = timings.as_dict()
 
         return results_json
 
+    def _paginate_legacy(
+        self, params: PaginatedSearchParams, session_id: str
+    ) -> tuple[list, Optional[str], bool, int]:
+        complete_results = self._ranked_for_session(params)
+        with span("paginate"):
+            return get_paginated_results(
+                complete_results.to_records(),
+                limit=params.limit,
+                cursor=params.cursor,
+                session_id=session_id,
+            )
+
     def predict_for_agent(self, params: PredictParams) -> dict[str, Any]:
         """Method to be called by agent for search tool.
 
@@ -178,20 +246,65 @@ class QueryHandler:
         the agent can explain the gap.
         """
 
-        final_results = self.search_model.aggregate_and_rank_results(
-            params.query,
-            params.similarity_threshold,
-            params.requested_target,
-        )
+        with collect_timings("predict_for_agent", force=params.debug) as timings:
+            with span("retrieve_and_rank"):
+                final_results = self.search_model.aggregate_and_rank_results(
+                    params.query,
+                    params.similarity_threshold,
+                    params.requested_target,
+                    fusion=params.fusion,
+                )
 
+            results_json = self._agent_response(params, final_results)
+            if params.debug and timings is not None:
+                results_json["timings"] = timings.as_dict()
+
+        return results_json
+
+    def predict_many_for_agent(self, params_list: list[PredictParams]) -> list[dict[str, Any]]:
+        """`predict_for_agent` for several searches issued in one agent turn, one response each in order.
+
+        Queries sharing a threshold and fusion strategy are retrieved together
+        (see SearchModel.aggregate_and_rank_many): one embedding call, one
+        scoring pass and one hydration for the batch.
+        """
+        debug = any(params.debug for params in params_list)
+        with collect_timings("predict_many_for_agent", force=debug) as timings:
+            groups: dict[tuple, list[int]] = {}
+            for i, params in enumerate(params_list):
+                groups.setdefault((params.similarity_threshold, params.fusion), []).append(i)
+
+            final_results: list[Optional[SearchResults]] = [None] * len(params_list)
+            with span("retrieve_and_rank"):
+                for (threshold, fusion), positions in groups.items():
+                    ranked = self.search_model.aggregate_and_rank_many(
+                        [params_list[i].query for i in positions],
+                        threshold,
+                        [params_list[i].requested_target for i in positions],
+                        fusion=fusion,
+                    )
+                    for i, results in zip(positions, ranked):
+                        final_results[i] = results
+
+            responses = [self._agent_response(params, results) for params, results in zip(params_list, final_results)]
+            if timings is not None:
+                for params, results_json in zip(params_list, responses):
+                    if params.debug:
+                        results_json["timings"] = timings.as_dict()
+
+        return responses
+
+    def _agent_response(self, params: PredictParams, final_results: SearchResults) -> dict[str, Any]:
+        """Save the agent query and build its tool response, flagging any shortfall against the requested count."""
         session_id = params.session_id if params.session_id else str(uuid1())
-        results_dict = final_results.to_dict(orient="records")
+        results_dict = final_results.to_records()
 
-        doc_id = self.save_llm_query(params.query, session_id, results_dict)
+        with span("save_llm_query"):
+            doc_id = self.save_llm_query(params.query, session_id, results_dict)
 
         shortfall = params.requested_target is not None and len(results_dict) < params.requested_target
 
-        results_json = {
+        return {
             "session_id": session_id,
             "docID": doc_id,
             "data": results_dict,
@@ -200,8 +313,6 @@ class QueryHandler:
             "mh": 0.7,
         }
 
-        return results_json
-
 
 if __name__ == "__main__":
     # Example usage
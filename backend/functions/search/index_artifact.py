@@ -0,0 +1,241 @@
+"""Versioned on-disk artifact of the search indexes.
+
+Building the in-process indexes at cold start means streaming every
+schemes_embeddings document and every scheme's search_booster from Firestore.
+The reindex job instead publishes the finished indexes as flat binary arrays,
+and instances memory-map them (`np.load(mmap_mode="r")`), so start-up reads
+only the pages a query touches and several processes share one copy.
+
+One artifact version (a directory locally, or a prefix in Cloud Storage):
+    manifest.json       format, version, corpus_hash, created_at, rows, dimension, files
+    ids.json            scheme ID of every embedding row
+    embeddings.npy      float32 (rows, dimension), L2-normalised
+    bm25.json           BM25 ids, vocabulary (in term-id order), k1, b, avg_doc_length
+    bm25_<array>.npy    BM25 idf, indptr, doc_indices, weights and doc_lengths
+
+The location root holds `LATEST`, naming the newest version. It is written
+last, so readers never see a partially published version. `corpus_hash` is a
+SHA-256 over every data file: an instance that already has that corpus mapped
+keeps it instead of swapping to an identical copy.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from .bm25_index import BM25Index
+from .vector_index import VectorIndex
+
+
+ARTIFACT_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+BM25_ARRAYS = ("idf", "indptr", "doc_indices", "weights", "doc_lengths")
+# Where instances keep versions downloaded from Cloud Storage (memmap needs a local file).
+ARTIFACT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "search_index_artifacts")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalArtifactStore:
+    """Artifact versions as sub-directories of a local (or mounted) directory."""
+
+    def __init__(self, directory: str):
+        self.root = Path(directory)
+
+    def read_latest(self) -> Optional[str]:
+        path = self.root / LATEST_FILE
+        if not path.exists():
+            return None
+        return path.read_text().strip() or None
+
+    def publish(self, version: str, files_dir: Path) -> None:
+        target = self.root / version
+        self.root.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(files_dir, target)
+        # Write then rename so readers never see a partial pointer.
+        tmp_path = self.root / f"{LATEST_FILE}.{os.getpid()}.tmp"
+        tmp_path.write_text(version)
+        os.replace(tmp_path, self.root / LATEST_FILE)
+
+    def local_dir(self, version: str) -> Path:
+        return self.root / version
+
+
+class GCSArtifactStore:
+    """Artifact versions under `gs://<bucket>/<prefix>/`, downloaded once per instance."""
+
+    def __init__(self, uri: str, cache_dir: str = ARTIFACT_CACHE_DIR):
+        from google.cloud import storage
+
+        bucket, _, prefix = uri.removeprefix("gs://").partition("/")
+        self.bucket = storage.Client().bucket(bucket)
+        self.prefix = prefix.strip("/")
+        self.cache_dir = Path(cache_dir)
+
+    def _blob(self, *parts: str):
+        return self.bucket.blob("/".join(part for part in (self.prefix, *parts) if part))
+
+    def read_latest(self) -> Optional[str]:
+        blob = self._blob(LATEST_FILE)
+        if not blob.exists():
+            return None
+        return blob.download_as_text().strip() or None
+
+    def publish(self, version: str, files_dir: Path) -> None:
+        # The manifest goes after the data files and LATEST after the manifest.
+        for path in sorted(files_dir.iterdir(), key=lambda p: p.name == MANIFEST_FILE):
+            self._blob(version, path.name).upload_from_filename(str(path))
+        self._blob(LATEST_FILE).upload_from_string(version)
+
+    def local_dir(self, version: str) -> Path:
+        target = self.cache_dir / version
+        if (target / MANIFEST_FILE).exists():
+            return target
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{version}.", dir=self.cache_dir))
+        manifest = json.loads(self._blob(version, MANIFEST_FILE).download_as_text())
+        for name, meta in manifest["files"].items():
+            self._blob(version, name).download_to_filename(str(staging / name))
+            if _sha256(staging / name) != meta["sha256"]:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise ValueError(f"Checksum mismatch for {name} in artifact {version}")
+        (staging / MANIFEST_FILE).write_text(json.dumps(manifest))
+        try:
+            os.replace(staging, target)
+        except OSError:
+            # Another process finished the same download first.
+            shutil.rmtree(staging, ignore_errors=True)
+        return target
+
+
+def build_artifact_store(location: Optional[str]):
+    """"" / None -> no artifact, "gs://bucket/prefix" -> Cloud Storage, anything else -> local directory."""
+    if not location:
+        return None
+    if location.startswith("gs://"):
+        return GCSArtifactStore(location)
+    return LocalArtifactStore(location)
+
+
+class IndexArtifact:
+    """The vector and BM25 indexes of one artifact version, backed by memory-mapped arrays."""
+
+    def __init__(self, manifest: Dict[str, Any], vector_index: VectorIndex, bm25_index: BM25Index):
+        self.manifest = manifest
+        self.vector_index = vector_index
+        self.bm25_index = bm25_index
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def corpus_hash(self) -> str:
+        return self.manifest["corpus_hash"]
+
+
+def write_index_files(directory: Path, version: str, vector_index: VectorIndex, bm25_index: BM25Index) -> Dict:
+    """Write one artifact version's files into `directory` and return its manifest."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / "ids.json", "w") as f:
+        json.dump(vector_index.ids, f)
+    np.save(directory / "embeddings.npy", np.ascontiguousarray(vector_index.matrix, dtype=np.float32))
+    with open(directory / "bm25.json", "w") as f:
+        json.dump(
+            {
+                "ids": bm25_index.ids,
+                "vocabulary": sorted(bm25_index.vocabulary, key=bm25_index.vocabulary.get),
+                "k1": bm25_index.k1,
+                "b": bm25_index.b,
+                "avg_doc_length": bm25_index.avg_doc_length,
+            },
+            f,
+        )
+    for name in BM25_ARRAYS:
+        np.save(directory / f"bm25_{name}.npy", getattr(bm25_index, name))
+
+    files = sorted(path.name for path in directory.iterdir() if path.name != MANIFEST_FILE)
+    checksums = {name: _sha256(directory / name) for name in files}
+    corpus = hashlib.sha256("".join(f"{name}:{checksums[name]}\n" for name in files).encode()).hexdigest()
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "corpus_hash": corpus,
+        "created_at": datetime.now(tz=timezone.utc).isoformat(),
+        "rows": len(vector_index),
+        "dimension": vector_index.dimension,
+        "bm25_documents": len(bm25_index),
+        "files": {name: {"bytes": (directory / name).stat().st_size, "sha256": checksums[name]} for name in files},
+    }
+    with open(directory / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def publish_index_artifact(location: str, version: str, vector_index: VectorIndex, bm25_index: BM25Index) -> Dict:
+    """Write a new artifact version to `location` and point LATEST at it. Returns its manifest."""
+    store = build_artifact_store(location)
+    if store is None:
+        raise ValueError("No artifact location given")
+    with tempfile.TemporaryDirectory() as staging:
+        manifest = write_index_files(Path(staging), version, vector_index, bm25_index)
+        store.publish(version, Path(staging))
+    logger.info(f"Published search index artifact {version} ({manifest['corpus_hash'][:12]}) to {location}")
+    return manifest
+
+
+def read_index_files(directory: Path) -> IndexArtifact:
+    """Memory-map one artifact version."""
+    with open(directory / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported index artifact format {manifest.get('format')!r}")
+
+    with open(directory / "ids.json") as f:
+        ids = json.load(f)
+    vector_index = VectorIndex.from_normalised(ids, np.load(directory / "embeddings.npy", mmap_mode="r"))
+    with open(directory / "bm25.json") as f:
+        bm25 = json.load(f)
+    arrays = {name: np.load(directory / f"bm25_{name}.npy", mmap_mode="r") for name in BM25_ARRAYS}
+    bm25_index = BM25Index.from_arrays(
+        bm25["ids"], bm25["vocabulary"], k1=bm25["k1"], b=bm25["b"], avg_doc_length=bm25["avg_doc_length"], **arrays
+    )
+    if len(vector_index) != manifest["rows"] or len(bm25_index) != manifest["bm25_documents"]:
+        raise ValueError(f"Artifact {manifest['version']} does not match its manifest")
+    return IndexArtifact(manifest, vector_index, bm25_index)
+
+
+def load_latest_artifact(location: str, current: Optional[IndexArtifact] = None) -> Optional[IndexArtifact]:
+    """Map the newest artifact version at `location`, or return None if none has been published.
+
+    Returns `current` itself when the newest version has the same corpus_hash,
+    so an instance never swaps to an identical copy of what it already serves.
+    Files downloaded from Cloud Storage are checked against the manifest.
+    """
+    store = build_artifact_store(location)
+    version = store.read_latest() if store is not None else None
+    if version is None:
+        return None
+    directory = store.local_dir(version)
+    with open(directory / MANIFEST_FILE) as f:
+        corpus_hash = json.load(f).get("corpus_hash")
+    if current is not None and corpus_hash == current.corpus_hash:
+        return current
+    return read_index_files(directory)
@@ -0,0 +1,172 @@
+"""Quantized in-process cosine index over `schemes_embeddings`.
+
+A 2048-dim float32 embedding costs 8 KB per scheme, held in every instance.
+`QuantizedVectorIndex` keeps the L2-normalised rows as float16 (4 KB) or as
+int8 codes with one scale per dimension (2 KB), and searches in two passes:
+
+1. First pass: every eligible row is scored from the quantized codes, using
+   only the first `first_pass_dims` dimensions when set. text-embedding-3
+   vectors are Matryoshka-trained, so a normalised prefix is itself a usable
+   embedding and a 256- or 512-dim scan is several times cheaper.
+2. Re-rank: the best `rerank_depth` rows are scored again at full dimension,
+   exactly when float32 rows are supplied (`exact_vectors`, e.g. a
+   memory-mapped file), otherwise from the full-dimension codes.
+
+With a truncated first pass only re-ranked rows are returned, so every
+distance comes from the full dimension; at least `limit` rows are then
+re-ranked, so the pool is never cut below what the search asked for. Distances follow Firestore's COSINE measure, as VectorIndex.
+Codes are expanded to float32 in row blocks, so a scan never materialises the
+whole float matrix.
+"""
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from .vector_index import VectorIndex, nearest_order
+
+
+QUANTIZATION_MODES = ("float16", "int8")
+# Rows expanded to float32 at a time while scanning codes.
+BLOCK_ROWS = 2048
+INT8_MAX = 127
+
+
+class QuantizedVectorIndex:
+    """Cosine-distance search over float16 or per-dimension-scaled int8 codes, with full-dimension re-ranking."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        mode: str = "int8",
+        first_pass_dims: Optional[int] = None,
+        rerank_depth: int = 300,
+        exact_vectors: Optional[np.ndarray] = None,
+    ):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode {mode!r}; expected one of {QUANTIZATION_MODES}")
+        normalised = VectorIndex(ids, vectors).matrix
+        dimension = normalised.shape[1]
+
+        if mode == "int8":
+            peaks = np.abs(normalised).max(axis=0) if len(normalised) else np.ones(dimension, dtype=np.float32)
+            scales = np.where(peaks > 0, peaks / INT8_MAX, 1.0).astype(np.float32)
+            codes = np.clip(np.rint(normalised / scales), -INT8_MAX, INT8_MAX).astype(np.int8)
+        else:
+            scales = np.ones(dimension, dtype=np.float32)
+            codes = normalised.astype(np.float16)
+
+        self.ids = list(ids)
+        self.mode = mode
+        self.codes = codes
+        self.scales = scales
+        self.rerank_depth = max(int(rerank_depth), 1)
+        self.first_pass_dims = first_pass_dims if first_pass_dims and first_pass_dims < dimension else dimension
+        self.norms = self._row_norms(codes, scales)
+        self.prefix_norms = (
+            self.norms
+            if self.first_pass_dims == dimension
+            else self._row_norms(codes[:, : self.first_pass_dims], scales[: self.first_pass_dims])
+        )
+        self.exact_vectors = exact_vectors
+
+    @classmethod
+    def from_index(cls, index: VectorIndex, **kwargs: Any) -> "QuantizedVectorIndex":
+        """Quantize an already loaded VectorIndex (its float matrix can then be released)."""
+        return cls(index.ids, index.matrix, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def truncated(self) -> bool:
+        return self.first_pass_dims < self.dimension
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes of the codes and per-row/per-dimension metadata (not `exact_vectors`)."""
+        prefix = 0 if self.prefix_norms is self.norms else self.prefix_norms.nbytes
+        return self.codes.nbytes + self.scales.nbytes + self.norms.nbytes + prefix
+
+    @staticmethod
+    def _row_norms(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        norms = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), BLOCK_ROWS):
+            block = codes[start : start + BLOCK_ROWS].astype(np.float32) * scales
+            norms[start : start + BLOCK_ROWS] = np.linalg.norm(block, axis=1)
+        norms[norms == 0] = 1.0
+        return norms
+
+    def _similarities(self, queries: np.ndarray, rows: np.ndarray, dims: int) -> np.ndarray:
+        """Cosine similarity of normalised `queries` (n_q, dim) to the given rows over the first `dims` dimensions."""
+        scaled = (queries[:, :dims] * self.scales[:dims]).T
+        query_norms = np.linalg.norm(queries[:, :dims], axis=1)
+        query_norms[query_norms == 0] = 1.0
+        norms = self.norms if dims == self.dimension else self.prefix_norms
+
+        similarities = np.empty((len(queries), len(rows)), dtype=np.float32)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            positions = slice(start, start + BLOCK_ROWS)
+            block_rows = rows[positions]
+            block = self.codes[block_rows, :dims].astype(np.float32)
+            similarities[:, positions] = (block @ scaled).T / norms[block_rows]
+        return similarities / query_norms[:, None]
+
+    def _exact_distances(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        if self.exact_vectors is not None:
+            vectors = np.asarray(self.exact_vectors[rows], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1)
+            norms[norms == 0] = 1.0
+            return 1.0 - (vectors @ query) / norms
+        return 1.0 - self._similarities(query[None, :], rows, self.dimension)[0]
+
+    def _search_one(self, query: np.ndarray, first_pass: np.ndarray, rows: np.ndarray, limit: int):
+        if self.truncated:
+            # Only re-ranked rows carry full-dimension distances, so re-rank at least the requested pool.
+            candidates = nearest_order(first_pass, max(self.rerank_depth, limit))
+            distances = self._exact_distances(query, rows[candidates])
+        else:
+            candidates = nearest_order(first_pass, limit)
+            distances = first_pass[candidates]
+            if self.exact_vectors is not None:
+                head = candidates[: self.rerank_depth]
+                distances[: len(head)] = self._exact_distances(query, rows[head])
+
+        order = np.argsort(distances, kind="stable")[:limit]
+        positions = rows[candidates[order]]
+        return [self.ids[i] for i in positions], distances[order].astype(float).tolist()
+
+    def _normalised_queries(self, query_vectors: Any) -> np.ndarray:
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.dimension:
+            raise ValueError(f"Query vectors have shape {queries.shape}, index dimension is {self.dimension}")
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return queries / norms
+
+    def search(
+        self, query_vector: Sequence[float], limit: int, rows: Optional[np.ndarray] = None
+    ) -> tuple[list[str], list[float]]:
+        """Return the `limit` nearest ids and their cosine distances, nearest first (see VectorIndex.search)."""
+        if not self.ids or limit <= 0 or (rows is not None and not len(rows)):
+            return [], []
+        query = self._normalised_queries([query_vector])
+        rows = np.arange(len(self.ids)) if rows is None else np.asarray(rows)
+        first_pass = 1.0 - self._similarities(query, rows, self.first_pass_dims)[0]
+        return self._search_one(query[0], first_pass, rows, limit)
+
+    def search_many(self, query_vectors: Sequence[Sequence[float]], limit: int) -> list[tuple[list[str], list[float]]]:
+        """`search` for several queries, with one matrix-matrix product per row block in the first pass."""
+        if not len(query_vectors):
+            return []
+        if not self.ids or limit <= 0:
+            return [([], []) for _ in range(len(query_vectors))]
+        queries = self._normalised_queries(query_vectors)
+        rows = np.arange(len(self.ids))
+        first_pass = 1.0 - self._similarities(queries, rows, self.first_pass_dims)
+        return [self._search_one(query, distances, rows, limit) for query, distances in zip(queries, first_pass)]
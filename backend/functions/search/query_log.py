@@ -0,0 +1,224 @@
+"""Batched persistence for `userQuery` search records.
+
+Search used to write every query record, including the full sanitized results
+list, to Firestore in its own round trip. `QueryLogWriter` takes the record
+into a bounded in-process queue and returns a per-record `threading.Event`; a
+daemon worker drains the queue in Firestore batch writes, retrying failed
+batches with backoff, and sets each record's event once its batch is done, so
+concurrent requests share batch commits.
+
+Cloud Functions throttles an instance's CPU once its response is sent, so a
+request waits for its own record's event (`wait_until_written`, up to
+QUERY_LOG_WAIT_SECONDS) just before returning, never for other requests'
+records. SIGTERM at scale-down skips `atexit`, so `install_shutdown_flush()`
+writes whatever is still queued then. Records another request reads back (the
+agent's `llmQuery`) are written inline by their callers instead.
+
+When the queue is full, or the worker cannot run, records are written inline
+as before.
+"""
+
+import atexit
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+# "false" writes query records inline, before the response is returned.
+QUERY_LOG_ASYNC = os.getenv("QUERY_LOG_ASYNC", "true").lower() != "false"
+# Records buffered before submit() falls back to an inline write.
+QUERY_LOG_MAX_PENDING = int(os.getenv("QUERY_LOG_MAX_PENDING", "1000"))
+# Records per Firestore batch commit (Firestore allows up to 500 writes per batch).
+QUERY_LOG_BATCH_SIZE = int(os.getenv("QUERY_LOG_BATCH_SIZE", "20"))
+# Attempts per batch, and the base delay (seconds, doubled each retry) between them.
+QUERY_LOG_MAX_ATTEMPTS = int(os.getenv("QUERY_LOG_MAX_ATTEMPTS", "4"))
+QUERY_LOG_RETRY_SECONDS = float(os.getenv("QUERY_LOG_RETRY_SECONDS", "0.5"))
+# How long (seconds) shutdown waits for the queue to drain.
+QUERY_LOG_FLUSH_TIMEOUT_SECONDS = float(os.getenv("QUERY_LOG_FLUSH_TIMEOUT_SECONDS", "10"))
+# How long (seconds) a request waits for its own record before responding. "0" only
+# where CPU stays allocated after the response (e.g. Cloud Run with always-on CPU).
+QUERY_LOG_WAIT_SECONDS = float(os.getenv("QUERY_LOG_WAIT_SECONDS", "5"))
+
+_STOP = object()
+
+Record = Tuple[str, str, Dict[str, Any], threading.Event]
+
+
+class QueryLogWriter:
+    """Singleton-patterned batching queue for query records."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, firebase_manager: Any):
+        with cls._lock:
+            if cls._instance is None:
+                instance = super(QueryLogWriter, cls).__new__(cls)
+                instance._setup(firebase_manager)
+                cls._instance = instance
+            return cls._instance
+
+    def _setup(self, firebase_manager: Any, start_worker: bool = True) -> None:
+        self.firebase_manager = firebase_manager
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=QUERY_LOG_MAX_PENDING)
+        self._worker: Optional[threading.Thread] = None
+        self.written = 0
+        self.failed = 0
+        if start_worker:
+            self._worker = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
+
+    @property
+    def db(self) -> Any:
+        return self.firebase_manager.firestore_client
+
+    def submit(self, collection: str, doc_id: str, data: Dict[str, Any]) -> threading.Event:
+        """Queue `data` to be written to `collection/doc_id`; never blocks on Firestore.
+
+        Returns an event that is set once the record's batch has been written
+        (or dropped). Falls back to an inline write, and an already-set event,
+        if the worker is not running or the queue is full.
+        """
+        done = threading.Event()
+        if self._worker is None or not self._worker.is_alive():
+            self._write_now(collection, doc_id, data, done)
+            return done
+
+        try:
+            self._queue.put_nowait((collection, doc_id, data, done))
+        except queue.Full:
+            logger.warning(f"Query log queue full ({QUERY_LOG_MAX_PENDING}); writing {collection}/{doc_id} inline")
+            self._write_now(collection, doc_id, data, done)
+        return done
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued record has been written (or dropped). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Flush outstanding records and stop the worker (on exit and on SIGTERM)."""
+        if self._worker is None or not self._worker.is_alive():
+            return
+        if not self.flush(QUERY_LOG_FLUSH_TIMEOUT_SECONDS):
+            logger.warning(f"Query log flush timed out with {self._queue.qsize()} records unwritten")
+        self._queue.put(_STOP)
+        self._worker.join(timeout=1)
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), "written": self.written, "failed": self.failed}
+
+    # ----- worker -----
+
+    def _write_now(self, collection: str, doc_id: str, data: Dict[str, Any], done: threading.Event) -> None:
+        try:
+            self.db.collection(collection).document(doc_id).set(data)
+        finally:
+            done.set()
+
+    def _next_batch(self) -> Tuple[List[Record], bool]:
+        """Block for one record, then take whatever else is queued, up to the batch size."""
+        records: List[Record] = []
+        stop = False
+        item = self._queue.get()
+        while True:
+            if item is _STOP:
+                self._queue.task_done()
+                stop = True
+                break
+            records.append(item)
+            if len(records) >= QUERY_LOG_BATCH_SIZE:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return records, stop
+
+    def _commit(self, records: List[Record]) -> None:
+        batch = self.db.batch()
+        for collection, doc_id, data, _ in records:
+            batch.set(self.db.collection(collection).document(doc_id), data)
+        batch.commit()
+
+    def _write_batch(self, records: List[Record]) -> None:
+        for attempt in range(1, QUERY_LOG_MAX_ATTEMPTS + 1):
+            try:
+                self._commit(records)
+                self.written += len(records)
+                return
+            except Exception as e:
+                if attempt == QUERY_LOG_MAX_ATTEMPTS:
+                    self.failed += len(records)
+                    logger.exception(f"Dropping {len(records)} query records after {attempt} attempts: {e}")
+                    return
+                delay = QUERY_LOG_RETRY_SECONDS * 2 ** (attempt - 1)
+                logger.warning(f"Query log batch write failed (attempt {attempt}), retrying in {delay}s: {e}")
+                time.sleep(delay)
+
+    def _run(self) -> None:
+        while True:
+            records, stop = self._next_batch()
+            if records:
+                try:
+                    self._write_batch(records)
+                finally:
+                    for *_, done in records:
+                        done.set()
+                        self._queue.task_done()
+            if stop:
+                return
+
+
+def get_query_log(firebase_manager: Any) -> Optional[QueryLogWriter]:
+    """Return the process-wide writer, or None when records should be written inline."""
+    if not QUERY_LOG_ASYNC:
+        return None
+    return QueryLogWriter(firebase_manager)
+
+
+def wait_until_written(done: Optional[threading.Event]) -> None:
+    """Wait (up to QUERY_LOG_WAIT_SECONDS) for one submitted record; `done` is what `submit()` returned.
+
+    Call just before returning the response: once it is sent the instance may
+    get no CPU to write the record.
+    """
+    if done is None or QUERY_LOG_WAIT_SECONDS <= 0:
+        return
+    if not done.wait(QUERY_LOG_WAIT_SECONDS):
+        logger.warning(f"Query log record still unwritten after {QUERY_LOG_WAIT_SECONDS}s; responding anyway")
+
+
+def install_shutdown_flush() -> None:
+    """Write queued records on SIGTERM, then hand the signal to the previous handler.
+
+    Signal handlers can only be installed from the main thread, so call this
+    at import time of the functions entry point.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def _flush_and_exit(signum, frame):
+        writer = QueryLogWriter._instance
+        if writer is not None:
+            writer.close()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    signal.signal(signal.SIGTERM, _flush_and_exit)
@@ -0,0 +1,113 @@
+"""Array-backed search results.
+
+A candidate pool is a list of scheme IDs, the scheme dicts fetched for them and
+NumPy score arrays, all aligned by position. Ranking only reorders indices, and
+thresholding is a boolean mask; the scheme dicts are copied into output records
+just once, for the slice that is actually returned. This replaces a chain of
+per-query DataFrame merges, sorts and `to_dict` conversions.
+"""
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from .filter_index import matches_filters
+
+
+# Score arrays carried by SearchResults, and the record key each one is emitted under.
+SCORE_FIELDS = {
+    "vec_scores": "vec_similarity_score",
+    "bm25_raw_scores": "bm25_raw_score",
+    "bm25_scores": "bm25_score",
+    "combined_scores": "combined_scores",
+}
+
+
+class SearchResults:
+    """Scheme IDs, scheme dicts and score arrays for one query, aligned by position."""
+
+    def __init__(
+        self,
+        query: str,
+        ids: Sequence[str],
+        schemes: Sequence[dict],
+        vec_scores: Any,
+        bm25_raw_scores: Optional[Any] = None,
+        bm25_scores: Optional[Any] = None,
+        combined_scores: Optional[Any] = None,
+    ):
+        if len(ids) != len(schemes):
+            raise ValueError(f"Got {len(ids)} ids but {len(schemes)} schemes")
+        self.query = query
+        self.ids = list(ids)
+        self.schemes = list(schemes)
+        self.vec_scores = np.asarray(vec_scores, dtype=np.float32)
+        self.bm25_raw_scores = None if bm25_raw_scores is None else np.asarray(bm25_raw_scores, dtype=np.float32)
+        self.bm25_scores = None if bm25_scores is None else np.asarray(bm25_scores, dtype=np.float32)
+        self.combined_scores = None if combined_scores is None else np.asarray(combined_scores, dtype=np.float32)
+
+    @classmethod
+    def empty_for(cls, query: str) -> "SearchResults":
+        return cls(query, [], [], np.empty(0, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def empty(self) -> bool:
+        return not self.ids
+
+    def with_scores(self, **scores: Any) -> "SearchResults":
+        """Copy with extra score arrays attached (e.g. after BM25 scoring)."""
+        current = {name: getattr(self, name) for name in SCORE_FIELDS}
+        return SearchResults(self.query, self.ids, self.schemes, **{**current, **scores})
+
+    def take(self, indices: Any) -> "SearchResults":
+        """Reorder or subset by an index array or boolean mask."""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        scores = {
+            name: None if getattr(self, name) is None else getattr(self, name)[indices] for name in SCORE_FIELDS
+        }
+        return SearchResults(
+            self.query,
+            [self.ids[i] for i in indices],
+            [self.schemes[i] for i in indices],
+            **scores,
+        )
+
+    def sorted_by_combined(self) -> "SearchResults":
+        """Best combined score first; ties keep their retrieval order."""
+        return self.take(np.argsort(-self.combined_scores, kind="stable"))
+
+    def unique(self) -> "SearchResults":
+        """Drop repeated scheme IDs, keeping the first (best-ranked) occurrence."""
+        if len(set(self.ids)) == len(self.ids):
+            return self
+        seen: set[str] = set()
+        keep = [i for i, scheme_id in enumerate(self.ids) if not (scheme_id in seen or seen.add(scheme_id))]
+        return self.take(np.array(keep, dtype=np.int64))
+
+    def above(self, threshold: float) -> "SearchResults":
+        """Only results whose combined score is at least `threshold`."""
+        return self.take(self.combined_scores >= threshold)
+
+    def head(self, n: int) -> "SearchResults":
+        return self.take(np.arange(min(max(n, 0), len(self))))
+
+    def filter_by(self, filters: dict[str, Sequence[Any]]) -> "SearchResults":
+        """Keep results whose scheme field value (or an element of it) is allowed, for every field."""
+        return self.take(np.array([matches_filters(scheme, filters) for scheme in self.schemes], dtype=bool))
+
+    def to_records(self) -> list[dict]:
+        """Scheme dicts merged with their scores and the query, as plain Python values."""
+        columns = {key: getattr(self, name).tolist() for name, key in SCORE_FIELDS.items() if getattr(self, name) is not None}
+        records = []
+        for i, scheme in enumerate(self.schemes):
+            record = dict(scheme)
+            for key, values in columns.items():
+                record[key] = values[i]
+            record["query"] = self.query
+            records.append(record)
+        return records
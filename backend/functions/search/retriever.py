@@ -1,12 +1,36 @@
+import asyncio
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 
-import pandas as pd
+import numpy as np
 from google.cloud.firestore_v1.base_vector_query import DistanceMeasure
 from google.cloud.firestore_v1.vector import Vector
 from loguru import logger
 from integrations import FirebaseManager, EmbeddingsManager
 from .scorers import rank_results, compute_vec_scores
+from .fusion import resolve_fusion_strategy
+from .results import SearchResults
+from .bm25_index import BM25Index
+from .cache import QueryResultCache, normalize_query
+from .embedding_cache import CachedEmbeddings, build_embedding_store
+from .filter_index import (
+    FILTER_FIELDS,
+    FilterIndex,
+    build_filter_index,
+    filter_key,
+    firestore_prefilters,
+    matches_filters,
+)
+from .ann_index import VECTOR_BACKENDS, build_vector_backend
+from .index_artifact import IndexArtifact, load_latest_artifact
+from .scheme_store import SCHEMES_COLLECTION, aread_schemes_by_ids, get_scheme_store, read_schemes_by_ids
+from .single_flight import SingleFlight
+from .timing import span, timed
+from .quantized_index import QUANTIZATION_MODES, QuantizedVectorIndex
+from .vector_index import VectorBackend, VectorIndex
 from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv())
@@ -15,7 +39,11 @@ os.environ["KMP_DUPLICATE_LIB_OK"] = "True"
 
 # Collection for storing embeddings (separate from schemes collection)
 EMBEDDINGS_COLLECTION = "schemes_embeddings"
-SCHEMES_COLLECTION = "schemes"
+# Written by utils.reindex_embeddings after every successful reindex. Its
+# `generation` value tells long-lived instances to rebuild their in-process
+# indexes and drop cached results.
+INDEX_META_COLLECTION = "schemes_index_meta"
+INDEX_META_DOCUMENT = "current"
 
 # Search funnel tuning. We score essentially the whole candidate pool, then
 # keep everything that clears the relevance bar. The result count is driven by
@@ -28,42 +56,123 @@ SCHEMES_COLLECTION = "schemes"
 # and comfortably exceeds the current corpus, so it stands in for "all
 # candidates". The relevance threshold (not this number) decides what's returned.
 RETRIEVAL_LIMIT = 1000  # Firestore's max find_nearest limit; effectively "all candidates"
+FIRESTORE_NEAREST_LIMIT = 1000
+# Pool size for the in-process index, which has no Firestore cap, so it can keep
+# meaning "all candidates" once the corpus (or per-chunk embeddings) outgrows
+# 1000 rows (0 = RETRIEVAL_LIMIT).
+VECTOR_POOL_LIMIT = int(os.getenv("SEARCH_VECTOR_POOL_LIMIT", "0"))
 # Permissive relevance floor on the normalized combined score (0-1). It is not a
 # precise relevance gate (embedding distances are too compressed for that without
 # a reranker); empirically it keeps hundreds of results for a broad query and a
 # focused handful for a specific one, while dropping the clearly-irrelevant tail.
 # Ranking carries relevance; this only trims the tail. Tune against real queries.
-RELEVANCE_THRESHOLD = 0.6
+# 0.45 for corpus BM25: the old 0.6 was set when BM25 added a rank position
+# (0.3 * (1 - i/k), about 0.15 on average) to every candidate. Max-normalized BM25
+# adds 0 without term overlap, so 0.45 keeps the old vector floor for those
+# (see scripts/search_benchmark.py; 0.6 dropped 3% of relevant results there).
+RELEVANCE_THRESHOLD = 0.45
 SAFETY_CEILING = 300  # hard upper bound on results returned, regardless of request
 # How many top-ranked schemes the LLM reads to write its answer. The UI shows all
 # relevant results (the user scrolls); the LLM only needs the top slice, which
 # bounds per-turn token cost as the corpus grows.
 LLM_RESULT_LIMIT = 50
-
-
+# Where nearest-neighbour search runs. "memory" loads every embedding into an
+# in-process VectorIndex at warm-up and only falls back to Firestore find_nearest
+# if that load fails; "firestore" always queries find_nearest.
+VECTOR_INDEX_MODE = os.getenv("SEARCH_VECTOR_INDEX", "memory").lower()
+# In-process search algorithm (see search.ann_index): "exact" scores every row;
+# "ivf" (NumPy inverted file) and "hnsw" (needs hnswlib) are approximate and
+# sub-linear for corpora where brute force gets slow. Check recall with
+# `scripts/search_benchmark.py backends` before switching.
+VECTOR_BACKEND = os.getenv("SEARCH_VECTOR_BACKEND", "exact").lower()
+# IVF lists probed per query (0 = an eighth of them) and scanned rows per pooled row.
+IVF_N_PROBE = int(os.getenv("SEARCH_IVF_N_PROBE", "0"))
+IVF_CANDIDATE_FACTOR = float(os.getenv("SEARCH_IVF_CANDIDATE_FACTOR", "3"))
+# HNSW search breadth; higher is slower with better recall.
+HNSW_EF_SEARCH = int(os.getenv("SEARCH_HNSW_EF_SEARCH", "128"))
+# How the in-process index stores embeddings: "none" (float32), "float16" or
+# "int8" (see search.quantized_index). An optional Matryoshka prefix length
+# (0 = full dimension) speeds up the first pass; the best RERANK_DEPTH rows
+# (never fewer than the pool size) are then re-scored at full dimension, exactly
+# when the float32 matrix is memory-mapped from an index artifact.
+VECTOR_QUANTIZATION = os.getenv("SEARCH_VECTOR_QUANTIZATION", "none").lower()
+VECTOR_FIRST_PASS_DIMS = int(os.getenv("SEARCH_VECTOR_FIRST_PASS_DIMS", "0"))
+VECTOR_RERANK_DEPTH = int(os.getenv("SEARCH_VECTOR_RERANK_DEPTH", "300"))
+# Versioned index artifact published by utils.reindex_embeddings: "gs://bucket/prefix"
+# or a local directory. When set, instances memory-map its embedding matrix and BM25
+# postings instead of rebuilding them from Firestore ("" = always build).
+INDEX_ARTIFACT_LOCATION = os.getenv("SEARCH_INDEX_ARTIFACT", "")
+# How often (seconds) an instance checks whether a reindex has happened.
+INDEX_GENERATION_CHECK_SECONDS = float(os.getenv("SEARCH_INDEX_CHECK_SECONDS", "300"))
+# Result cache bounds: entry count, approximate memory budget and expiry.
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_MB", "64")) * 1024 * 1024
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+# Query embedding cache: in-memory entry count, plus an optional persistent tier
+# ("" = memory only, "firestore", or "disk:<directory>").
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_EMBEDDING_CACHE_MAX_ENTRIES", "2048"))
+EMBEDDING_CACHE_STORE = os.getenv("SEARCH_EMBEDDING_CACHE", "")
+
+
+@timed("fetch_schemes_by_ids")
 def fetch_schemes_by_ids(firebase_manager: FirebaseManager, scheme_ids: List[str]) -> tuple[List[Dict], List[str]]:
-    """Fetch schemes by Firestore document ID, preserving request order."""
+    """Fetch schemes by Firestore document ID, preserving request order.
 
-    db = firebase_manager.firestore_client
-    unique_scheme_ids = list(dict.fromkeys([scheme_id.strip() for scheme_id in scheme_ids if scheme_id.strip()]))
-    scheme_details_by_id: dict[str, Dict] = {}
+    Served from the process-wide SchemeStore when it is loaded, otherwise read
+    from Firestore in batches (see `read_schemes_by_ids`).
+    """
 
-    for scheme_id in unique_scheme_ids:
-        doc = db.collection(SCHEMES_COLLECTION).document(scheme_id).get()
-        if not doc.exists:
-            continue
+    unique_scheme_ids = list(dict.fromkeys([scheme_id.strip() for scheme_id in scheme_ids if scheme_id.strip()]))
 
-        scheme_data = doc.to_dict()
-        scheme_data["scheme_id"] = doc.id
-        scheme_data.pop("scraped_text", None)
-        scheme_details_by_id[scheme_id] = scheme_data
+    store = get_scheme_store(firebase_manager)
+    if store is not None:
+        return store.get_many(unique_scheme_ids)
 
+    scheme_details_by_id = read_schemes_by_ids(firebase_manager.firestore_client, unique_scheme_ids)
     scheme_details = [scheme_details_by_id[scheme_id] for scheme_id in unique_scheme_ids if scheme_id in scheme_details_by_id]
     missing_scheme_ids = [scheme_id for scheme_id in unique_scheme_ids if scheme_id not in scheme_details_by_id]
 
     return scheme_details, missing_scheme_ids
 
 
+async def afetch_schemes_by_ids(
+    firebase_manager: FirebaseManager, scheme_ids: List[str]
+) -> tuple[List[Dict], List[str]]:
+    """`fetch_schemes_by_ids` for the async agent path, reading Firestore through the async client."""
+
+    unique_scheme_ids = list(dict.fromkeys([scheme_id.strip() for scheme_id in scheme_ids if scheme_id.strip()]))
+
+    # A cold or due store (re)loads synchronously, so that happens off the loop.
+    store = await asyncio.to_thread(get_scheme_store, firebase_manager)
+    if store is not None:
+        return store.get_many(unique_scheme_ids)
+
+    scheme_details_by_id = await aread_schemes_by_ids(firebase_manager.async_firestore_client, unique_scheme_ids)
+    scheme_details = [scheme_details_by_id[i] for i in unique_scheme_ids if i in scheme_details_by_id]
+    missing_scheme_ids = [scheme_id for scheme_id in unique_scheme_ids if scheme_id not in scheme_details_by_id]
+
+    return scheme_details, missing_scheme_ids
+
+
+@dataclass(frozen=True)
+class SearchIndexes:
+    """Immutable set of in-process indexes; replaced wholesale on every (re)load.
+
+    A search reads `SearchModel.indexes` once and uses that set throughout, so
+    a reindex never pairs filter rows from one corpus with vectors from another.
+    """
+
+    index: Optional[VectorBackend] = None
+    bm25_index: Optional[BM25Index] = None
+    # Posting lists over the filter fields, aligned with `index` rows.
+    filter_index: Optional[FilterIndex] = None
+    # Filter fields the current schemes_embeddings documents carry, usable as
+    # find_nearest pre-filters (recorded by utils.reindex_embeddings).
+    prefilter_fields: tuple = ()
+    # The mapped artifact `index` and `bm25_index` come from, if any.
+    artifact: Optional[IndexArtifact] = None
+
+
 class SearchModel:
     """Singleton-patterned class for schemes search model"""
 
@@ -71,14 +180,27 @@ class SearchModel:
 
     db = None
     embeddings = None
-    index = None
+    indexes = SearchIndexes()
 
     firebase_manager = None
 
     initialised = False
 
-    # Add a cache to store query results
-    query_cache = {}
+    # Bounded cache of ranked results and fetched scheme batches, invalidated
+    # whenever the index generation changes.
+    query_cache = QueryResultCache(
+        max_entries=QUERY_CACHE_MAX_ENTRIES,
+        max_bytes=QUERY_CACHE_MAX_BYTES,
+        ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+    )
+    # Concurrent cache misses for the same ranking share one computation.
+    in_flight = SingleFlight()
+    index_generation: Any = None
+    # None until initialise() has run, so stubbed instances never poll Firestore.
+    generation_checked_at: Optional[float] = None
+    # Held by the one background thread checking for (and applying) a reindex.
+    _refresh_lock = threading.Lock()
+    refresh_thread: Optional[threading.Thread] = None
 
     @classmethod
     def initialise(cls):
@@ -88,15 +210,294 @@ class SearchModel:
             return
 
         cls.db = cls.firebase_manager.firestore_client
-        cls.embeddings = EmbeddingsManager("text-embedding-3-large").model
-        # Note: Vector search uses Firestore's findNearest() on schemes_embeddings collection
-        # No separate index initialization needed - Firestore handles it
+        embeddings_manager = EmbeddingsManager("text-embedding-3-large")
+        try:
+            embedding_store = build_embedding_store(EMBEDDING_CACHE_STORE, cls.db)
+        except Exception as e:
+            logger.warning(f"Embedding cache store unavailable, using memory only: {e}")
+            embedding_store = None
+        cls.embeddings = CachedEmbeddings(
+            embeddings_manager.model,
+            model_name=embeddings_manager.config.deployment_name,
+            dimensions=embeddings_manager.config.dimensions,
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+            store=embedding_store,
+        )
+        cls.load_indexes(cls.read_index_generation())
 
         cls.initialised = True
 
+    @classmethod
+    def load_indexes(cls, generation: Any) -> None:
+        """(Re)build the in-process indexes and stamp the result cache with `generation`.
+
+        With SEARCH_INDEX_ARTIFACT set, the vector and BM25 indexes are mapped
+        from the newest published artifact (kept as they are if its corpus is
+        the one already mapped), and only built from Firestore without one.
+        """
+        current = cls.indexes
+        index, bm25_index = current.index, current.bm25_index
+        artifact = cls.load_index_artifact() if INDEX_ARTIFACT_LOCATION else None
+        if artifact is None:
+            if VECTOR_INDEX_MODE == "memory":
+                index = cls.load_vector_index()
+            bm25_index = cls.load_bm25_index()
+        elif artifact is not current.artifact:
+            if VECTOR_INDEX_MODE == "memory":
+                index = cls.build_vector_backend(artifact.vector_index)
+            bm25_index = artifact.bm25_index
+
+        # Everything is built before anything is published, in one assignment.
+        cls.indexes = SearchIndexes(
+            index=index,
+            bm25_index=bm25_index,
+            filter_index=cls.load_filter_index(index.ids) if index is not None else None,
+            prefilter_fields=cls.read_prefilter_fields(),
+            artifact=artifact,
+        )
+        cls.index_generation = generation
+        cls.generation_checked_at = time.monotonic()
+        cls.query_cache.set_generation(generation)
+
+    @classmethod
+    def read_index_generation(cls) -> Any:
+        """Current reindex generation from Firestore, or None if none has been recorded."""
+        try:
+            doc = cls.db.collection(INDEX_META_COLLECTION).document(INDEX_META_DOCUMENT).get()
+            return (doc.to_dict() or {}).get("generation") if doc.exists else None
+        except Exception as e:
+            logger.warning(f"Could not read index generation: {e}")
+            return cls.index_generation
+
+    @classmethod
+    def read_prefilter_fields(cls) -> tuple:
+        """Filter fields copied onto schemes_embeddings by the last reindex; empty if none."""
+        try:
+            doc = cls.db.collection(INDEX_META_COLLECTION).document(INDEX_META_DOCUMENT).get()
+            fields = (doc.to_dict() or {}).get("filter_fields") if doc.exists else None
+        except Exception as e:
+            logger.warning(f"Could not read pre-filter fields, find_nearest will filter after retrieval: {e}")
+            return ()
+        return tuple(field for field in fields or () if field in FILTER_FIELDS)
+
+    @classmethod
+    def read_artifact_version(cls) -> Optional[str]:
+        """Artifact version the last reindex published ("" if publishing failed), or None if it recorded none."""
+        try:
+            doc = cls.db.collection(INDEX_META_COLLECTION).document(INDEX_META_DOCUMENT).get()
+            return (doc.to_dict() or {}).get("artifact_version") if doc.exists else None
+        except Exception as e:
+            logger.warning(f"Could not read index artifact version: {e}")
+            return None
+
+    @classmethod
+    def load_index_artifact(cls) -> Optional[IndexArtifact]:
+        """Map the newest index artifact, or None to build the indexes from Firestore.
+
+        An artifact older than the one the last reindex recorded (e.g. a failed
+        publish) is not used, so search never serves stale embeddings.
+        """
+        try:
+            artifact = load_latest_artifact(INDEX_ARTIFACT_LOCATION, current=cls.indexes.artifact)
+        except Exception as e:
+            logger.warning(f"Could not load index artifact, building from Firestore: {e}")
+            return None
+
+        if artifact is None:
+            logger.warning(f"No index artifact at {INDEX_ARTIFACT_LOCATION}; building from Firestore")
+            return None
+        expected = cls.read_artifact_version()
+        if expected is not None and artifact.version != expected:
+            logger.warning(
+                f"Index artifact {artifact.version} is not the reindexed version {expected}; building from Firestore"
+            )
+            return None
+        if artifact is cls.indexes.artifact:
+            logger.info(f"Index artifact {artifact.version} unchanged (corpus {artifact.corpus_hash[:12]})")
+        else:
+            logger.info(
+                f"Mapped index artifact {artifact.version} (corpus {artifact.corpus_hash[:12]}): "
+                f"{len(artifact.vector_index)} x {artifact.vector_index.dimension} vectors, "
+                f"{len(artifact.bm25_index.vocabulary)} BM25 terms"
+            )
+        return artifact
+
+    @classmethod
+    def refresh_if_reindexed(cls) -> bool:
+        """Check for a reindex in the background when one is due.
+
+        Checks at most once per INDEX_GENERATION_CHECK_SECONDS, on a daemon
+        thread, so the request that crosses the interval does not pay for the
+        rebuild; searches keep using the published indexes until the new set
+        is swapped in. Returns True if a check was started.
+        """
+        if cls.generation_checked_at is None:
+            return False
+        if time.monotonic() - cls.generation_checked_at < INDEX_GENERATION_CHECK_SECONDS:
+            return False
+        if not cls._refresh_lock.acquire(blocking=False):
+            return False
+        # Re-checked under the lock: a refresh may have finished since the first check.
+        if time.monotonic() - cls.generation_checked_at < INDEX_GENERATION_CHECK_SECONDS:
+            cls._refresh_lock.release()
+            return False
+
+        cls.generation_checked_at = time.monotonic()
+        try:
+            cls.refresh_thread = threading.Thread(
+                target=cls._refresh_in_background, name="search-index-refresh", daemon=True
+            )
+            cls.refresh_thread.start()
+        except Exception:
+            cls._refresh_lock.release()
+            raise
+        return True
+
+    @classmethod
+    def _refresh_in_background(cls) -> None:
+        try:
+            cls.reload_if_reindexed()
+        except Exception as e:
+            logger.warning(f"Index refresh failed, keeping the current indexes: {e}")
+        finally:
+            cls._refresh_lock.release()
+
+    @classmethod
+    def reload_if_reindexed(cls) -> bool:
+        """Rebuild indexes and drop cached results if a reindex ran since they were built.
+
+        Returns True if the indexes were rebuilt.
+        """
+        generation = cls.read_index_generation()
+        if generation == cls.index_generation:
+            return False
+
+        logger.info(
+            f"Index generation changed ({cls.index_generation} -> {generation}); rebuilding. "
+            f"Cache stats before reset: {cls.query_cache.stats()}"
+        )
+        cls.load_indexes(generation)
+        return True
+
+    @classmethod
+    def load_vector_index(cls) -> Optional[VectorBackend]:
+        """Load schemes_embeddings into an in-process index, or None to use find_nearest.
+
+        The loaded matrix is wrapped in the configured backend (see
+        `build_vector_backend`).
+        """
+        try:
+            docs = cls.db.collection(EMBEDDINGS_COLLECTION).stream()
+            index = VectorIndex.from_documents(docs, vector_field="embedding")
+        except Exception as e:
+            logger.warning(f"Could not load in-process vector index, falling back to find_nearest: {e}")
+            return None
+
+        if not len(index):
+            logger.warning("schemes_embeddings is empty; falling back to find_nearest")
+            return None
+
+        logger.info(f"Loaded in-process vector index: {len(index)} x {index.dimension}")
+        return cls.build_vector_backend(index)
+
+    @classmethod
+    def build_vector_backend(cls, index: VectorIndex) -> VectorBackend:
+        """Wrap a loaded exact index in SEARCH_VECTOR_BACKEND; exact search is kept if that fails.
+
+        Quantization (SEARCH_VECTOR_QUANTIZATION) applies to the exact backend.
+        """
+        if VECTOR_BACKEND not in VECTOR_BACKENDS:
+            logger.warning(f"Unknown SEARCH_VECTOR_BACKEND {VECTOR_BACKEND!r}, using exact search")
+        elif VECTOR_BACKEND != "exact":
+            options = {
+                "ivf": {"n_probe": IVF_N_PROBE or None, "candidate_factor": IVF_CANDIDATE_FACTOR},
+                "hnsw": {"ef_search": HNSW_EF_SEARCH},
+            }[VECTOR_BACKEND]
+            try:
+                return build_vector_backend(VECTOR_BACKEND, index, **options)
+            except Exception as e:
+                logger.warning(f"Could not build {VECTOR_BACKEND} vector backend, using exact search: {e}")
+        return cls.quantize_vector_index(index)
+
+    @classmethod
+    def quantize_vector_index(cls, index: VectorIndex) -> VectorBackend:
+        """Apply SEARCH_VECTOR_QUANTIZATION to a loaded index; on failure the float index is kept.
+
+        A memory-mapped float32 matrix (from an index artifact) stays available
+        for exact re-ranking of the best rows; a matrix read into memory is
+        released, and re-ranking then uses the full-dimension codes.
+        """
+        if VECTOR_QUANTIZATION in QUANTIZATION_MODES:
+            try:
+                quantized = QuantizedVectorIndex.from_index(
+                    index,
+                    mode=VECTOR_QUANTIZATION,
+                    first_pass_dims=VECTOR_FIRST_PASS_DIMS or None,
+                    rerank_depth=VECTOR_RERANK_DEPTH,
+                    exact_vectors=index.matrix if isinstance(index.matrix, np.memmap) else None,
+                )
+            except Exception as e:
+                logger.warning(f"Could not quantize vector index, keeping float32: {e}")
+                return index
+            logger.info(
+                f"Quantized vector index to {VECTOR_QUANTIZATION} "
+                f"(first pass {quantized.first_pass_dims} dims, "
+                f"{'exact' if quantized.exact_vectors is not None else 'quantized'} re-ranking): "
+                f"{index.matrix.nbytes // 1024} KiB -> {quantized.nbytes // 1024} KiB"
+            )
+            return quantized
+        return index
+
+    @classmethod
+    def load_filter_index(cls, ids: List[str]) -> Optional[FilterIndex]:
+        """Build posting lists over the filter fields for the vector index rows.
+
+        Uses the SchemeStore when it is loaded, otherwise reads just the filter
+        fields from Firestore. Returns None on failure, in which case filters
+        are applied to the retrieved pool instead.
+        """
+        try:
+            store = get_scheme_store(cls.firebase_manager)
+            if store is not None:
+                schemes, _ = store.get_many(store.all_ids())
+            else:
+                docs = cls.db.collection(SCHEMES_COLLECTION).select(list(FILTER_FIELDS)).stream()
+                schemes = [{**(doc.to_dict() or {}), "scheme_id": doc.id} for doc in docs]
+            index = build_filter_index(ids, schemes)
+        except Exception as e:
+            logger.warning(f"Could not build filter index, filters will apply after retrieval: {e}")
+            return None
+
+        logger.info(f"Built filter index over {len(index)} rows")
+        return index
+
+    @classmethod
+    def load_bm25_index(cls) -> Optional[BM25Index]:
+        """Build the corpus-level BM25 index over active schemes' search_booster text.
+
+        Returns None on failure, in which case ranking builds a throwaway index
+        over each query's candidate pool.
+        """
+        try:
+            docs = cls.db.collection(SCHEMES_COLLECTION).select(["search_booster", "status"]).stream()
+            ids, texts = [], []
+            for doc in docs:
+                data = doc.to_dict() or {}
+                if data.get("status") == "inactive":
+                    continue
+                ids.append(doc.id)
+                texts.append(data.get("search_booster"))
+            index = BM25Index(ids, texts)
+        except Exception as e:
+            logger.warning(f"Could not build BM25 index, ranking will index each candidate pool: {e}")
+            return None
+
+        logger.info(f"Built BM25 index: {len(index)} schemes, {len(index.vocabulary)} terms")
+        return index
+
     def fetch_schemes_batch(self, scheme_ids: List[str]) -> List[Dict]:
         """
-        Fetch multiple schemes, batching to respect Firestore's 30-item 'in' limit, and remove 'scraped_text' field if present.
+        Fetch multiple schemes from the scheme store (or batched Firestore reads), without 'scraped_text'.
 
         Args:
             scheme_ids (List[str]): List of scheme IDs to fetch
@@ -106,11 +507,12 @@ class SearchModel:
         """
 
         # Create a cache key based on the scheme IDs
-        scheme_cache_key = tuple(scheme_ids)
+        scheme_cache_key = ("schemes", tuple(scheme_ids))
         # Check if the results are already in the cache
-        if scheme_cache_key in self.query_cache:
+        cached = self.query_cache.get(scheme_cache_key)
+        if cached is not None:
             logger.info("Returning cached scheme details.")
-            return self.query_cache[scheme_cache_key]
+            return cached
 
         scheme_details, _ = fetch_schemes_by_ids(self.__class__.firebase_manager, scheme_ids)
 
@@ -134,71 +536,196 @@ class SearchModel:
             self.__class__.firebase_manager = firebase_manager
             self.__class__.initialise()
 
-    def search(self, query_text: str, pool_size: Optional[int] = None) -> pd.DataFrame:
+    def search(
+        self, query_text: str, pool_size: Optional[int] = None, filters: Optional[Dict[str, List[str]]] = None
+    ) -> SearchResults:
         """
-        Embed the input query, search the Firestore vector index across the whole
-        candidate pool, and return a merged DataFrame containing scheme metadata
-        and the real cosine distance for each match.
+        Embed the input query, search the vector index (in-process, or Firestore
+        as a fallback) across the whole candidate pool, and return the fetched
+        schemes aligned with their normalized vector relevance scores.
+
+        `filters` (`{field: [allowed values]}`) are pushed down into the nearest
+        neighbour search where possible, and checked again on the fetched
+        schemes, so only eligible schemes are returned and scored.
         """
         if pool_size is None:
-            pool_size = RETRIEVAL_LIMIT
+            pool_size = self.retrieval_limit()
 
         # Step 1: Generate query embedding
-        vec = self.__class__.embeddings.embed_query(query_text)
+        with span("embed"):
+            vec = self.__class__.embeddings.embed_query(query_text)
 
-        # Step 2: Query embeddings collection using Firestore vector search,
-        # asking Firestore to return the actual cosine distance per match.
-        # find_nearest returns at most the whole collection, so a sentinel limit
-        # above the corpus size means "retrieve everything".
-        embeddings_collection = self.__class__.db.collection(EMBEDDINGS_COLLECTION)
-        vector_query = embeddings_collection.find_nearest(
-            vector_field="embedding",
-            query_vector=Vector(vec),
-            distance_measure=DistanceMeasure.COSINE,
-            limit=pool_size,
-            distance_result_field="vector_distance",
-        )
-
-        # Get matching doc_ids and their real cosine distances from the results
-        embedding_results = vector_query.get()
-        ids = [doc.id for doc in embedding_results]
-        distances = [doc.to_dict().get("vector_distance") for doc in embedding_results]
+        # Step 2: Find the nearest embeddings, in-process when the index is
+        # loaded, otherwise via Firestore vector search.
+        with span("nearest"):
+            ids, distances = self.nearest(vec, pool_size, filters=filters)
 
         if not ids:
             logger.warning(f"No vector search results for query: {query_text}")
-            return pd.DataFrame(columns=["scheme_id", "vec_similarity_score", "query"])
-
-        # Convert the real cosine distances into normalized relevance scores
-        score_df = compute_vec_scores(ids, distances)
+            return SearchResults.empty_for(query_text)
 
         # Step 3: Fetch full scheme data from schemes collection
         try:
-            scheme_df = pd.DataFrame(self.fetch_schemes_batch(ids))
+            with span("hydrate"):
+                schemes = self.fetch_schemes_batch(ids)
         except Exception as e:
             logger.error("Error fetching schemes: %s", e)
             raise
 
-        if scheme_df.empty:
+        if not schemes:
             logger.warning(f"No schemes found for doc_ids: {ids}")
-            return pd.DataFrame(columns=["scheme_id", "vec_similarity_score", "query"])
+            return SearchResults.empty_for(query_text)
+
+        schemes_by_id = {scheme.get("scheme_id"): scheme for scheme in schemes}
+        return self._aligned_results(query_text, ids, distances, schemes_by_id, filters)
+
+    def search_many(self, query_texts: List[str], pool_size: Optional[int] = None) -> List[SearchResults]:
+        """`search` for several queries at once.
 
-        merged = pd.merge(scheme_df, score_df, on="scheme_id")
-        merged["query"] = query_text
-        return merged
+        The queries are embedded in one `embed_documents` call, scored against
+        the in-process index in one matrix-matrix product (Firestore, without
+        it, still takes one find_nearest per query), and the union of their
+        candidate IDs is hydrated once.
+        """
+        if not query_texts:
+            return []
+        if pool_size is None:
+            pool_size = self.retrieval_limit()
+
+        with span("embed"):
+            vectors = self.__class__.embeddings.embed_documents(list(query_texts))
+
+        with span("nearest"):
+            neighbours = None
+            indexes = self.__class__.indexes
+            if indexes.index is not None:
+                try:
+                    neighbours = indexes.index.search_many(vectors, pool_size)
+                except Exception as e:
+                    logger.warning(f"In-process batched vector search failed, falling back to find_nearest: {e}")
+            if neighbours is None:
+                neighbours = [self.nearest(vec, pool_size, indexes=indexes) for vec in vectors]
+
+        union_ids = list(dict.fromkeys(scheme_id for ids, _ in neighbours for scheme_id in ids))
+        schemes_by_id: Dict[str, Dict] = {}
+        if union_ids:
+            with span("hydrate"):
+                schemes_by_id = {scheme.get("scheme_id"): scheme for scheme in self.fetch_schemes_batch(union_ids)}
+
+        results = []
+        for query_text, (ids, distances) in zip(query_texts, neighbours):
+            if not ids:
+                logger.warning(f"No vector search results for query: {query_text}")
+            results.append(self._aligned_results(query_text, ids, distances, schemes_by_id))
+        return results
+
+    @classmethod
+    def retrieval_limit(cls) -> int:
+        """Default candidate pool size: VECTOR_POOL_LIMIT in-process, RETRIEVAL_LIMIT for find_nearest."""
+        if cls.indexes.index is not None and VECTOR_POOL_LIMIT:
+            return VECTOR_POOL_LIMIT
+        return RETRIEVAL_LIMIT
+
+    @staticmethod
+    def _aligned_results(
+        query_text: str,
+        ids: List[str],
+        distances: List[float],
+        schemes_by_id: Dict[str, Dict],
+        filters: Optional[Dict[str, List[str]]] = None,
+    ) -> SearchResults:
+        """SearchResults for the fetched schemes among `ids`, in retrieval order."""
+        # Schemes missing from the collection (or failing a filter the pushdown
+        # could not express) are dropped; align distances with the rest.
+        kept = [
+            i
+            for i, scheme_id in enumerate(ids)
+            if scheme_id in schemes_by_id and (not filters or matches_filters(schemes_by_id[scheme_id], filters))
+        ]
+        if not kept:
+            return SearchResults.empty_for(query_text)
 
-    def rank(self, query_text: str, results: pd.DataFrame) -> pd.DataFrame:
+        # Convert the real cosine distances into normalized relevance scores
+        aligned = compute_vec_scores([distances[i] for i in kept])
+        return SearchResults(query_text, [ids[i] for i in kept], [schemes_by_id[ids[i]] for i in kept], aligned)
+
+    def nearest(
+        self,
+        vec: List[float],
+        pool_size: int,
+        filters: Optional[Dict[str, List[str]]] = None,
+        indexes: Optional[SearchIndexes] = None,
+    ) -> tuple[List[str], List[float]]:
+        """Return `(ids, cosine distances)` for the `pool_size` nearest schemes, nearest first.
+
+        With `filters`, the in-process path scores only the rows the filter
+        index finds eligible, and find_nearest gets pre-filter `where` clauses
+        for the fields the embeddings documents carry. Both may return a
+        superset of the eligible schemes; `search` checks the rest. `indexes`
+        defaults to the currently published set.
         """
-        Apply BM25 ranking to the provided search results and compute combined scores.
+        if indexes is None:
+            indexes = self.__class__.indexes
+        index = indexes.index
+        if index is not None:
+            try:
+                rows = None
+                filter_index = indexes.filter_index
+                if filters and filter_index is not None and len(filter_index) == len(index):
+                    rows = filter_index.rows(filters)
+                return index.search(vec, pool_size, rows=rows)
+            except Exception as e:
+                logger.warning(f"In-process vector search failed, falling back to find_nearest: {e}")
+
+        embeddings_collection = self.__class__.db.collection(EMBEDDINGS_COLLECTION)
+        prefilters = firestore_prefilters(filters, indexes.prefilter_fields) if filters else []
+        if prefilters:
+            query = embeddings_collection
+            for clause in prefilters:
+                query = query.where(filter=clause)
+            try:
+                return self._find_nearest(query, vec, pool_size)
+            except Exception as e:
+                # Typically a missing composite vector index (see firestore.indexes.json)
+                logger.warning(f"Pre-filtered find_nearest failed, filtering after retrieval: {e}")
+        return self._find_nearest(embeddings_collection, vec, pool_size)
+
+    @staticmethod
+    def _find_nearest(query: Any, vec: List[float], pool_size: int) -> tuple[List[str], List[float]]:
+        # Ask Firestore to return the actual cosine distance per match.
+        # find_nearest returns at most the whole collection, so a sentinel limit
+        # above the corpus size means "retrieve everything". A larger in-process
+        # pool size is clamped to Firestore's maximum.
+        vector_query = query.find_nearest(
+            vector_field="embedding",
+            query_vector=Vector(vec),
+            distance_measure=DistanceMeasure.COSINE,
+            limit=min(pool_size, FIRESTORE_NEAREST_LIMIT),
+            distance_result_field="vector_distance",
+        )
+
+        embedding_results = vector_query.get()
+        ids = [doc.id for doc in embedding_results]
+        distances = [doc.to_dict().get("vector_distance") for doc in embedding_results]
+        return ids, distances
+
+    def rank(self, query_text: str, results: SearchResults, fusion: Optional[str] = None) -> SearchResults:
         """
-        # Delegate ranking to the external ranker helper
-        return rank_results(query_text, results)
+        Apply BM25 ranking to the provided search results and compute combined
+        scores with the given fusion strategy (see search.fusion).
+        """
+        # Delegate ranking to the external ranker helper, scoring against the
+        # corpus-level BM25 index built at warm-up.
+        return rank_results(query_text, results, bm25_index=self.__class__.indexes.bm25_index, fusion=fusion)
 
     def aggregate_and_rank_results(
         self,
         query_text: str,
         threshold: Optional[float] = None,
         requested_target: Optional[int] = None,
-    ) -> pd.DataFrame:
+        fusion: Optional[str] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+    ) -> SearchResults:
         """
         Perform hybrid vector + BM25 retrieval, then return a relevance-driven
         result set: every candidate whose combined score clears `threshold`,
@@ -209,28 +736,127 @@ class SearchModel:
         never pad below `threshold` to hit the number. When no target is given,
         all above-threshold results are returned. A hard `SAFETY_CEILING` always
         applies. The result count therefore varies with the query.
+
+        `fusion` selects how vector and BM25 scores are combined (defaults to
+        SEARCH_FUSION_STRATEGY). The retrieved candidate pool is cached apart
+        from the ranking, so switching strategy never repeats retrieval.
+        Concurrent callers that miss the cache for the same ranking wait on
+        one in-flight computation and share it (see search.single_flight).
+
+        `filters` restrict retrieval to eligible schemes before scoring (see
+        search.filter_index), so the threshold and cap apply to eligible
+        schemes only.
         """
         if threshold is None:
             threshold = RELEVANCE_THRESHOLD
 
         cap = SAFETY_CEILING if requested_target is None else min(requested_target, SAFETY_CEILING)
-
-        cache_key = (query_text, threshold)
-        if cache_key in self.query_cache:
-            logger.debug("Cache hit for query '%s'", query_text)
-            ranked = self.query_cache[cache_key]
+        fusion = resolve_fusion_strategy(fusion)
+
+        self.refresh_if_reindexed()
+
+        # Ranked results don't depend on the threshold (it's applied below), so
+        # the key is just the normalized query, filters and fusion strategy.
+        normalized_query = normalize_query(query_text)
+        filters_key = filter_key(filters)
+        cache_key = ("ranked", normalized_query, fusion, filters_key)
+        ranked = self.query_cache.get(cache_key)
+        if ranked is not None:
+            logger.debug(f"Cache hit for query '{query_text}'")
         else:
-            # Retrieve the full candidate pool, independent of how many we return.
-            results = self.search(query_text)
-
-            # Handle empty results - skip ranking if no vector results
-            if results.empty:
-                logger.warning(f"No search results to rank for query: {query_text}")
-                self.query_cache[cache_key] = results
-                return results
-
-            ranked = self.rank(query_text, results).drop_duplicates("scheme_id")
-            self.query_cache[cache_key] = ranked
-
-        relevant = ranked[ranked["combined_scores"] >= threshold]
-        return relevant.head(cap)
+            # The threshold and cap are applied to the shared ranking below, so
+            # callers differing only in those still coalesce.
+            flight_key = (cache_key, self.__class__.index_generation)
+            ranked = self.in_flight.do(
+                flight_key, lambda: self._retrieve_and_rank(query_text, cache_key, fusion, filters)
+            )
+
+        # Handle empty results - nothing was ranked
+        if ranked.empty:
+            return ranked
+        return ranked.above(threshold).head(cap)
+
+    def _retrieve_and_rank(
+        self,
+        query_text: str,
+        cache_key: tuple,
+        fusion: str,
+        filters: Optional[Dict[str, List[str]]],
+    ) -> SearchResults:
+        """Rank the (cached or freshly retrieved) candidate pool and cache the ranking under `cache_key`."""
+        _, normalized_query, _, filters_key = cache_key
+
+        # Retrieve the full candidate pool, independent of how many we return.
+        pool_key = ("pool", normalized_query, filters_key)
+        results = self.query_cache.get(pool_key)
+        if results is None:
+            with span("search"):
+                results = self.search(query_text, filters=filters)
+            self.query_cache[pool_key] = results
+
+        return self._rank_pool(query_text, cache_key, results, fusion)
+
+    def _rank_pool(self, query_text: str, cache_key: tuple, results: SearchResults, fusion: str) -> SearchResults:
+        """Rank a retrieved candidate pool and cache the ranking under `cache_key`."""
+        # Handle empty results - skip ranking if no vector results
+        if results.empty:
+            logger.warning(f"No search results to rank for query: {query_text}")
+            return results
+
+        with span("rank"):
+            ranked = self.rank(query_text, results, fusion=fusion).unique()
+        self.query_cache[cache_key] = ranked
+        return ranked
+
+    def aggregate_and_rank_many(
+        self,
+        query_texts: List[str],
+        threshold: Optional[float] = None,
+        requested_targets: Optional[List[Optional[int]]] = None,
+        fusion: Optional[str] = None,
+    ) -> List[SearchResults]:
+        """`aggregate_and_rank_results` for several queries, one result per query in order.
+
+        Cached rankings and pools are reused as usual; the remaining queries
+        are retrieved together through `search_many` (one embedding call, one
+        scoring pass, one hydration). `requested_targets` gives each query's
+        requested count, as `requested_target` does for a single query.
+        """
+        if threshold is None:
+            threshold = RELEVANCE_THRESHOLD
+        fusion = resolve_fusion_strategy(fusion)
+        if requested_targets is None:
+            requested_targets = [None] * len(query_texts)
+
+        self.refresh_if_reindexed()
+
+        ranked_by_query: Dict[str, SearchResults] = {}
+        to_retrieve: Dict[str, str] = {}
+        for query_text in query_texts:
+            normalized_query = normalize_query(query_text)
+            if normalized_query in ranked_by_query or normalized_query in to_retrieve:
+                continue
+            cache_key = ("ranked", normalized_query, fusion, ())
+            ranked = self.query_cache.get(cache_key)
+            if ranked is None:
+                pool = self.query_cache.get(("pool", normalized_query, ()))
+                if pool is None:
+                    to_retrieve[normalized_query] = query_text
+                    continue
+                ranked = self._rank_pool(query_text, cache_key, pool, fusion)
+            ranked_by_query[normalized_query] = ranked
+
+        if to_retrieve:
+            with span("search"):
+                pools = self.search_many(list(to_retrieve.values()))
+            for (normalized_query, query_text), pool in zip(to_retrieve.items(), pools):
+                self.query_cache[("pool", normalized_query, ())] = pool
+                cache_key = ("ranked", normalized_query, fusion, ())
+                ranked_by_query[normalized_query] = self._rank_pool(query_text, cache_key, pool, fusion)
+
+        results = []
+        for query_text, requested_target in zip(query_texts, requested_targets):
+            ranked = ranked_by_query[normalize_query(query_text)]
+            cap = SAFETY_CEILING if requested_target is None else min(requested_target, SAFETY_CEILING)
+            results.append(ranked if ranked.empty else ranked.above(threshold).head(cap))
+        return results
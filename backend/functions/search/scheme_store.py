@@ -0,0 +1,429 @@
+"""Process-wide in-memory copy of the `schemes` collection.
+
+The collection is small and changes rarely, yet search, the retrieve tool, the
+`schemes` endpoint and the catalog used to read it from Firestore on every
+request. `SchemeStore` loads every active scheme once (without `scraped_text`),
+keeps lookup indexes by ID, agency, planning area and scheme type, and stays
+current with a rate-limited delta poll on `last_scraped_update` plus a periodic
+full reload (which also picks up status changes and deletions). Both run on a
+background thread, so the request that crosses the interval does not wait.
+
+IDs it does not hold (new or inactive schemes, or IDs that do not exist) are
+read through from Firestore; the result, including "not found", is remembered
+for SCHEME_STORE_POLL_SECONDS so a repeated stale ID costs one read, not one
+per request. Readers always work on an immutable snapshot, so lookups never
+block on a refresh.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from google.cloud.firestore_v1 import FieldFilter
+from loguru import logger
+
+from .cache import QueryResultCache
+
+
+SCHEMES_COLLECTION = "schemes"
+# Batched scheme reads: documents per get_all call and concurrent calls in flight.
+FETCH_CHUNK_SIZE = 100
+FETCH_MAX_WORKERS = 8
+# Fields read from `schemes` documents. Firestore field masks are inclusion-only,
+# so this lists everything the API and agent use; `scraped_text` (often tens of
+# KB per scheme) is deliberately absent and never leaves the server. New scheme
+# fields must be added here to be returned: tests/unit/test_scheme_store.py fails
+# when the frontend's `RawScheme` type or the approval form has a field missing here.
+SCHEME_FIELDS = [
+    "address",
+    "agency",
+    "approved_at",
+    "approved_by",
+    "created_at",
+    "description",
+    "eligibility",
+    "email",
+    "how_to_apply",
+    "image",
+    "last_link_check",
+    "last_llm_processed_update",
+    "last_scraped_update",
+    "link",
+    "link_check_error",
+    "link_check_status_code",
+    "llm_description",
+    "phone",
+    "planning_area",
+    "scheme",
+    "scheme_type",
+    "search_booster",
+    "service_area",
+    "source_entry_id",
+    "status",
+    "status_reason",
+    "status_updated_at",
+    "summary",
+    "what_it_gives",
+    "who_is_it_for",
+]
+
+# "false" disables the store; every caller then reads Firestore directly.
+SCHEME_STORE_ENABLED = os.getenv("SCHEME_STORE_ENABLED", "true").lower() != "false"
+# How often (seconds) to poll for schemes updated since the last load.
+SCHEME_STORE_POLL_SECONDS = float(os.getenv("SCHEME_STORE_POLL_SECONDS", "60"))
+# How often (seconds) to reload everything, catching status changes and deletions.
+SCHEME_STORE_RELOAD_SECONDS = float(os.getenv("SCHEME_STORE_RELOAD_SECONDS", "1800"))
+# IDs read through from Firestore (new, inactive or missing) remembered for one poll interval.
+SCHEME_STORE_READ_THROUGH_ENTRIES = int(os.getenv("SCHEME_STORE_READ_THROUGH_ENTRIES", "1024"))
+
+# Read-through marker for an ID that does not exist in Firestore.
+_NOT_FOUND = object()
+
+
+def _scheme_record(doc: Any) -> Dict:
+    scheme_data = doc.to_dict() or {}
+    scheme_data["scheme_id"] = doc.id
+    scheme_data.pop("scraped_text", None)
+    return scheme_data
+
+
+def _is_active(scheme: Dict) -> bool:
+    # Schemes without a status field are active, as in the reindex.
+    return scheme.get("status") != "inactive"
+
+
+def _fetch_scheme_chunk(db: Any, scheme_ids: List[str]) -> Dict[str, Dict]:
+    """Fetch one chunk of schemes in a single batched read, without scraped_text."""
+    refs = [db.collection(SCHEMES_COLLECTION).document(scheme_id) for scheme_id in scheme_ids]
+    return {doc.id: _scheme_record(doc) for doc in db.get_all(refs, field_paths=SCHEME_FIELDS) if doc.exists}
+
+
+def read_schemes_by_ids(db: Any, scheme_ids: List[str]) -> Dict[str, Dict]:
+    """Read schemes straight from Firestore, keyed by ID; IDs that do not exist are absent.
+
+    IDs are read with `get_all` in chunks of FETCH_CHUNK_SIZE, fetched
+    concurrently on a bounded pool, with a field mask that leaves the large
+    `scraped_text` field on the server.
+    """
+    chunks = [scheme_ids[start : start + FETCH_CHUNK_SIZE] for start in range(0, len(scheme_ids), FETCH_CHUNK_SIZE)]
+    if not chunks:
+        return {}
+    if len(chunks) == 1:
+        return _fetch_scheme_chunk(db, chunks[0])
+
+    schemes: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(chunks))) as executor:
+        for chunk_result in executor.map(lambda chunk: _fetch_scheme_chunk(db, chunk), chunks):
+            schemes.update(chunk_result)
+    return schemes
+
+
+async def _afetch_scheme_chunk(db: Any, scheme_ids: List[str]) -> Dict[str, Dict]:
+    refs = [db.collection(SCHEMES_COLLECTION).document(scheme_id) for scheme_id in scheme_ids]
+    return {doc.id: _scheme_record(doc) async for doc in db.get_all(refs, field_paths=SCHEME_FIELDS) if doc.exists}
+
+
+async def aread_schemes_by_ids(db: Any, scheme_ids: List[str]) -> Dict[str, Dict]:
+    """`read_schemes_by_ids` through an async Firestore client; the chunks are read concurrently on the loop."""
+    chunks = [scheme_ids[start : start + FETCH_CHUNK_SIZE] for start in range(0, len(scheme_ids), FETCH_CHUNK_SIZE)]
+    schemes: Dict[str, Dict] = {}
+    for chunk_result in await asyncio.gather(*(_afetch_scheme_chunk(db, chunk) for chunk in chunks)):
+        schemes.update(chunk_result)
+    return schemes
+
+
+def _catalog_key(scheme: Dict) -> Optional[tuple]:
+    """Sort key matching the catalog query: newest `last_scraped_update` first, then ID.
+
+    Schemes without a timestamp are left out, as Firestore's order_by does.
+    """
+    updated = scheme.get("last_scraped_update")
+    if not isinstance(updated, datetime):
+        return None
+    return (-updated.timestamp(), scheme["scheme_id"])
+
+
+def _list_values(value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable view of the store; replaced wholesale on every change."""
+
+    by_id: Dict[str, Dict]
+    by_agency: Dict[str, List[str]]
+    by_planning_area: Dict[str, List[str]]
+    by_scheme_type: Dict[str, List[str]]
+    catalog_keys: Dict[str, tuple]
+    watermark: Optional[datetime]
+
+    @classmethod
+    def build(cls, by_id: Dict[str, Dict]) -> "_Snapshot":
+        by_agency: Dict[str, List[str]] = {}
+        by_planning_area: Dict[str, List[str]] = {}
+        by_scheme_type: Dict[str, List[str]] = {}
+        catalog_keys: Dict[str, tuple] = {}
+        watermark = None
+
+        for scheme_id, scheme in by_id.items():
+            agency = scheme.get("agency")
+            if isinstance(agency, str):
+                by_agency.setdefault(agency, []).append(scheme_id)
+            # planning_area and scheme_type are arrays, matched with array_contains(_any).
+            for area in _list_values(scheme.get("planning_area")):
+                by_planning_area.setdefault(area, []).append(scheme_id)
+            for scheme_type in _list_values(scheme.get("scheme_type")):
+                by_scheme_type.setdefault(scheme_type, []).append(scheme_id)
+
+            key = _catalog_key(scheme)
+            if key is not None:
+                catalog_keys[scheme_id] = key
+                updated = scheme["last_scraped_update"]
+                if watermark is None or updated > watermark:
+                    watermark = updated
+
+        return cls(by_id, by_agency, by_planning_area, by_scheme_type, catalog_keys, watermark)
+
+
+class SchemeStore:
+    """Singleton-patterned in-memory scheme store shared by every request in the process."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, firebase_manager: Any):
+        with cls._lock:
+            if cls._instance is None:
+                instance = super(SchemeStore, cls).__new__(cls)
+                instance._setup(firebase_manager)
+                cls._instance = instance
+            return cls._instance
+
+    def _setup(self, firebase_manager: Any, clock: Callable[[], float] = time.monotonic) -> None:
+        self.firebase_manager = firebase_manager
+        self._clock = clock
+        self._snapshot: Optional[_Snapshot] = None
+        self._write_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.refresh_thread: Optional[threading.Thread] = None
+        self.read_through = QueryResultCache(
+            max_entries=SCHEME_STORE_READ_THROUGH_ENTRIES,
+            ttl_seconds=SCHEME_STORE_POLL_SECONDS,
+            clock=lambda: self._clock(),
+        )
+        self.loaded_at: Optional[float] = None
+        self.polled_at: Optional[float] = None
+        self.reload()
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.by_id) if self._snapshot else 0
+
+    @property
+    def db(self) -> Any:
+        return self.firebase_manager.firestore_client
+
+    # ----- loading -----
+
+    def reload(self) -> bool:
+        """Replace the store with a full read of the active schemes. Returns False on failure."""
+        started = self._clock()
+        try:
+            docs = self.db.collection(SCHEMES_COLLECTION).select(SCHEME_FIELDS).stream()
+            # Filtered here: a `status != "inactive"` query would also drop schemes with no status.
+            by_id = {doc.id: scheme for doc in docs if _is_active(scheme := _scheme_record(doc))}
+        except Exception as e:
+            logger.warning(f"Failed to load scheme store: {e}")
+            self.polled_at = started
+            return False
+
+        snapshot = _Snapshot.build(by_id)
+        with self._write_lock:
+            self._snapshot = snapshot
+        self.read_through.clear()
+        self.loaded_at = self.polled_at = started
+        logger.info(f"Loaded {len(by_id)} active schemes into the scheme store")
+        return True
+
+    def poll_updates(self) -> int:
+        """Merge schemes whose `last_scraped_update` moved past the watermark, dropping any now inactive.
+
+        Returns the count.
+        """
+        snapshot = self._snapshot
+        self.polled_at = self._clock()
+        if snapshot is None or snapshot.watermark is None:
+            return 0
+
+        try:
+            docs = (
+                self.db.collection(SCHEMES_COLLECTION)
+                .where(filter=FieldFilter("last_scraped_update", ">", snapshot.watermark))
+                .select(SCHEME_FIELDS)
+                .stream()
+            )
+            updated = {doc.id: _scheme_record(doc) for doc in docs}
+        except Exception as e:
+            logger.warning(f"Failed to poll scheme updates: {e}")
+            return 0
+
+        if updated:
+            self._merge(updated)
+            logger.info(f"Scheme store picked up {len(updated)} updated schemes")
+        return len(updated)
+
+    def _merge(self, schemes: Dict[str, Dict]) -> None:
+        with self._write_lock:
+            by_id = dict(self._snapshot.by_id) if self._snapshot else {}
+            for scheme_id, scheme in schemes.items():
+                if _is_active(scheme):
+                    by_id[scheme_id] = scheme
+                else:
+                    by_id.pop(scheme_id, None)
+            self._snapshot = _Snapshot.build(by_id)
+
+    def _due_refresh(self) -> Optional[Callable[[], Any]]:
+        now = self._clock()
+        if self.loaded and now - self.loaded_at >= SCHEME_STORE_RELOAD_SECONDS:
+            return self.reload
+        if self.polled_at is None or now - self.polled_at >= SCHEME_STORE_POLL_SECONDS:
+            return self.poll_updates if self.loaded else self.reload
+        return None
+
+    def maybe_refresh(self) -> bool:
+        """Start a reload or poll on a background thread when one is due. Returns True if one was started.
+
+        Only one refresh runs at a time; callers never wait for it and keep
+        reading the current snapshot until the new one is swapped in.
+        """
+        if self._due_refresh() is None or not self._refresh_lock.acquire(blocking=False):
+            return False
+        # Re-checked under the lock: a refresh may have finished since the first check.
+        action = self._due_refresh()
+        if action is None:
+            self._refresh_lock.release()
+            return False
+
+        try:
+            self.refresh_thread = threading.Thread(
+                target=self._refresh_in_background, args=(action,), name="scheme-store-refresh", daemon=True
+            )
+            self.refresh_thread.start()
+        except Exception:
+            self._refresh_lock.release()
+            raise
+        return True
+
+    def _refresh_in_background(self, action: Callable[[], Any]) -> None:
+        try:
+            action()
+        except Exception as e:
+            logger.warning(f"Scheme store refresh failed, keeping the current snapshot: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    # ----- lookups -----
+
+    def get(self, scheme_id: str) -> Optional[Dict]:
+        """Return a copy of one scheme, reading through to Firestore on a miss."""
+        schemes, _ = self.get_many([scheme_id])
+        return schemes[0] if schemes else None
+
+    def get_many(self, scheme_ids: List[str]) -> tuple[List[Dict], List[str]]:
+        """Return copies of the requested schemes in request order, plus the IDs not found.
+
+        IDs the store does not hold (e.g. approved since the last load, or
+        inactive) are read from Firestore; active ones are added to the store,
+        and the rest, including IDs that do not exist, are remembered in
+        `read_through` for one poll interval.
+        """
+        self.maybe_refresh()
+        by_id = self._snapshot.by_id
+
+        fetched: Dict[str, Dict] = {}
+        unknown = []
+        for scheme_id in dict.fromkeys(scheme_ids):
+            if scheme_id in by_id:
+                continue
+            remembered = self.read_through.get(scheme_id)
+            if remembered is None:
+                unknown.append(scheme_id)
+            elif remembered is not _NOT_FOUND:
+                fetched[scheme_id] = remembered
+        if unknown:
+            read = read_schemes_by_ids(self.db, unknown)
+            fetched.update(read)
+            for scheme_id in unknown:
+                scheme = read.get(scheme_id)
+                if scheme is None or not _is_active(scheme):
+                    self.read_through[scheme_id] = _NOT_FOUND if scheme is None else scheme
+            active = {scheme_id: scheme for scheme_id, scheme in read.items() if _is_active(scheme)}
+            if active:
+                self._merge(active)
+
+        schemes, missing = [], []
+        for scheme_id in scheme_ids:
+            scheme = by_id.get(scheme_id) or fetched.get(scheme_id)
+            if scheme is None:
+                missing.append(scheme_id)
+            else:
+                schemes.append(dict(scheme))
+        return schemes, missing
+
+    def ids_by_agency(self, agency: str) -> List[str]:
+        self.maybe_refresh()
+        return list(self._snapshot.by_agency.get(agency, []))
+
+    def ids_by_planning_area(self, planning_area: str) -> List[str]:
+        self.maybe_refresh()
+        return list(self._snapshot.by_planning_area.get(planning_area, []))
+
+    def ids_by_scheme_type(self, scheme_types: str | Iterable[str]) -> List[str]:
+        """IDs having any of the given scheme types (array_contains_any semantics)."""
+        self.maybe_refresh()
+        if isinstance(scheme_types, str):
+            scheme_types = [scheme_types]
+        index = self._snapshot.by_scheme_type
+        return list(dict.fromkeys(scheme_id for value in scheme_types for scheme_id in index.get(value, [])))
+
+    def all_ids(self) -> List[str]:
+        self.maybe_refresh()
+        return list(self._snapshot.by_id)
+
+    # ----- catalog ordering -----
+
+    def catalog_order(self, scheme_ids: Iterable[str]) -> List[str]:
+        """Order IDs like the catalog query (newest update first), dropping undated schemes."""
+        keys = self._snapshot.catalog_keys
+        return sorted((scheme_id for scheme_id in scheme_ids if scheme_id in keys), key=keys.__getitem__)
+
+    def catalog_start(self, ordered_ids: List[str], cursor_id: str) -> Optional[int]:
+        """Index of the first ID at or after the cursor scheme's position, like start_at(snapshot).
+
+        Returns None when the cursor scheme is unknown or undated.
+        """
+        keys = self._snapshot.catalog_keys
+        cursor_key = keys.get(cursor_id)
+        if cursor_key is None:
+            return None
+        return bisect_left([keys[scheme_id] for scheme_id in ordered_ids], cursor_key)
+
+
+def get_scheme_store(firebase_manager: Any) -> Optional[SchemeStore]:
+    """Return the loaded process-wide store, or None so callers fall back to Firestore."""
+    if not SCHEME_STORE_ENABLED:
+        return None
+    store = SchemeStore(firebase_manager)
+    if not store.loaded:
+        store.maybe_refresh()
+    return store if store.loaded else None
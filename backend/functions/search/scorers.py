@@ -1,58 +1,56 @@
-import pandas as pd
-from langchain_community.retrievers import BM25Retriever
-from langchain_core.documents import Document
+from typing import Optional, Sequence
 
+import numpy as np
 
-VEC_SIMILARITY_WEIGHT = 0.7
-BM25_SIMILARITY_WEIGHT = 0.3
+from .bm25_index import BM25Index
+from .fusion import fuse, normalize_bm25_scores
+from .results import SearchResults
+from .timing import span
 
 
-def rank_results(query_text: str, results: pd.DataFrame) -> pd.DataFrame:
+def rank_results(
+    query_text: str,
+    results: SearchResults,
+    bm25_index: Optional[BM25Index] = None,
+    fusion: Optional[str] = None,
+) -> SearchResults:
     """Re-rank results using BM25 and combine with vector scores.
 
-    Returns a DataFrame with 'bm25_score' and 'combined_scores' columns, sorted
+    `bm25_index` is the corpus-level index built at warm-up; without one, a
+    throwaway index is built over the candidate pool. `fusion` names the
+    strategy in search.fusion (default from config). Returns the results with
+    BM25 raw and normalized (0-1) scores and combined scores attached, sorted
     by combined score descending.
     """
-    docs = [
-        Document(page_content=content or "", metadata={"id": sid})
-        for sid, content in zip(results["scheme_id"], results["search_booster"])
-    ]
-    retriever = BM25Retriever.from_documents(docs)
-    retriever.k = len(docs)
-
-    bm25_results = [
-        (doc.metadata["id"], 1.0 - (i / retriever.k)) for i, doc in enumerate(retriever.invoke(query_text))
-    ]
-    bm25_df = pd.DataFrame(bm25_results, columns=["scheme_id", "bm25_score"])
-
-    results = pd.merge(results, bm25_df, on="scheme_id", how="left")
-    results["combined_scores"] = (
-        results["vec_similarity_score"] * VEC_SIMILARITY_WEIGHT
-        + results["bm25_score"].fillna(0) * BM25_SIMILARITY_WEIGHT
-    )
-    return results.sort_values("combined_scores", ascending=False)
-
-
-def compute_vec_scores(ids: list[str], distances: list[float]) -> pd.DataFrame:
+    with span("bm25"):
+        texts = [scheme.get("search_booster") for scheme in results.schemes]
+        if bm25_index is None:
+            bm25_index = BM25Index(results.ids, texts)
+        raw_scores = bm25_index.scores(query_text, results.ids, texts=texts)
+
+    with span("fusion"):
+        return results.with_scores(
+            bm25_raw_scores=raw_scores,
+            bm25_scores=normalize_bm25_scores(raw_scores),
+            combined_scores=fuse(results.vec_scores, raw_scores, fusion),
+        ).sorted_by_combined()
+
+
+def compute_vec_scores(distances: Sequence[float]) -> np.ndarray:
     """Convert real cosine distances into a normalized 0-1 relevance score.
 
     Firestore returns a cosine distance per match where 0 means identical and
     larger means less similar. We turn that into a relevance score where a
     closer match scores higher, so a relevance threshold can be applied
-    downstream. Returns a DataFrame with columns `scheme_id` and
-    `vec_similarity_score`.
+    downstream. Returns an array aligned with `distances`.
     """
-    if not ids:
-        return pd.DataFrame(columns=["scheme_id", "vec_similarity_score"])
-
     # Smaller distance = better match = higher relevance.
-    relevance = [-d for d in distances]
+    relevance = -np.asarray(distances, dtype=np.float32)
+    if not len(relevance):
+        return relevance
 
     # Normalize to 0-1 across this result set (best match -> 1).
-    if len(relevance) > 1 and max(relevance) > min(relevance):
-        lo, hi = min(relevance), max(relevance)
-        relevance = [(r - lo) / (hi - lo) for r in relevance]
-    else:
-        relevance = [1.0 for _ in relevance]
-
-    return pd.DataFrame(zip(ids, relevance), columns=["scheme_id", "vec_similarity_score"])
+    lo, hi = relevance.min(), relevance.max()
+    if hi > lo:
+        return (relevance - lo) / (hi - lo)
+    return np.ones(len(relevance), dtype=np.float32)
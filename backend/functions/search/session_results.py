@@ -0,0 +1,111 @@
+"""Compact storage format for search session results.
+
+Query records (`userQuery`, `llmQuery`, `filterRerankResults`) and the chat
+checkpoint mirror used to embed a full copy of every returned scheme. They now
+store the ordered scheme IDs, the combined score for each and the index
+generation the ranking came from:
+
+    {"results_format": "scheme_ids_v1", "scheme_ids": [...], "scores": [...],
+     "index_generation": ...}
+
+Readers call `hydrate_results`, which rebuilds `schemes_response` from the
+shared SchemeStore (or batched Firestore reads) in the stored order, with
+timestamps as epoch seconds as before. Schemes deleted since the search are
+dropped. Records in the old format pass through unchanged.
+"""
+
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .retriever import fetch_schemes_by_ids
+
+
+RESULTS_FORMAT = "scheme_ids_v1"
+SCORE_KEY = "combined_scores"
+
+
+def _score(value: Any) -> Optional[float]:
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score if math.isfinite(score) else None
+
+
+def _stored_value(value: Any) -> Any:
+    """Timestamps as epoch seconds, the shape full copies used to be stored in."""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, dict):
+        return {k: _stored_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_stored_value(v) for v in value]
+    return value
+
+
+def compact_results(schemes: Sequence[Dict], index_generation: Any = None) -> Dict[str, Any]:
+    """Ordered scheme IDs and combined scores for `schemes` (result records or scheme dicts)."""
+    schemes = [scheme for scheme in schemes if isinstance(scheme, dict) and scheme.get("scheme_id")]
+    return {
+        "results_format": RESULTS_FORMAT,
+        "scheme_ids": [scheme["scheme_id"] for scheme in schemes],
+        "scores": [_score(scheme.get(SCORE_KEY)) for scheme in schemes],
+        "index_generation": index_generation,
+    }
+
+
+def is_compact(record: Any) -> bool:
+    return isinstance(record, dict) and record.get("results_format") == RESULTS_FORMAT
+
+
+def hydrate_scheme_ids(
+    firebase_manager: Any,
+    scheme_ids: Sequence[str],
+    scores: Optional[Sequence[Optional[float]]] = None,
+    query: Optional[str] = None,
+    epoch_timestamps: bool = True,
+    component_scores: Optional[Dict[str, Sequence[Optional[float]]]] = None,
+) -> List[Dict]:
+    """Scheme dicts for `scheme_ids` in order, with their stored score (and query) attached.
+
+    Timestamps become epoch seconds, as in the old stored copies, unless
+    `epoch_timestamps` is False (API responses serialize them as ISO strings).
+    `component_scores` maps further record keys (e.g. `bm25_score`) to
+    per-position values, attached ahead of the combined score.
+    """
+    if not scheme_ids:
+        return []
+    schemes, _ = fetch_schemes_by_ids(firebase_manager, list(scheme_ids))
+    by_id = {scheme["scheme_id"]: scheme for scheme in schemes}
+    scores = list(scores) if scores is not None else []
+    component_scores = component_scores or {}
+
+    hydrated = []
+    for i, scheme_id in enumerate(scheme_ids):
+        scheme = by_id.get(scheme_id)
+        if scheme is None:
+            continue
+        record = {key: _stored_value(value) for key, value in scheme.items()} if epoch_timestamps else dict(scheme)
+        for key, values in component_scores.items():
+            if i < len(values):
+                record[key] = values[i]
+        if i < len(scores) and scores[i] is not None:
+            record[SCORE_KEY] = scores[i]
+        if query is not None:
+            record["query"] = query
+        hydrated.append(record)
+    return hydrated
+
+
+def hydrate_results(firebase_manager: Any, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a stored query record with `schemes_response` rebuilt from its scheme IDs."""
+    if not is_compact(record):
+        return record
+    hydrated = {
+        key: value for key, value in record.items() if key not in ("results_format", "scheme_ids", "scores")
+    }
+    hydrated["schemes_response"] = hydrate_scheme_ids(
+        firebase_manager, record.get("scheme_ids") or [], record.get("scores"), record.get("query_text")
+    )
+    return hydrated
@@ -0,0 +1,185 @@
+"""Ranked result snapshots for paginated search sessions.
+
+The first page of a `/schemes_search` session ranks and filters the results
+once and saves the ordered scheme IDs with their combined and per-signal
+scores as an immutable snapshot keyed by `session_id`. Later pages carry an offset cursor into that
+snapshot, so page N is an O(limit) slice that hydrates only its own schemes,
+and the order stays the same even if a reindex lands mid-session.
+
+Snapshots live in a bounded in-process cache and are also written to the
+`searchSessions` collection before the first page is returned, so a cursor
+that reaches a different instance can still be served. Each document carries
+an `expire_at` Timestamp; the Firestore TTL policy on that field (see
+firestore.indexes.json) deletes expired sessions, and reads treat a session
+past `expire_at` as gone, since TTL deletion can lag by a day or more.
+"""
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence
+
+from loguru import logger
+
+from .cache import QueryResultCache
+from .session_results import compact_results, is_compact
+
+
+SESSION_SNAPSHOTS_COLLECTION = "searchSessions"
+# In-process snapshot count, and how long (seconds) a session stays pageable (sets `expire_at`).
+SESSION_SNAPSHOT_MAX_ENTRIES = int(os.getenv("SEARCH_SESSION_MAX_ENTRIES", "2048"))
+SESSION_SNAPSHOT_TTL_SECONDS = float(os.getenv("SEARCH_SESSION_TTL_SECONDS", "3600"))
+
+
+@dataclass(frozen=True)
+class SessionSnapshot:
+    """Ordered scheme IDs and combined scores for one search session.
+
+    `component_scores` holds the per-signal scores (vec_similarity_score,
+    bm25_raw_score, bm25_score) by record key, so every page carries the
+    same fields as the first.
+    """
+
+    session_id: str
+    query: str
+    scheme_ids: tuple
+    scores: tuple
+    index_generation: Any = None
+    component_scores: Dict[str, tuple] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.scheme_ids)
+
+    def page(self, offset: int, limit: int) -> tuple[tuple, tuple]:
+        """The `(scheme_ids, scores)` slice for one page."""
+        end = offset + max(limit, 0)
+        return self.scheme_ids[offset:end], self.scores[offset:end]
+
+    def component_page(self, offset: int, limit: int) -> Dict[str, tuple]:
+        """The per-signal score slices for the same page as `page()`."""
+        end = offset + max(limit, 0)
+        return {key: values[offset:end] for key, values in self.component_scores.items()}
+
+    def to_record(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "query_text": self.query,
+            "expire_at": datetime.now(timezone.utc) + timedelta(seconds=SESSION_SNAPSHOT_TTL_SECONDS),
+            **compact_results(
+                [{"scheme_id": i, "combined_scores": s} for i, s in zip(self.scheme_ids, self.scores)],
+                self.index_generation,
+            ),
+            "component_scores": {key: list(values) for key, values in self.component_scores.items()},
+        }
+
+    @classmethod
+    def from_record(cls, session_id: str, record: dict) -> Optional["SessionSnapshot"]:
+        if not is_compact(record):
+            return None
+        return cls(
+            session_id=session_id,
+            query=record.get("query_text", ""),
+            scheme_ids=tuple(record.get("scheme_ids") or ()),
+            scores=tuple(record.get("scores") or ()),
+            index_generation=record.get("index_generation"),
+            # Absent from snapshots saved before per-signal scores were kept.
+            component_scores={key: tuple(values) for key, values in (record.get("component_scores") or {}).items()},
+        )
+
+
+def _expired(record: dict) -> bool:
+    expire_at = record.get("expire_at")
+    if isinstance(expire_at, datetime):
+        return expire_at <= datetime.now(timezone.utc)
+    # Sessions saved before `expire_at` only carry a float `created_at`.
+    created_at = record.get("created_at")
+    return isinstance(created_at, (int, float)) and time.time() - created_at > SESSION_SNAPSHOT_TTL_SECONDS
+
+
+def _snapshot_size(snapshot: SessionSnapshot) -> int:
+    ids = sys.getsizeof(snapshot.scheme_ids) + sum(sys.getsizeof(i) for i in snapshot.scheme_ids)
+    return ids + 32 * len(snapshot) * (1 + len(snapshot.component_scores))
+
+
+class SessionSnapshotStore:
+    """Singleton-patterned store of session snapshots: memory first, Firestore behind it."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, firebase_manager: Any):
+        with cls._lock:
+            if cls._instance is None:
+                instance = super(SessionSnapshotStore, cls).__new__(cls)
+                instance._setup(firebase_manager)
+                cls._instance = instance
+            return cls._instance
+
+    def _setup(self, firebase_manager: Any) -> None:
+        self.firebase_manager = firebase_manager
+        self.snapshots = QueryResultCache(
+            max_entries=SESSION_SNAPSHOT_MAX_ENTRIES,
+            ttl_seconds=SESSION_SNAPSHOT_TTL_SECONDS,
+            sizeof=_snapshot_size,
+        )
+
+    def save(
+        self,
+        session_id: str,
+        query: str,
+        scheme_ids: Sequence[str],
+        scores: Sequence[Optional[float]],
+        index_generation: Any = None,
+        component_scores: Optional[Dict[str, Sequence[Optional[float]]]] = None,
+    ) -> SessionSnapshot:
+        snapshot = SessionSnapshot(
+            session_id,
+            query,
+            tuple(scheme_ids),
+            tuple(scores),
+            index_generation,
+            {key: tuple(values) for key, values in (component_scores or {}).items()},
+        )
+        self.snapshots[session_id] = snapshot
+
+        # Written before the first page is returned: the next cursor may reach another instance.
+        try:
+            self.firebase_manager.firestore_client.collection(SESSION_SNAPSHOTS_COLLECTION).document(session_id).set(
+                snapshot.to_record()
+            )
+        except Exception as e:
+            logger.warning(f"Could not persist search session {session_id}; it is pageable on this instance only: {e}")
+        return snapshot
+
+    def load(self, session_id: str) -> Optional[SessionSnapshot]:
+        """The snapshot for `session_id`, from memory or Firestore, or None if it has expired."""
+        snapshot = self.snapshots.get(session_id)
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            doc = (
+                self.firebase_manager.firestore_client.collection(SESSION_SNAPSHOTS_COLLECTION)
+                .document(session_id)
+                .get()
+            )
+        except Exception as e:
+            logger.warning(f"Could not read search session {session_id}: {e}")
+            return None
+        if not doc.exists:
+            return None
+        record = doc.to_dict() or {}
+        if _expired(record):
+            return None
+
+        snapshot = SessionSnapshot.from_record(session_id, record)
+        if snapshot is not None:
+            self.snapshots[session_id] = snapshot
+        return snapshot
+
+
+def get_session_snapshots(firebase_manager: Any) -> SessionSnapshotStore:
+    return SessionSnapshotStore(firebase_manager)
@@ -0,0 +1,91 @@
+"""Coalescing of concurrent identical searches.
+
+When a query trends, several requests on the same instance miss the result
+cache at once and each embed it, run the nearest-neighbour search and hydrate
+the pool. `SingleFlight` lets the first caller for a key do the work while
+concurrent callers with the same key wait for it and share its result (or its
+exception). Nothing is remembered once the call completes; the result cache
+serves later requests.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from loguru import logger
+
+
+# "false" disables coalescing; every cache miss then computes its own result.
+SINGLE_FLIGHT_ENABLED = os.getenv("SEARCH_SINGLE_FLIGHT", "true").lower() != "false"
+# How long (seconds) a waiter waits for the in-flight call before computing on its own.
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv("SEARCH_SINGLE_FLIGHT_TIMEOUT_SECONDS", "30"))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-safe map of in-flight calls, keyed by what they compute."""
+
+    def __init__(self, timeout_seconds: Optional[float] = None):
+        self.timeout_seconds = timeout_seconds
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return `fn()`, sharing one execution among concurrent callers with the same key."""
+        if not SINGLE_FLIGHT_ENABLED:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            timeout = self.timeout_seconds if self.timeout_seconds is not None else SINGLE_FLIGHT_TIMEOUT_SECONDS
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self.timeouts += 1
+                logger.warning(f"In-flight search for {key!r} took over {timeout}s; computing separately")
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for logging/metrics."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+            }
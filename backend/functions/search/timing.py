@@ -0,0 +1,156 @@
+"""Per-stage timings for search requests.
+
+A request opens a collector with `collect_timings(...)`; code along the search
+path marks its stages with the `span(name)` context manager or the
+`@timed(name)` decorator. Spans nest, so a stage is recorded under its parent's
+path (e.g. `search/embed`), and repeated stages are summed with a count.
+
+When no collector is active (timings disabled and not requested for this
+call), `span` returns a shared no-op context and `timed` calls straight through,
+so instrumented code pays one context-variable lookup per stage.
+
+On exit the collector logs one structured line and, if enabled, records the
+timings on a Langfuse span. Callers can also return `timings.as_dict()` in a
+debug response.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from loguru import logger
+
+
+# Collect timings for every search request (otherwise only for debug requests).
+SEARCH_TIMINGS_ENABLED = os.getenv("SEARCH_TIMINGS", "false").lower() in ("1", "true", "yes")
+# Also record collected timings as a Langfuse span (needs LANGFUSE_* credentials).
+SEARCH_TIMINGS_LANGFUSE = os.getenv("SEARCH_TIMINGS_LANGFUSE", "false").lower() in ("1", "true", "yes")
+
+
+class Timings:
+    """Stage durations collected for one request, keyed by nested span path."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.total_ms: Optional[float] = None
+        self.stages: dict[str, dict[str, float]] = {}
+        self._stack: list[str] = []
+
+    def enter(self, stage: str) -> str:
+        path = f"{self._stack[-1]}/{stage}" if self._stack else stage
+        self._stack.append(path)
+        return path
+
+    def exit(self, path: str, elapsed_ms: float) -> None:
+        if self._stack and self._stack[-1] == path:
+            self._stack.pop()
+        entry = self.stages.setdefault(path, {"ms": 0.0, "count": 0})
+        entry["ms"] += elapsed_ms
+        entry["count"] += 1
+
+    def finish(self) -> None:
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-ready summary: total and per-stage milliseconds, rounded to 0.01 ms."""
+        total_ms = self.total_ms if self.total_ms is not None else (time.perf_counter() - self.started) * 1000
+        return {
+            "name": self.name,
+            "total_ms": round(total_ms, 2),
+            "stages": {
+                path: {"ms": round(entry["ms"], 2), "count": entry["count"]} for path, entry in self.stages.items()
+            },
+        }
+
+
+_active: ContextVar[Optional[Timings]] = ContextVar("search_timings", default=None)
+_NOOP = nullcontext()
+
+
+class _Span:
+    __slots__ = ("timings", "stage", "path", "started")
+
+    def __init__(self, timings: Timings, stage: str):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.path = self.timings.enter(self.stage)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.timings.exit(self.path, (time.perf_counter() - self.started) * 1000)
+
+
+def span(stage: str):
+    """Time the enclosed block as `stage` under the active collector, if any."""
+    timings = _active.get()
+    if timings is None:
+        return _NOOP
+    return _Span(timings, stage)
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of `span`."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _active.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            with _Span(timings, stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_timings() -> Optional[Timings]:
+    return _active.get()
+
+
+@contextmanager
+def collect_timings(name: str, force: bool = False) -> Iterator[Optional[Timings]]:
+    """Collect stage timings for the enclosed request.
+
+    Active when SEARCH_TIMINGS is set or `force` is True (debug requests);
+    otherwise yields None and spans inside stay no-ops. Inside an already
+    active collector, the enclosing one is reused and reports on its own exit.
+    """
+    outer = _active.get()
+    if outer is not None:
+        yield outer
+        return
+    if not (SEARCH_TIMINGS_ENABLED or force):
+        yield None
+        return
+
+    timings = Timings(name)
+    token = _active.set(timings)
+    try:
+        yield timings
+    finally:
+        _active.reset(token)
+        timings.finish()
+        _report(timings)
+
+
+def _report(timings: Timings) -> None:
+    summary = timings.as_dict()
+    stages = ", ".join(f"{path}={entry['ms']}ms" for path, entry in summary["stages"].items())
+    logger.bind(timings=summary).info(f"{timings.name} took {summary['total_ms']}ms ({stages})")
+
+    if SEARCH_TIMINGS_LANGFUSE:
+        try:
+            from langfuse import get_client
+
+            get_client().start_observation(name=f"search.{timings.name}", as_type="span", metadata=summary).end()
+        except Exception as e:
+            logger.warning(f"Could not record search timings in Langfuse: {e}")
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel
 
 
@@ -11,6 +11,8 @@ class PredictParams(BaseModel):
     is_warmup: Optional[bool] = False  # Add flag for warmup requests
     session_id: Optional[str] = None  # Add optional session_id for context association
     requested_target: Optional[int] = None  # count the user asked for, e.g. "20 healthcare schemes"
+    fusion: Optional[Literal["weighted_sum", "rrf", "zscore"]] = None  # score fusion strategy; None = configured default
+    debug: Optional[bool] = False  # include per-stage timings in the response
 
 
 class PaginatedSearchParams(BaseModel):
@@ -21,5 +23,7 @@ class PaginatedSearchParams(BaseModel):
     cursor: Optional[str] = None
     similarity_threshold: Optional[float] = None
     is_warmup: Optional[bool] = False
-    top_k: Optional[int] = 100  # Number of items to retrieve from vector search
+    top_k: Optional[int] = 100  # Maximum number of ranked results to page through
     filters: Optional[Dict[str, List[str]]] = {}
+    fusion: Optional[Literal["weighted_sum", "rrf", "zscore"]] = None  # score fusion strategy; None = configured default
+    debug: Optional[bool] = False  # include per-stage timings in the response
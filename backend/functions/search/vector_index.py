@@ -0,0 +1,162 @@
+"""In-process exact cosine index over the `schemes_embeddings` collection.
+
+The scheme corpus is small (a few thousand 2048-dim vectors at most), so the
+whole collection fits in one contiguous float32 matrix. Rows are L2-normalised
+once at load time, which turns every query into a single matrix-vector product
+instead of a Firestore `find_nearest` round trip. Distances follow Firestore's
+COSINE measure (0 = identical, 2 = opposite) so downstream scoring is unchanged.
+"""
+
+from typing import Any, Iterable, Optional, Protocol, Sequence
+
+import numpy as np
+from loguru import logger
+
+
+class VectorBackend(Protocol):
+    """What SearchModel needs from an in-process nearest-neighbour index.
+
+    Implemented by VectorIndex (exact), QuantizedVectorIndex and the
+    approximate backends in search.ann_index. `ids` are in row order, so row
+    positions from a FilterIndex over the same ids can restrict a search.
+    """
+
+    ids: list[str]
+
+    def __len__(self) -> int: ...
+
+    @property
+    def dimension(self) -> int: ...
+
+    def search(
+        self, query_vector: Sequence[float], limit: int, rows: Optional[np.ndarray] = None
+    ) -> tuple[list[str], list[float]]: ...
+
+    def search_many(
+        self, query_vectors: Sequence[Sequence[float]], limit: int
+    ) -> list[tuple[list[str], list[float]]]: ...
+
+
+def nearest_order(distances: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k smallest distances, nearest first (ties keep position order)."""
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(distances):
+        top = np.argpartition(distances, k - 1)[:k]
+        return top[np.argsort(distances[top], kind="stable")]
+    return np.argsort(distances, kind="stable")
+
+
+class VectorIndex:
+    """Exact cosine-distance search over an in-memory embedding matrix."""
+
+    def __init__(self, ids: Sequence[str], vectors: Any):
+        matrix = np.array(vectors, dtype=np.float32, copy=True, order="C")
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(f"Expected a ({len(ids)}, dim) matrix, got shape {matrix.shape}")
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        np.divide(matrix, norms, out=matrix)
+
+        self.ids = list(ids)
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @classmethod
+    def from_normalised(cls, ids: Sequence[str], matrix: np.ndarray) -> "VectorIndex":
+        """Wrap rows that are already L2-normalised (e.g. a memory-mapped artifact) without copying them."""
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(f"Expected a ({len(ids)}, dim) matrix, got shape {matrix.shape}")
+        index = cls.__new__(cls)
+        index.ids = list(ids)
+        index.matrix = matrix
+        return index
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[Any], vector_field: str = "embedding") -> "VectorIndex":
+        """Build an index from Firestore document snapshots holding a `Vector` field.
+
+        Documents without the vector field, or whose dimension disagrees with the
+        first vector seen, are skipped with a warning rather than failing the load.
+        """
+        ids: list[str] = []
+        rows: list[list[float]] = []
+        dimension = None
+
+        for doc in docs:
+            vector = (doc.to_dict() or {}).get(vector_field)
+            if vector is None:
+                continue
+            row = list(vector)
+            if dimension is None:
+                dimension = len(row)
+            elif len(row) != dimension:
+                logger.warning(f"Skipping embedding {doc.id}: dimension {len(row)} != {dimension}")
+                continue
+            ids.append(doc.id)
+            rows.append(row)
+
+        if not rows:
+            return cls([], np.empty((0, 0), dtype=np.float32))
+        return cls(ids, rows)
+
+    def search(
+        self, query_vector: Sequence[float], limit: int, rows: Optional[np.ndarray] = None
+    ) -> tuple[list[str], list[float]]:
+        """Return the `limit` nearest ids and their cosine distances, nearest first.
+
+        `rows` restricts the search to those row positions (e.g. the rows a
+        FilterIndex found eligible); only they are scored.
+        """
+        if not self.ids or limit <= 0 or (rows is not None and not len(rows)):
+            return [], []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            raise ValueError(f"Query vector has shape {query.shape}, index dimension is {self.dimension}")
+
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        distances = 1.0 - matrix @ query
+        order = nearest_order(distances, limit)
+
+        positions = order if rows is None else rows[order]
+        return [self.ids[i] for i in positions], distances[order].astype(float).tolist()
+
+    def search_many(self, query_vectors: Sequence[Sequence[float]], limit: int) -> list[tuple[list[str], list[float]]]:
+        """`search` for several queries at once, scoring them all in one matrix-matrix product."""
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if not len(queries):
+            return []
+        if not self.ids or limit <= 0:
+            return [([], []) for _ in range(len(queries))]
+        if queries.ndim != 2 or queries.shape[1] != self.dimension:
+            raise ValueError(f"Query matrix has shape {queries.shape}, index dimension is {self.dimension}")
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        distances = 1.0 - (queries / norms) @ self.matrix.T
+
+        k = min(limit, len(self.ids))
+        if k < len(self.ids):
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            top_distances = np.take_along_axis(distances, top, axis=1)
+            order = np.take_along_axis(top, np.argsort(top_distances, axis=1, kind="stable"), axis=1)
+        else:
+            order = np.argsort(distances, axis=1, kind="stable")
+
+        results = []
+        for row, positions in enumerate(order):
+            results.append(([self.ids[i] for i in positions], distances[row, positions].astype(float).tolist()))
+        return results
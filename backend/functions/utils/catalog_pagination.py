@@ -215,3 +215,48 @@ def get_paginated_results(
         has_more=has_more,
         total_count=_count_total(collection_ref, base_query),
     )
+
+
+def get_paginated_store_results(
+    store: Any,
+    scheme_ids: list[str],
+    cursor: Optional[str] = None,
+    limit: int = 10,
+) -> PaginationResult:
+    """Paginate catalog results from the in-memory scheme store.
+
+    Mirrors `get_paginated_results`: same ordering (newest `last_scraped_update`
+    first), same signed cursors, and a cursor page starts at the cursor scheme
+    inclusively, like `start_at(snapshot)`.
+
+    Args:
+        store: Loaded `search.scheme_store.SchemeStore`.
+        scheme_ids: IDs matching the active filter (or every scheme).
+        cursor: Optional signed cursor token from a previous response.
+        limit: Maximum number of results to return in this page.
+
+    Returns:
+        Pagination metadata and scheme data for the current page.
+    """
+    ordered_ids = store.catalog_order(scheme_ids)
+
+    start = 0
+    doc_id = _decode_cursor(cursor) if cursor else None
+    if doc_id:
+        position = store.catalog_start(ordered_ids, doc_id)
+        if position is None:
+            logger.warning(f"Cursor doc_id not found in collection: {doc_id}")
+        else:
+            start = position
+
+    page_ids = ordered_ids[start : start + limit + 1]
+    has_more = len(page_ids) > limit
+    next_cursor = _encode_cursor(page_ids[-1]) if has_more else None
+    schemes, _ = store.get_many(page_ids[:limit])
+
+    return PaginationResult(
+        data=schemes,
+        next_cursor=next_cursor,
+        has_more=has_more,
+        total_count=len(scheme_ids),
+    )
@@ -1,61 +1,84 @@
-"""JSON utilities for handling Firestore data types."""
+"""JSON utilities for handling Firestore data types.
+
+`safe_json_dumps` serializes API responses in a single pass. With orjson
+installed, NaN/Infinity become null and numpy values are encoded natively,
+and `_default` is only called for the types orjson does not know:
+
+- Firestore Timestamp / DatetimeWithNanoseconds, pandas Timestamp and other
+  datetime subclasses are converted to ISO format strings
+- pandas NA / NaT become None (null in JSON)
+- numpy scalars and arrays become Python numbers and lists
+
+Without orjson (or for json.dumps options orjson does not support), the data
+is converted by one recursive walk (`to_json_compatible`) and then handed to
+the standard library encoder.
+
+orjson always writes UTF-8, so the orjson path emits non-ASCII characters
+as-is ("café") where `json.dumps` escaped them by default ("caf\\u00e9"). Both
+decode to the same value; pass `ensure_ascii=True` explicitly to get the
+escaped form from the standard encoder.
+"""
 
 import json
 import math
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
-from google.cloud.firestore_v1._helpers import DatetimeWithNanoseconds
+import numpy as np
+import pandas as pd
 
 
-class FirestoreJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that handles Firestore data types.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is not installed
+    orjson = None
 
-    This encoder converts Firestore-specific data types to JSON-serializable formats:
-    - Firestore Timestamp objects are converted to ISO format strings
-    - DatetimeWithNanoseconds objects are converted to ISO format strings
-    - Other datetime objects are converted to ISO format strings
-    - NaN and Infinity values are converted to None (null in JSON)
-    """
 
-    def default(self, obj):
-        """Convert Firestore data types to JSON-serializable formats.
-
-        Args:
-            obj: The object to serialize
-
-        Returns:
-            JSON-serializable representation of the object
-        """
-        # Handle Firestore Timestamp objects
-        if hasattr(obj, "timestamp") and hasattr(obj, "isoformat"):
-            return obj.isoformat()
-
-        # Handle DatetimeWithNanoseconds (Firestore datetime type)
-        if isinstance(obj, DatetimeWithNanoseconds):
-            return obj.isoformat()
-
-        # Handle standard datetime objects
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-
-        # Let the base class handle other types
-        return super().default(obj)
-
-    def encode(self, obj):
-        """Override encode to handle NaN/Infinity in nested structures."""
-        return super().encode(self._sanitize(obj))
-
-    def _sanitize(self, obj):
-        """Recursively replace NaN/Infinity with None."""
-        if isinstance(obj, float):
-            if math.isnan(obj) or math.isinf(obj):
-                return None
-            return obj
-        elif isinstance(obj, dict):
-            return {k: self._sanitize(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._sanitize(item) for item in obj]
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj: Any) -> Any:
+    """Convert a value the JSON encoder does not handle natively."""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    # Firestore Timestamp objects, DatetimeWithNanoseconds and other datetimes
+    if isinstance(obj, (datetime, date)) or (hasattr(obj, "timestamp") and hasattr(obj, "isoformat")):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_json_compatible(obj: Any) -> Any:
+    """One recursive pass producing plain JSON types, with NaN/Infinity as None."""
+    if isinstance(obj, str) or obj is None or isinstance(obj, bool):
+        return obj
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, int):
         return obj
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): to_json_compatible(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_json_compatible(item) for item in obj]
+    return to_json_compatible(_default(obj))
+
+
+def _orjson_options(kwargs: dict) -> Any:
+    """orjson option flags equivalent to `kwargs`, or None if they need the standard encoder."""
+    options = _ORJSON_OPTIONS
+    for key, value in kwargs.items():
+        if key == "indent" and value == 2:
+            options |= orjson.OPT_INDENT_2
+        elif key == "sort_keys":
+            options |= orjson.OPT_SORT_KEYS if value else 0
+        elif key == "ensure_ascii" and not value:
+            continue
+        else:
+            return None
+    return options
 
 
 def safe_json_dumps(data, **kwargs):
@@ -68,4 +91,11 @@ def safe_json_dumps(data, **kwargs):
     Returns:
         str: JSON string representation of the data
     """
-    return json.dumps(data, cls=FirestoreJSONEncoder, **kwargs)
+    if orjson is not None:
+        options = _orjson_options(kwargs)
+        if options is not None:
+            try:
+                return orjson.dumps(data, default=_default, option=options).decode("utf-8")
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers beyond 64 bits; the standard encoder handles them
+    return json.dumps(to_json_compatible(data), **kwargs)
@@ -33,6 +33,25 @@ def encode_cursor(scheme_id: str, similarity_score: float, session_id: str) -> s
     # Create cursor data
     cursor_data = {"scheme_id": scheme_id, "similarity_score": similarity_score, "session_id": session_id}
 
+    return _sign_cursor(cursor_data)
+
+
+def encode_offset_cursor(session_id: str, offset: int) -> str:
+    """
+    Encode a cursor token pointing `offset` results into a session's ranked snapshot.
+
+    Args:
+        session_id: The session whose snapshot is being paged
+        offset: Index of the first result on the next page
+
+    Returns:
+        A base64-encoded cursor token
+    """
+    return _sign_cursor({"session_id": session_id, "offset": offset})
+
+
+def _sign_cursor(cursor_data: Dict[str, Any]) -> str:
+    """Sign cursor data and encode it, with the signature, as a base64 token."""
     # Convert to JSON
     cursor_json = json.dumps(cursor_data)
 
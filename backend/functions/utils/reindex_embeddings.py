@@ -1,15 +1,21 @@
 """
 Firestore embedding reindex utility.
 
-Updates the schemes_embeddings collection with doc_id + embedding.
+Updates the schemes_embeddings collection with doc_id + embedding, plus the
+scheme fields search pre-filters `find_nearest` on.
 Original 'schemes' collection is unchanged.
 
+When SEARCH_INDEX_ARTIFACT is set, also publishes the finished vector and
+BM25 indexes as a versioned artifact that search instances memory-map at
+start-up (see search.index_artifact).
+
 This replaces reindex_chroma.py for Firestore Vector Search.
 """
 
 import os
 import time
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from firebase_admin import firestore
@@ -20,6 +26,38 @@ from loguru import logger
 
 COLLECTION_SCHEMES = "schemes"
 COLLECTION_EMBEDDINGS = "schemes_embeddings"
+# Search instances poll this document and rebuild their in-process indexes
+# (and drop cached results) when `generation` changes.
+COLLECTION_INDEX_META = "schemes_index_meta"
+INDEX_META_DOCUMENT = "current"
+# Scheme fields copied onto each embeddings document so find_nearest can
+# pre-filter on them (see search.filter_index). Recorded in the index meta
+# document so search only pushes down fields the documents actually carry.
+EMBEDDING_FILTER_FIELDS = ["agency", "planning_area", "scheme_type", "who_is_it_for", "what_it_gives"]
+# Where to publish the index artifact: "gs://bucket/prefix" or a local directory
+# ("" = don't publish). Search instances read the same setting.
+INDEX_ARTIFACT_LOCATION = os.getenv("SEARCH_INDEX_ARTIFACT", "")
+
+
+def record_index_generation(db, indexed_schemes: int, artifact_version: Optional[str] = None) -> str:
+    """Stamp a new index generation so search instances pick up the reindex.
+
+    With SEARCH_INDEX_ARTIFACT set, `artifact_version` is recorded as the
+    artifact published with it ("" when publishing failed); instances ignore
+    any other artifact version.
+    """
+    generation = datetime.now(timezone.utc).isoformat()
+    meta = {
+        "generation": generation,
+        "indexed_schemes": indexed_schemes,
+        "filter_fields": EMBEDDING_FILTER_FIELDS,
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    }
+    if INDEX_ARTIFACT_LOCATION:
+        meta["artifact_version"] = artifact_version or ""
+    db.collection(COLLECTION_INDEX_META).document(INDEX_META_DOCUMENT).set(meta)
+    logger.info(f"Recorded index generation {generation}")
+    return generation
 
 
 def build_desc_booster(row) -> str:
@@ -50,6 +88,39 @@ def build_desc_booster(row) -> str:
     return " ".join(components)
 
 
+def embedding_document(row, vector) -> Dict[str, Any]:
+    """The schemes_embeddings document for one scheme: its vector and filter fields."""
+    document = {"embedding": Vector(vector)}
+    for field in EMBEDDING_FILTER_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            document[field] = value
+        elif isinstance(value, list):
+            document[field] = [item for item in value if isinstance(item, str)]
+    return document
+
+
+def publish_index_artifact(
+    location: str, ids: List[str], vectors: List[List[float]], search_boosters: List[Optional[str]]
+) -> Optional[str]:
+    """Publish the vector and BM25 indexes for this reindex; returns the version, or None on failure.
+
+    A failed publish never fails the reindex: instances then build their
+    indexes from Firestore.
+    """
+    try:
+        from search.bm25_index import BM25Index
+        from search.index_artifact import publish_index_artifact as publish
+        from search.vector_index import VectorIndex
+
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        manifest = publish(location, version, VectorIndex(ids, vectors), BM25Index(ids, search_boosters))
+    except Exception as e:
+        logger.warning(f"Could not publish search index artifact to {location}: {e}")
+        return None
+    return manifest["version"]
+
+
 def reindex_embeddings(db=None) -> Dict[str, Any]:
     """
     Update schemes_embeddings collection with embeddings.
@@ -66,6 +137,7 @@ def reindex_embeddings(db=None) -> Dict[str, Any]:
             - total_schemes: int - total schemes in Firestore
             - indexed_schemes: int - schemes added to embeddings collection
             - skipped_inactive: int - inactive schemes filtered out
+            - artifact_version: str|None - index artifact published (SEARCH_INDEX_ARTIFACT)
             - duration_seconds: float
             - error: str|None
     """
@@ -110,6 +182,7 @@ def reindex_embeddings(db=None) -> Dict[str, Any]:
                 "total_schemes": total_schemes,
                 "indexed_schemes": 0,
                 "skipped_inactive": skipped_inactive,
+                "artifact_version": None,
                 "duration_seconds": round(time.time() - start_time, 2),
                 "error": "No active schemes to index",
             }
@@ -126,26 +199,39 @@ def reindex_embeddings(db=None) -> Dict[str, Any]:
         # Generate embeddings in batches and write to embeddings collection
         batch_size = 50  # Smaller batches for embedding API rate limits
         indexed = 0
+        # Kept for the index artifact (same rows and BM25 text search builds from).
+        artifact_ids, artifact_vectors, artifact_texts = [], [], []
 
         for i in range(0, len(df), batch_size):
             batch = df.iloc[i : i + batch_size]
             texts = batch["desc_booster"].tolist()
-            doc_ids = batch["doc_id"].tolist()
+            rows = batch.to_dict("records")
 
             # Generate embeddings for batch
             logger.info(f"Generating embeddings for batch {i // batch_size + 1}...")
             vectors = embeddings.embed_documents(texts)
 
-            # Write to embeddings collection (only doc_id + embedding)
+            # Write to embeddings collection (embedding + filter fields)
             batch_writer = db.batch()
-            for doc_id, vector in zip(doc_ids, vectors):
-                doc_ref = db.collection(COLLECTION_EMBEDDINGS).document(doc_id)
-                batch_writer.set(doc_ref, {"embedding": Vector(vector)})
+            for row, vector in zip(rows, vectors):
+                doc_ref = db.collection(COLLECTION_EMBEDDINGS).document(row["doc_id"])
+                batch_writer.set(doc_ref, embedding_document(row, vector))
 
             batch_writer.commit()
             indexed += len(batch)
+            if INDEX_ARTIFACT_LOCATION:
+                artifact_ids.extend(row["doc_id"] for row in rows)
+                artifact_vectors.extend(vectors)
+                artifact_texts.extend(row.get("search_booster") for row in rows)
             logger.info(f"Indexed {indexed}/{len(df)} embeddings")
 
+        artifact_version = None
+        if INDEX_ARTIFACT_LOCATION:
+            artifact_version = publish_index_artifact(
+                INDEX_ARTIFACT_LOCATION, artifact_ids, artifact_vectors, artifact_texts
+            )
+        record_index_generation(db, indexed, artifact_version)
+
         duration = time.time() - start_time
         logger.info(
             f"Reindex completed in {duration:.2f}s ({indexed} schemes indexed, {skipped_inactive} inactive skipped)"
@@ -156,6 +242,7 @@ def reindex_embeddings(db=None) -> Dict[str, Any]:
             "total_schemes": total_schemes,
             "indexed_schemes": indexed,
             "skipped_inactive": skipped_inactive,
+            "artifact_version": artifact_version,
             "duration_seconds": round(duration, 2),
             "error": None,
         }
@@ -172,6 +259,7 @@ def reindex_embeddings(db=None) -> Dict[str, Any]:
             "total_schemes": 0,
             "indexed_schemes": 0,
             "skipped_inactive": 0,
+            "artifact_version": None,
             "duration_seconds": round(duration, 2),
             "error": str(e),
         }
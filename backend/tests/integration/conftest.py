@@ -4,6 +4,12 @@ import pytest
 from firebase_functions import https_fn
 
 
+@pytest.fixture(autouse=True)
+def disable_scheme_store(mocker):
+    """Keep endpoint tests on the Firestore path they mock, not the in-memory scheme store."""
+    mocker.patch("search.scheme_store.SCHEME_STORE_ENABLED", False)
+
+
 @pytest.fixture
 def mock_auth(mocker):
     """Mock Firebase Auth verification."""
@@ -0,0 +1,98 @@
+"""Unit tests for the async agent streaming path (functions/agent/async_bridge.py,
+functions/agent/engine.py and the agent tools' coroutines).
+
+Behaviour under test: a chat streams through `graph.astream` on the shared
+agent event loop and reaches the sync SSE generator event by event; a client
+that goes away cancels its graph run; and parallel tool calls with native
+coroutines overlap on the loop instead of running one after another. The
+graph, Firestore and scheme reads are stubbed.
+"""
+
+import asyncio
+import threading
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+
+from agent import engine
+from agent.async_bridge import get_agent_loop
+from agent.event_type import AgentStreamEventType
+from agent.tools import retrieve_scheme, retrieve_schemes_by_ids_tool
+
+
+class _AsyncGraph:
+    def __init__(self):
+        self.threads = []
+
+    async def aget_state(self, config):
+        return None
+
+    async def astream(self, state, config, stream_mode, version):
+        self.threads.append(threading.current_thread().name)
+        yield {"type": "messages", "data": (AIMessageChunk(content="Hello"), {"langgraph_node": "agent"})}
+        yield {"type": "messages", "data": (AIMessageChunk(content="ignored"), {"langgraph_node": "tools"})}
+        yield {"type": "custom", "data": {"type": "schemes_update", "data": {"schemes": []}}}
+
+
+def test_chat_events_stream_from_astream_on_the_agent_loop(mocker, mock_firebase_manager):
+    graph = _AsyncGraph()
+    mocker.patch.object(engine, "AGENT_ASYNC_STREAM", True)
+    mocker.patch.object(engine, "FirebaseManager", return_value=mock_firebase_manager)
+    mocker.patch.object(engine, "get_router_graph", return_value=mocker.Mock(graph=graph))
+    mocker.patch.object(engine, "load_langfuse_client_and_handler", return_value=(None, None))
+
+    events = list(engine.stream_chat_events("childcare help", "thread-1"))
+
+    assert events == [
+        {"type": AgentStreamEventType.TEXT, "data": {"text": "Hello"}},
+        {"type": "schemes_update", "data": {"schemes": []}},
+        {"type": AgentStreamEventType.DONE, "data": {}},
+    ]
+    assert graph.threads == ["agent-event-loop"]
+
+
+def test_closing_the_stream_cancels_the_run():
+    finished = threading.Event()
+
+    async def run():
+        try:
+            yield "first"
+            await asyncio.Event().wait()
+        finally:
+            finished.set()
+
+    stream = get_agent_loop().iterate(run())
+    assert next(stream) == "first"
+    stream.close()
+
+    assert finished.wait(timeout=2)
+
+
+def test_parallel_tool_calls_overlap_on_the_loop(mocker):
+    in_flight, overlap = [0], [0]
+
+    async def fetch(firebase_manager, scheme_ids):
+        in_flight[0] += 1
+        overlap[0] = max(overlap[0], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+        return [{"scheme_id": scheme_id} for scheme_id in scheme_ids], []
+
+    mocker.patch.object(retrieve_scheme, "FirebaseManager")
+    mocker.patch.object(retrieve_scheme, "afetch_schemes_by_ids", side_effect=fetch)
+    fetch_sync = mocker.patch.object(retrieve_scheme, "fetch_schemes_by_ids")
+    tool_calls = [
+        {"name": "retrieve_schemes_by_ids", "id": f"call-{i}", "args": {"scheme_ids": [f"s{i}"]}} for i in range(3)
+    ]
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ToolNode([retrieve_schemes_by_ids_tool]))
+    builder.add_edge(START, "tools")
+    graph = builder.compile()
+
+    result = get_agent_loop().run(graph.ainvoke({"messages": [AIMessage("", tool_calls=tool_calls)]}))
+
+    assert overlap[0] == 3
+    fetch_sync.assert_not_called()
+    assert [message.tool_call_id for message in result["messages"][1:]] == ["call-0", "call-1", "call-2"]
@@ -0,0 +1,120 @@
+"""Unit tests for batched agent search (SearchModel.aggregate_and_rank_many and
+agent.tools.search.prefetch_searches).
+
+Behaviour under test: several queries issued in one agent turn are embedded in
+one call, scored against the in-process index in one pass and hydrated once,
+while cached queries are not retrieved again. When the LLM emits parallel
+search_schemes calls, the graph routes them through one batch and each tool
+call returns its prefetched result. Embeddings, Firestore and persistence are
+stubbed.
+"""
+
+import pytest
+
+from agent.router import RouterAgentGraph
+from agent.tools import search as search_tool
+from search.cache import QueryResultCache
+from search.handler import QueryHandler
+from search.results import SearchResults
+from search.retriever import SearchIndexes, SearchModel
+from search.types import PredictParams
+from search.vector_index import VectorIndex
+
+
+SCHEMES = {i: {"scheme_id": i, "search_booster": ""} for i in ("a", "b", "c")}
+
+
+@pytest.fixture
+def model(mocker):
+    mocker.patch.object(SearchModel, "initialise", return_value=None)
+    SearchModel._instance = None
+    SearchModel.initialised = True
+    m = SearchModel(mocker.MagicMock())
+    m.query_cache = QueryResultCache()
+    m.__class__.embeddings = mocker.MagicMock()
+    m.__class__.embeddings.embed_documents.side_effect = lambda texts: [
+        [1.0, 0.0, 0.0] if "child" in text else [0.0, 0.0, 1.0] for text in texts
+    ]
+    index = VectorIndex(["a", "b", "c"], [[1.0, 0.0, 0.0], [0.7, 0.0, 0.7], [0.0, 0.0, 1.0]])
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes(index=index))
+    mocker.patch.object(m, "fetch_schemes_batch", side_effect=lambda ids: [SCHEMES[i] for i in ids])
+    mocker.patch.object(
+        m,
+        "rank",
+        side_effect=lambda query_text, results, fusion=None: results.with_scores(
+            combined_scores=results.vec_scores
+        ).sorted_by_combined(),
+    )
+    return m
+
+
+def test_queries_are_embedded_scored_and_hydrated_together(model, mocker):
+    search_many = mocker.spy(SearchModel.indexes.index, "search_many")
+
+    childcare, eldercare = model.aggregate_and_rank_many(["childcare", "eldercare"], 0.4, [None, 1])
+
+    model.embeddings.embed_documents.assert_called_once_with(["childcare", "eldercare"])
+    search_many.assert_called_once()
+    model.fetch_schemes_batch.assert_called_once()
+    assert sorted(model.fetch_schemes_batch.call_args.args[0]) == ["a", "b", "c"]
+    assert childcare.ids == ["a", "b"]
+    assert eldercare.ids == ["c"]
+
+
+def test_cached_queries_are_not_retrieved_again(model):
+    model.aggregate_and_rank_many(["childcare"], 0.4)
+
+    results = model.aggregate_and_rank_many(["Childcare?", "eldercare", "eldercare"], 0.4)
+
+    assert model.embeddings.embed_documents.call_args.args[0] == ["eldercare"]
+    assert [r.ids for r in results] == [["a", "b"], ["c", "b"], ["c", "b"]]
+
+
+def test_handler_returns_one_agent_response_per_query(mocker):
+    handler = QueryHandler.__new__(QueryHandler)
+    handler.search_model = mocker.MagicMock()
+    handler.search_model.aggregate_and_rank_many.return_value = [
+        SearchResults("x", ["a"], [SCHEMES["a"]], [1.0]),
+        SearchResults("y", ["c"], [SCHEMES["c"]], [1.0]),
+    ]
+    QueryHandler.firebase_manager = mocker.MagicMock()
+    mocker.patch.object(handler, "save_llm_query", side_effect=["doc-1", "doc-2"])
+
+    responses = handler.predict_many_for_agent(
+        [PredictParams(query="x", session_id="t"), PredictParams(query="y", requested_target=3, session_id="t")]
+    )
+
+    handler.search_model.aggregate_and_rank_many.assert_called_once_with(["x", "y"], None, [None, 3], fusion=None)
+    assert [(r["docID"], r["data"][0]["scheme_id"], r["shortfall"]) for r in responses] == [
+        ("doc-1", "a", False),
+        ("doc-2", "c", True),
+    ]
+
+
+def test_parallel_tool_calls_use_the_prefetched_batch(mocker):
+    handler = mocker.MagicMock()
+    handler.predict_many_for_agent.return_value = [{"data": [{"scheme_id": "a"}]}, {"data": [{"scheme_id": "c"}]}]
+    mocker.patch.object(search_tool, "QueryHandler", return_value=handler)
+    mocker.patch.object(search_tool, "FirebaseManager")
+    tool_calls = [
+        {"name": "search_schemes", "id": "call-1", "args": {"query": "childcare"}},
+        {"name": "search_schemes", "id": "call-2", "args": {"query": "eldercare", "requested_count": 2}},
+        {"name": "load_skills", "id": "call-3", "args": {}},
+    ]
+
+    assert RouterAgentGraph._route_after_agent({"messages": [mocker.Mock(tool_calls=tool_calls)]}) == "search_batch"
+    assert search_tool.prefetch_searches(tool_calls, "thread-1") == 2
+    result = search_tool._search_schemes_sync("eldercare", 2, runtime=mocker.Mock(tool_call_id="call-2", config={}))
+
+    assert [p.requested_target for p in handler.predict_many_for_agent.call_args.args[0]] == [None, 2]
+    handler.predict_for_agent.assert_not_called()
+    assert result["data"] == [{"scheme_id": "c"}]
+
+
+def test_a_single_search_is_not_batched(mocker):
+    predict_many = mocker.patch.object(search_tool.QueryHandler, "predict_many_for_agent")
+    tool_calls = [{"name": "search_schemes", "id": "call-1", "args": {"query": "childcare"}}]
+
+    assert RouterAgentGraph._route_after_agent({"messages": [mocker.Mock(tool_calls=tool_calls)]}) == "tools"
+    assert search_tool.prefetch_searches(tool_calls) == 0
+    predict_many.assert_not_called()
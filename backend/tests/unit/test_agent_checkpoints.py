@@ -0,0 +1,162 @@
+"""Unit tests for incremental chat checkpoints (functions/agent/firestore_saver.py).
+
+Behaviour under test: a conversation is stored as periodic full snapshots plus
+deltas holding only each step's new messages, so a step's write does not grow
+with the conversation, and any checkpoint reads back as the full state. A
+fresh instance continues the delta chain from the checkpoint it read, and a
+turn branched from an older checkpoint builds on that checkpoint's own chain.
+Reading the latest state is the root read plus one batched read, and reads
+for different chats do not wait on each other. Firestore is an in-memory fake.
+"""
+
+import copy
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, MessagesState, StateGraph
+
+from agent import firestore_saver
+from agent.firestore_saver import FirestoreChatSaver
+
+
+class _Snapshot:
+    def __init__(self, path, data):
+        self.id = path.rsplit("/", 1)[-1]
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class _Ref:
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+
+    def collection(self, name):
+        return _Collection(self.db, f"{self.path}/{name}")
+
+    def set(self, data, merge=False):
+        self.db.written[self.path] = len(json.dumps(data, default=str))
+        if merge:
+            self.db.docs.setdefault(self.path, {}).update(copy.deepcopy(data))
+        else:
+            self.db.docs[self.path] = copy.deepcopy(data)
+
+    def get(self):
+        self.db.reads.append([self.path])
+        return self.read()
+
+    def read(self):
+        if self.db.block_reads is not None:
+            self.db.block_reads.wait()
+        return _Snapshot(self.path, self.db.docs.get(self.path))
+
+
+class _Collection:
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+
+    def document(self, doc_id):
+        return _Ref(self.db, f"{self.path}/{doc_id}")
+
+
+class _FakeDb:
+    def __init__(self):
+        self.docs = {}
+        self.written = {}
+        self.reads = []
+        self.block_reads = None
+
+    def collection(self, name):
+        return _Collection(self, name)
+
+    def get_all(self, refs):
+        refs = list(refs)
+        self.reads.append([ref.path for ref in refs])
+        for ref in refs:
+            yield ref.read()
+
+
+def _graph(saver):
+    builder = StateGraph(MessagesState)
+    builder.add_node("agent", lambda state: {"messages": [AIMessage(f"reply {len(state['messages'])}")]})
+    builder.add_edge(START, "agent")
+    return builder.compile(checkpointer=saver)
+
+
+def _checkpoints(db, kind):
+    return [
+        path for path, doc in db.docs.items() if "/checkpoints/" in path and doc.get("format", "snapshot") == kind
+    ]
+
+
+@pytest.fixture(autouse=True)
+def snapshot_interval(mocker):
+    mocker.patch.object(firestore_saver, "CHECKPOINT_SNAPSHOT_INTERVAL", 5)
+
+
+def test_steps_write_deltas_and_read_back_the_full_conversation():
+    db = _FakeDb()
+    graph = _graph(FirestoreChatSaver(db))
+    config = {"configurable": {"thread_id": "t1"}}
+    for turn in range(12):
+        graph.invoke({"messages": [HumanMessage(f"question {turn} " + "x" * 200)]}, config)
+
+    snapshots, deltas = _checkpoints(db, "snapshot"), _checkpoints(db, "delta")
+    assert len(deltas) > 4 * len(snapshots)
+    assert max(db.written[path] for path in deltas) < max(db.written[path] for path in snapshots) / 4
+
+    restored = _graph(FirestoreChatSaver(db)).get_state(config).values["messages"]
+    assert [m.content for m in restored] == [m.content for m in graph.get_state(config).values["messages"]]
+    assert len(restored) == 24
+
+
+def test_a_fresh_instance_continues_the_chain_and_branches_keep_their_own_history():
+    db = _FakeDb()
+    config = {"configurable": {"thread_id": "t1"}}
+    graph = _graph(FirestoreChatSaver(db))
+    graph.invoke({"messages": [HumanMessage("first")]}, config)
+    first_turn = graph.get_state(config).config
+
+    resumed = _graph(FirestoreChatSaver(db))
+    resumed.get_state(config)
+    snapshots = len(_checkpoints(db, "snapshot"))
+    resumed.invoke({"messages": [HumanMessage("second")]}, config)
+    assert len(_checkpoints(db, "snapshot")) == snapshots
+    assert [m.content for m in resumed.get_state(config).values["messages"]][-2:] == ["second", "reply 3"]
+
+    resumed.invoke({"messages": [HumanMessage("instead")]}, first_turn)
+    assert [m.content for m in resumed.get_state(config).values["messages"]] == ["first", "reply 1", "instead", "reply 3"]
+
+
+def test_latest_reads_are_batched_and_do_not_serialize_across_chats():
+    db = _FakeDb()
+    graph = _graph(FirestoreChatSaver(db))
+    for thread_id in ("t1", "t2"):
+        for turn in range(3):
+            graph.invoke({"messages": [HumanMessage(f"question {turn}")]}, {"configurable": {"thread_id": thread_id}})
+
+    saver = FirestoreChatSaver(db)
+    db.reads.clear()
+    assert len(saver.get_tuple({"configurable": {"thread_id": "t1"}}).checkpoint["channel_values"]["messages"]) == 6
+    assert len(db.reads) == 2
+
+    # Reads block until released; with a shared lock only the first chat's root read could start.
+    db.reads.clear()
+    db.block_reads = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(saver.get_tuple, {"configurable": {"thread_id": t}}) for t in ("t1", "t2")]
+        deadline = time.monotonic() + 2
+        while len(db.reads) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        started = len(db.reads)
+        db.block_reads.set()
+        assert all(future.result(timeout=2) is not None for future in futures)
+    assert started == 2
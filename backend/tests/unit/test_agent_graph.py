@@ -0,0 +1,62 @@
+"""Unit tests for the process-wide agent graph (functions/agent/router.py).
+
+Behaviour under test: chat requests reuse one compiled RouterAgentGraph, so its
+checkpointer and node cache survive between turns, and concurrent cold
+requests build it only once. Graph compilation, Firestore and Langfuse are
+stubbed.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent import engine
+from agent.router import RouterAgentGraph, get_router_graph
+
+
+class _FakeGraph:
+    def get_state(self, config):
+        return None
+
+    def stream(self, state, config, stream_mode, version):
+        return iter(())
+
+    async def aget_state(self, config):
+        return None
+
+    async def astream(self, state, config, stream_mode, version):
+        return
+        yield
+
+
+@pytest.fixture
+def builds(mocker):
+    mocker.patch.object(RouterAgentGraph, "_instance", None)
+
+    def build(self):
+        # Slow enough that concurrent callers all arrive while it is building.
+        threading.Event().wait(0.05)
+        return _FakeGraph()
+
+    return mocker.patch.object(RouterAgentGraph, "_build_graph", autospec=True, side_effect=build)
+
+
+def test_concurrent_cold_requests_build_the_graph_once(builds, mock_firebase_manager):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        graphs = list(pool.map(lambda _: get_router_graph(mock_firebase_manager), range(8)))
+
+    assert builds.call_count == 1
+    assert all(graph is graphs[0] for graph in graphs)
+
+
+def test_chat_turns_share_the_graph_and_its_node_cache(builds, mocker, mock_firebase_manager):
+    mocker.patch.object(engine, "FirebaseManager", return_value=mock_firebase_manager)
+    mocker.patch.object(engine, "load_langfuse_client_and_handler", return_value=(None, None))
+
+    list(engine.stream_chat_events("childcare help", "thread-1"))
+    first_cache = RouterAgentGraph._instance._cache
+    list(engine.stream_chat_events("and for seniors?", "thread-2"))
+
+    assert builds.call_count == 1
+    assert RouterAgentGraph._instance._cache is first_cache
@@ -5,10 +5,10 @@ and reports a shortfall when fewer relevant schemes exist than requested, so
 the LLM can explain the gap rather than silently returning too few.
 """
 
-import pandas as pd
 import pytest
 
 from search.handler import QueryHandler
+from search.results import SearchResults
 from search.types import PredictParams
 
 
@@ -22,8 +22,9 @@ def handler(mocker):
     return h
 
 
-def _ranked(n: int) -> pd.DataFrame:
-    return pd.DataFrame({"scheme_id": [f"s{i}" for i in range(n)], "scheme": [f"S{i}" for i in range(n)]})
+def _ranked(n: int) -> SearchResults:
+    ids = [f"s{i}" for i in range(n)]
+    return SearchResults("q", ids, [{"scheme_id": i, "scheme": i.upper()} for i in ids], [1.0] * n)
 
 
 def test_reports_no_shortfall_when_target_met(handler):
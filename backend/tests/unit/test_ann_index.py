@@ -0,0 +1,79 @@
+"""Unit tests for the approximate vector backends (functions/search/ann_index.py).
+
+Behaviour under test: the IVF backend finds nearly the same neighbours as
+exact search with exact distances, searches restricted to filter rows stay
+exact, and SearchModel falls back to exact search when a backend cannot be
+built. The in-process pool can exceed Firestore's find_nearest cap, which is
+still respected on the Firestore path. Firestore is mocked.
+"""
+
+import numpy as np
+import pytest
+
+from search import ann_index, retriever
+from search.ann_index import IVFVectorIndex, build_vector_backend
+from search.retriever import SearchIndexes, SearchModel
+from search.vector_index import VectorIndex
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(5)
+    centroids = rng.normal(size=(20, 32))
+    vectors = (centroids[rng.integers(0, 20, 2000)] + rng.normal(scale=0.5, size=(2000, 32))).astype(np.float32)
+    queries = (centroids[:10] + rng.normal(scale=0.5, size=(10, 32))).astype(np.float32)
+    return [f"s{i}" for i in range(2000)], vectors, queries
+
+
+def test_ivf_finds_the_exact_neighbours_with_exact_distances(corpus):
+    ids, vectors, queries = corpus
+    exact = VectorIndex(ids, vectors)
+    ivf = IVFVectorIndex(ids, vectors)
+
+    for query in queries:
+        exact_ids, exact_distances = exact.search(query, 20)
+        found_ids, found_distances = ivf.search(query, 20)
+        assert len(set(found_ids) & set(exact_ids)) >= 19
+        expected = dict(zip(*exact.search(query, len(ids))))
+        assert found_distances == pytest.approx([expected[i] for i in found_ids], abs=1e-5)
+
+    assert len(ivf.search(queries[0], 1500)[0]) == 1500
+
+
+def test_restricted_searches_score_the_given_rows_exactly(corpus):
+    ids, vectors, queries = corpus
+    rows = np.arange(0, 2000, 7)
+
+    assert IVFVectorIndex(ids, vectors).search(queries[0], 5, rows=rows) == VectorIndex(ids, vectors).search(
+        queries[0], 5, rows=rows
+    )
+
+
+def test_search_model_keeps_exact_search_when_a_backend_cannot_be_built(mocker):
+    mocker.patch.object(retriever, "VECTOR_BACKEND", "hnsw")
+    mocker.patch.object(ann_index, "hnswlib", None)
+    index = VectorIndex(["a"], [[1.0, 0.0]])
+
+    assert SearchModel.build_vector_backend(index) is index
+    with pytest.raises(ValueError):
+        build_vector_backend("annoy", index)
+
+
+def test_in_process_pool_can_exceed_the_firestore_cap(mocker):
+    mocker.patch.object(retriever, "VECTOR_POOL_LIMIT", 5000)
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes(index=VectorIndex(["a"], [[1.0, 0.0]])))
+    assert SearchModel.retrieval_limit() == 5000
+
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes())
+    assert SearchModel.retrieval_limit() == retriever.RETRIEVAL_LIMIT
+    collection = mocker.MagicMock()
+    SearchModel._find_nearest(collection, [1.0, 0.0], 5000)
+    assert collection.find_nearest.call_args.kwargs["limit"] == retriever.FIRESTORE_NEAREST_LIMIT
+
+
+def test_hnsw_backend_matches_exact_search(corpus):
+    pytest.importorskip("hnswlib")
+    ids, vectors, queries = corpus
+    hnsw = build_vector_backend("hnsw", VectorIndex(ids, vectors))
+
+    assert hnsw.search(queries[0], 10)[0] == VectorIndex(ids, vectors).search(queries[0], 10)[0]
@@ -0,0 +1,100 @@
+"""Unit tests for the corpus-level BM25 index (functions/search/bm25_index.py).
+
+Behaviour under test: the index is built once over the corpus and returns raw
+BM25 scores for any subset of scheme IDs, in the order requested.
+"""
+
+import numpy as np
+
+from search.bm25_index import BM25Index, tokenize
+from search.results import SearchResults
+from search.scorers import rank_results
+
+
+CORPUS = {
+    "eldercare": "Financial help for elderly seniors and caregivers",
+    "childcare": "Childcare subsidy for working parents",
+    "student": "Bursary for students from lower income families",
+    "general": "Financial assistance for lower income households",
+}
+
+
+def _index() -> BM25Index:
+    return BM25Index(list(CORPUS), list(CORPUS.values()))
+
+
+def test_tokenize_is_case_and_punctuation_insensitive():
+    assert tokenize("Elderly, FINANCIAL-help!") == ["elderly", "financial", "help"]
+    assert tokenize(None) == []
+    assert tokenize(float("nan")) == []
+
+
+def test_matching_document_scores_highest():
+    scores = _index().score_all("elderly financial help")
+    best = list(CORPUS)[int(np.argmax(scores))]
+
+    assert best == "eldercare"
+
+
+def test_document_without_query_terms_scores_zero():
+    scores = dict(zip(CORPUS, _index().score_all("elderly")))
+
+    assert scores["eldercare"] > 0
+    assert scores["childcare"] == 0
+
+
+def test_rare_term_outweighs_common_term():
+    """IDF: 'bursary' appears once, 'income' twice, so a bursary match scores more."""
+    index = _index()
+
+    bursary = index.scores("bursary", ["student"])[0]
+    income = index.scores("income", ["student"])[0]
+
+    assert bursary > income
+
+
+def test_scores_follow_requested_subset_order():
+    index = _index()
+    full = dict(zip(CORPUS, index.score_all("lower income")))
+
+    subset = index.scores("lower income", ["general", "eldercare", "student"])
+
+    assert subset.tolist() == [full["general"], full["eldercare"], full["student"]]
+
+
+def test_unknown_ids_score_zero_or_from_text():
+    index = _index()
+
+    assert index.scores("childcare", ["new-scheme"]).tolist() == [0.0]
+    assert index.scores("childcare", ["new-scheme"], texts=["Childcare grant"])[0] > 0
+
+
+def test_rank_results_uses_real_bm25_scores():
+    results = SearchResults(
+        "elderly caregivers",
+        ["childcare", "eldercare"],
+        [
+            {"scheme_id": "childcare", "search_booster": CORPUS["childcare"]},
+            {"scheme_id": "eldercare", "search_booster": CORPUS["eldercare"]},
+        ],
+        [0.5, 0.5],
+    )
+
+    ranked = rank_results("elderly caregivers", results, bm25_index=_index())
+
+    assert ranked.ids == ["eldercare", "childcare"]
+    assert ranked.bm25_scores.tolist() == [1.0, 0.0]
+    assert ranked.bm25_raw_scores[0] > 0
+
+
+def test_rank_results_without_index_scores_the_pool():
+    results = SearchResults(
+        "medical",
+        ["a", "b"],
+        [{"scheme_id": "a", "search_booster": "housing grant"}, {"scheme_id": "b", "search_booster": "medical bills"}],
+        [0.2, 0.2],
+    )
+
+    ranked = rank_results("medical", results)
+
+    assert ranked.ids[0] == "b"
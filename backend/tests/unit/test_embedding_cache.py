@@ -0,0 +1,103 @@
+"""Unit tests for the query embedding cache (functions/search/embedding_cache.py).
+
+Behaviour under test: repeated or trivially re-phrased queries are served from
+memory without calling the embedding model, the persistent tier stores float16
+vectors that survive a fresh in-memory cache, keys change with the model and
+dimension, and store failures degrade to plain embedding calls.
+"""
+
+import numpy as np
+import pytest
+
+from search.embedding_cache import (
+    CachedEmbeddings,
+    DiskEmbeddingStore,
+    build_embedding_store,
+    embedding_cache_key,
+)
+
+
+class _FakeModel:
+    def __init__(self):
+        self.query_calls = []
+        self.document_calls = []
+
+    @staticmethod
+    def _vector(text):
+        return [float(len(text)), 1.0, 0.5]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+
+def test_repeated_and_normalized_queries_hit_memory():
+    model = _FakeModel()
+    embeddings = CachedEmbeddings(model, model_name="m", dimensions=3)
+
+    first = embeddings.embed_query("Elderly financial help")
+    second = embeddings.embed_query("  elderly   FINANCIAL help? ")
+
+    assert first == second
+    assert model.query_calls == ["Elderly financial help"]
+    assert embeddings.stats()["hits"] == 1
+
+
+def test_key_depends_on_model_and_dimension():
+    base = embedding_cache_key("help", "model-a", 2048)
+    assert base == embedding_cache_key("HELP", "model-a", 2048)
+    assert base != embedding_cache_key("help", "model-b", 2048)
+    assert base != embedding_cache_key("help", "model-a", 1024)
+
+
+def test_disk_store_persists_float16_vectors(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path))
+    model = _FakeModel()
+    CachedEmbeddings(model, model_name="m", dimensions=3, store=store).embed_query("food vouchers")
+
+    saved = np.load(next(tmp_path.glob("*.npy")))
+    assert saved.dtype == np.float16
+
+    # A fresh instance (cold memory) is served from the store.
+    warm = CachedEmbeddings(model, model_name="m", dimensions=3, store=store)
+    assert warm.embed_query("food vouchers") == pytest.approx([13.0, 1.0, 0.5], rel=1e-3)
+    assert len(model.query_calls) == 1
+    assert warm.stats()["store_hits"] == 1
+
+
+def test_embed_documents_only_sends_unique_misses():
+    model = _FakeModel()
+    embeddings = CachedEmbeddings(model, model_name="m", dimensions=3)
+    embeddings.embed_query("a")
+
+    vectors = embeddings.embed_documents(["a", "bb", "BB", "ccc"])
+
+    assert model.document_calls == [["bb", "ccc"]]
+    assert [v[0] for v in vectors] == [1.0, 2.0, 2.0, 3.0]
+
+
+def test_store_failures_fall_back_to_the_model():
+    class _BrokenStore:
+        def get(self, key):
+            raise RuntimeError("unavailable")
+
+        def put(self, key, vector):
+            raise RuntimeError("unavailable")
+
+    model = _FakeModel()
+    embeddings = CachedEmbeddings(model, model_name="m", dimensions=3, store=_BrokenStore())
+
+    assert embeddings.embed_query("help") == [4.0, 1.0, 0.5]
+    assert embeddings.embed_query("help") == [4.0, 1.0, 0.5]
+    assert model.query_calls == ["help"]
+
+
+def test_build_embedding_store_specs(tmp_path):
+    assert build_embedding_store("") is None
+    assert isinstance(build_embedding_store(f"disk:{tmp_path}"), DiskEmbeddingStore)
+    with pytest.raises(ValueError):
+        build_embedding_store("redis")
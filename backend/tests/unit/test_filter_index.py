@@ -0,0 +1,126 @@
+"""Unit tests for filter pushdown in search (functions/search/filter_index.py).
+
+Behaviour under test: filters are answered from posting lists before scoring,
+so the in-process index only scores eligible rows, and find_nearest gets
+pre-filter `where` clauses for the fields the embeddings documents carry.
+Whatever the pushdown cannot express is checked on the fetched schemes.
+Firestore and embeddings are mocked.
+"""
+
+import pytest
+
+from search.filter_index import FilterIndex, firestore_prefilters, matches_filters
+from search.retriever import SearchIndexes, SearchModel
+from search.vector_index import VectorIndex
+
+
+SCHEMES = {
+    "a": {"scheme_id": "a", "agency": "MSF", "scheme_type": ["Financial"], "planning_area": ["Bedok"]},
+    "b": {"scheme_id": "b", "agency": "MOH", "scheme_type": ["Healthcare", "Financial"], "planning_area": []},
+    "c": {"scheme_id": "c", "agency": "MSF", "scheme_type": ["Healthcare"], "planning_area": ["Tampines"]},
+}
+
+
+def _filter_index():
+    return FilterIndex(["a", "b", "c"], SCHEMES)
+
+
+def test_values_in_a_field_are_ored_and_fields_are_anded():
+    index = _filter_index()
+
+    assert index.rows({"scheme_type": ["Healthcare"]}).tolist() == [1, 2]
+    assert index.rows({"agency": ["MSF", "MOH"], "scheme_type": ["Financial"]}).tolist() == [0, 1]
+    assert index.rows({"agency": ["MSF"], "scheme_type": ["Healthcare"]}).tolist() == [2]
+    assert index.rows({"agency": ["CPF"]}).tolist() == []
+    assert index.rows({"eligibility": ["x"]}).tolist() == [0, 1, 2]
+
+
+def test_array_fields_match_on_any_element():
+    assert matches_filters(SCHEMES["b"], {"scheme_type": ["Financial"]})
+    assert not matches_filters(SCHEMES["b"], {"planning_area": ["Bedok"]})
+
+
+def test_firestore_prefilters_push_down_what_the_documents_carry():
+    clauses = firestore_prefilters({"agency": ["MSF"], "scheme_type": ["Healthcare"], "planning_area": ["Bedok"]})
+
+    assert [(c.field_path, c.op_string, c.value) for c in clauses] == [
+        ("agency", "in", ["MSF"]),
+        ("planning_area", "array_contains_any", ["Bedok"]),
+    ]
+    assert firestore_prefilters({"agency": ["MSF"]}, fields=()) == []
+
+
+@pytest.fixture
+def model(mocker):
+    mocker.patch.object(SearchModel, "initialise", return_value=None)
+    SearchModel._instance = None
+    SearchModel.initialised = True
+    m = SearchModel(mocker.MagicMock())
+    m.query_cache = {}
+    m.__class__.embeddings = mocker.MagicMock()
+    m.__class__.embeddings.embed_query.return_value = [1.0, 0.0, 0.0]
+    m.__class__.db = mocker.MagicMock()
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes())
+    mocker.patch.object(m, "fetch_schemes_batch", side_effect=lambda ids: [SCHEMES[i] for i in ids])
+    return m
+
+
+def test_in_process_search_scores_only_eligible_rows(model, mocker):
+    index = VectorIndex(["a", "b", "c"], [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0]])
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes(index=index, filter_index=_filter_index()))
+    search = mocker.spy(index, "search")
+
+    results = model.search("help", filters={"scheme_type": ["Healthcare"]})
+
+    assert results.ids == ["b", "c"]
+    assert search.call_args.kwargs["rows"].tolist() == [1, 2]
+    model.fetch_schemes_batch.assert_called_once_with(["b", "c"])
+
+
+def test_find_nearest_is_pre_filtered_and_the_rest_checked_after(model):
+    model.__class__.indexes = SearchIndexes(prefilter_fields=("agency",))
+    collection = model.__class__.db.collection.return_value
+    filtered = collection.where.return_value
+    filtered.find_nearest.return_value.get.return_value = [_doc("a", 0.1), _doc("c", 0.3)]
+
+    results = model.search("help", filters={"agency": ["MSF"], "scheme_type": ["Healthcare"]})
+
+    clause = collection.where.call_args.kwargs["filter"]
+    assert (clause.field_path, clause.op_string, clause.value) == ("agency", "in", ["MSF"])
+    collection.find_nearest.assert_not_called()
+    assert results.ids == ["c"]
+
+
+def test_failed_pre_filtered_query_falls_back_to_filtering_after(model):
+    model.__class__.indexes = SearchIndexes(prefilter_fields=("agency",))
+    collection = model.__class__.db.collection.return_value
+    collection.where.return_value.find_nearest.side_effect = RuntimeError("missing index")
+    collection.find_nearest.return_value.get.return_value = [_doc("a", 0.1), _doc("b", 0.2), _doc("c", 0.3)]
+
+    results = model.search("help", filters={"agency": ["MSF"]})
+
+    assert results.ids == ["a", "c"]
+
+
+def test_filters_are_part_of_the_ranking_cache_key(model, mocker):
+    mocker.patch.object(
+        model, "rank", side_effect=lambda q, r, fusion=None: r.with_scores(combined_scores=r.vec_scores)
+    )
+    search = mocker.patch.object(model, "search", wraps=model.search)
+    model.__class__.db.collection.return_value.find_nearest.return_value.get.return_value = [_doc("a", 0.1)]
+
+    model.aggregate_and_rank_results("help", 0.0, filters={"agency": ["MSF"]})
+    model.aggregate_and_rank_results("help", 0.0, filters={"agency": ["MSF"]})
+    model.aggregate_and_rank_results("help", 0.0, filters={"agency": ["MOH"]})
+
+    assert search.call_count == 2
+
+
+def _doc(doc_id, distance):
+    class _Doc:
+        id = doc_id
+
+        def to_dict(self):
+            return {"vector_distance": distance}
+
+    return _Doc()
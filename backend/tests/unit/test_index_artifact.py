@@ -0,0 +1,120 @@
+"""Unit tests for the memory-mapped search index artifact (functions/search/index_artifact.py).
+
+Behaviour under test: a published artifact maps back into vector and BM25
+indexes that answer exactly like the ones it was written from, without
+copying the arrays into memory. Instances swap to a newer version only when
+its corpus hash differs, ignore a version the last reindex did not record,
+and build from Firestore when no artifact is usable. A reload publishes the
+vector, BM25 and filter indexes together, so searches keep the previous set
+until every new index is built, and a quantized index over a mapped artifact
+re-ranks against the mapped float32 rows. Firestore is mocked.
+"""
+
+import numpy as np
+import pytest
+
+from search import retriever
+from search.bm25_index import BM25Index
+from search.index_artifact import load_latest_artifact, publish_index_artifact
+from search.retriever import SearchIndexes, SearchModel
+from search.vector_index import VectorIndex
+
+
+IDS = ["a", "b", "c"]
+VECTORS = [[1.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.0, 0.0, 2.0]]
+TEXTS = ["childcare subsidy", "elderly caregiver subsidy", "housing rental"]
+
+
+def _publish(location, version, texts=TEXTS):
+    return publish_index_artifact(str(location), version, VectorIndex(IDS, VECTORS), BM25Index(IDS, texts))
+
+
+def test_published_artifact_maps_back_to_identical_indexes(tmp_path):
+    _publish(tmp_path, "v1")
+
+    artifact = load_latest_artifact(str(tmp_path))
+
+    assert artifact.version == "v1"
+    assert isinstance(artifact.vector_index.matrix, np.memmap)
+    assert artifact.vector_index.search([0.6, 0.8, 0.0], 3) == VectorIndex(IDS, VECTORS).search([0.6, 0.8, 0.0], 3)
+    expected = BM25Index(IDS, TEXTS).scores("caregiver subsidy", ["b", "a", "zzz"])
+    assert artifact.bm25_index.scores("caregiver subsidy", ["b", "a", "zzz"]) == pytest.approx(expected)
+
+
+def test_only_a_changed_corpus_is_swapped_in(tmp_path):
+    _publish(tmp_path, "v1")
+    current = load_latest_artifact(str(tmp_path))
+
+    _publish(tmp_path, "v2")
+    assert load_latest_artifact(str(tmp_path), current=current) is current
+
+    _publish(tmp_path, "v3", texts=["childcare", "eldercare", "housing"])
+    swapped = load_latest_artifact(str(tmp_path), current=current)
+    assert swapped.version == "v3"
+    assert swapped.corpus_hash != current.corpus_hash
+    assert load_latest_artifact(str(tmp_path / "missing")) is None
+
+
+@pytest.fixture
+def model(mocker, tmp_path):
+    mocker.patch.object(retriever, "INDEX_ARTIFACT_LOCATION", str(tmp_path))
+    mocker.patch.object(retriever, "VECTOR_INDEX_MODE", "memory")
+    mocker.patch.object(SearchModel, "db", mocker.MagicMock())
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes())
+    mocker.patch.object(SearchModel, "load_filter_index", return_value=None)
+    mocker.patch.object(SearchModel, "read_prefilter_fields", return_value=())
+    mocker.patch.object(SearchModel, "query_cache", mocker.MagicMock())
+    mocker.patch.object(SearchModel, "index_generation", None)
+    mocker.patch.object(SearchModel, "generation_checked_at", None)
+    mocker.patch.object(SearchModel, "load_vector_index", return_value=VectorIndex(["x"], [[1.0, 0.0, 0.0]]))
+    mocker.patch.object(SearchModel, "load_bm25_index", return_value=BM25Index(["x"], ["x"]))
+    return SearchModel
+
+
+def test_instances_map_the_recorded_artifact_instead_of_reading_firestore(model, mocker, tmp_path):
+    _publish(tmp_path, "v1")
+    mocker.patch.object(model, "read_artifact_version", return_value="v1")
+
+    model.load_indexes("gen-1")
+
+    model.load_vector_index.assert_not_called()
+    model.load_bm25_index.assert_not_called()
+    assert model.indexes.index.ids == IDS
+    assert model.indexes.artifact.version == "v1"
+
+
+def test_an_artifact_the_reindex_did_not_record_is_not_used(model, mocker, tmp_path):
+    _publish(tmp_path, "v1")
+    mocker.patch.object(model, "read_artifact_version", return_value="v2")
+
+    model.load_indexes("gen-2")
+
+    assert model.indexes.index is model.load_vector_index.return_value
+    assert model.indexes.bm25_index is model.load_bm25_index.return_value
+    assert model.indexes.artifact is None
+
+
+def test_a_reload_publishes_every_index_at_once(model, mocker):
+    mocker.patch.object(retriever, "INDEX_ARTIFACT_LOCATION", "")
+    previous = SearchIndexes(index=VectorIndex(["old"], [[0.0, 1.0, 0.0]]))
+    mocker.patch.object(SearchModel, "indexes", previous)
+    seen_while_building = []
+    model.load_filter_index.side_effect = lambda ids: seen_while_building.append(SearchModel.indexes) or "filters"
+
+    model.load_indexes("gen-2")
+
+    assert seen_while_building == [previous]
+    assert model.indexes.index is model.load_vector_index.return_value
+    assert model.indexes.filter_index == "filters"
+
+
+def test_quantized_artifact_index_reranks_against_the_mapped_rows(model, mocker, tmp_path):
+    _publish(tmp_path, "v1")
+    mocker.patch.object(model, "read_artifact_version", return_value="v1")
+    mocker.patch.object(retriever, "VECTOR_QUANTIZATION", "int8")
+
+    model.load_indexes("gen-1")
+
+    assert isinstance(model.indexes.index.exact_vectors, np.memmap)
+    assert model.indexes.index.search([0.6, 0.8, 0.0], 3) == VectorIndex(IDS, VECTORS).search([0.6, 0.8, 0.0], 3)
+    assert model.quantize_vector_index(VectorIndex(IDS, VECTORS)).exact_vectors is None
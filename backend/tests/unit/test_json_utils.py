@@ -0,0 +1,75 @@
+"""Unit tests for response serialization (functions/utils/json_utils.py).
+
+Behaviour under test: Firestore and pandas timestamps, missing values, NaN and
+numpy values are encoded in one call, and the orjson and standard-library
+paths produce the same JSON. The orjson path writes non-ASCII characters as
+UTF-8 rather than \\u escapes, unless `ensure_ascii=True` is passed.
+"""
+
+import json
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from google.cloud.firestore_v1._helpers import DatetimeWithNanoseconds
+
+from utils import json_utils
+from utils.json_utils import safe_json_dumps, to_json_compatible
+
+
+STAMP = DatetimeWithNanoseconds(2025, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+DATA = {
+    "created_at": STAMP,
+    "updated": pd.Timestamp("2025-01-01T00:00:00Z"),
+    "missing": [pd.NaT, pd.NA, None],
+    "scores": [float("nan"), float("inf"), np.float32(0.5), np.int64(3)],
+    "vector": np.array([1.0, 2.0]),
+    "nested": [{"when": datetime(2025, 1, 1), "ok": True}],
+}
+EXPECTED = {
+    "created_at": "2025-01-02T03:04:05.123456+00:00",
+    "updated": "2025-01-01T00:00:00+00:00",
+    "missing": [None, None, None],
+    "scores": [None, None, 0.5, 3],
+    "vector": [1.0, 2.0],
+    "nested": [{"when": "2025-01-01T00:00:00", "ok": True}],
+}
+
+
+def test_encodes_firestore_pandas_and_numpy_values():
+    assert json.loads(safe_json_dumps(DATA)) == EXPECTED
+
+
+def test_standard_library_fallback_matches(mocker):
+    mocker.patch.object(json_utils, "orjson", None)
+
+    assert json.loads(safe_json_dumps(DATA)) == EXPECTED
+
+
+def test_unsupported_options_use_the_standard_encoder():
+    assert safe_json_dumps({"a": 1}, separators=(",", ":")) == '{"a":1}'
+    assert safe_json_dumps({"b": 1, "a": 2}, sort_keys=True).index('"a"') < safe_json_dumps({"b": 1, "a": 2}).index(
+        '"a"'
+    )
+
+
+def test_non_ascii_is_written_unescaped_unless_ascii_is_requested():
+    pytest.importorskip("orjson")
+    data = {"scheme": "Café Assistance 援助"}
+
+    assert safe_json_dumps(data) == '{"scheme":"Café Assistance 援助"}'
+    assert safe_json_dumps(data, ensure_ascii=True) == json.dumps(data)
+    assert json.loads(safe_json_dumps(data)) == data
+
+
+def test_to_json_compatible_replaces_non_finite_floats():
+    converted = to_json_compatible({"x": [math.nan, 1.5], 2: "y"})
+
+    assert converted == {"x": [None, 1.5], "2": "y"}
+
+
+def test_unknown_types_still_raise():
+    with pytest.raises(TypeError):
+        safe_json_dumps({"x": object()})
@@ -0,0 +1,59 @@
+"""Unit tests for the shared Azure chat clients (functions/integrations/llm_manager.py).
+
+Behaviour under test: asking for the same deployment and parameters returns
+the same client, different parameters get their own client over one shared
+HTTP connection pool per endpoint, and tools are bound once per tool set
+however many times the agent asks. No request is sent to Azure.
+"""
+
+import pytest
+from langchain_core.tools import tool
+
+from integrations import llm_manager
+from integrations.llm_manager import LLMManager
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return query
+
+
+@pytest.fixture(autouse=True)
+def registries(mocker):
+    mocker.patch.dict(
+        llm_manager.PRESET_LLM_CONFIGS,
+        {
+            "test-model": {
+                "api_key": "key",
+                "endpoint": "https://example.openai.azure.com/",
+                "api_version": "2024-10-21",
+            }
+        },
+    )
+    mocker.patch.object(LLMManager, "_http_clients", {})
+    mocker.patch.object(LLMManager, "_async_http_clients", {})
+    mocker.patch.object(LLMManager, "_clients", {})
+    mocker.patch.object(LLMManager, "_bound_clients", {})
+
+
+def test_clients_are_shared_per_parameters_over_one_pool():
+    client = LLMManager.get_client("test-model", temperature=0.0, max_tokens=500)
+
+    assert LLMManager.get_client("test-model", max_tokens=500, temperature=0.0) is client
+    other = LLMManager.get_client("test-model", temperature=0.7, max_tokens=400)
+    assert other is not client
+    assert (other.temperature, other.max_tokens) == (0.7, 400)
+    assert other.http_client is client.http_client
+    assert other.http_async_client is client.http_async_client
+    assert LLMManager("test-model").model.http_client is client.http_client
+
+
+def test_tools_are_bound_once_per_tool_set(mocker):
+    bind_tools = mocker.spy(type(LLMManager.get_client("test-model", temperature=0.7)), "bind_tools")
+
+    bound = LLMManager.get_client_with_tools("test-model", [lookup], temperature=0.7)
+
+    assert LLMManager.get_client_with_tools("test-model", [lookup], temperature=0.7) is bound
+    assert LLMManager.get_client_with_tools("test-model", [lookup], False, temperature=0.7) is not bound
+    assert bind_tools.call_count == 2
@@ -0,0 +1,72 @@
+"""Unit tests for the quantized vector index (functions/search/quantized_index.py).
+
+Behaviour under test: float16 and int8 codes take a half and a quarter of the
+float32 matrix yet return nearly the same neighbours, with distances on
+Firestore's COSINE scale. A truncated first pass re-ranks its candidates at
+full dimension without cutting the requested pool short, and batched and
+restricted searches agree with single ones.
+"""
+
+import numpy as np
+import pytest
+
+from search.quantized_index import QuantizedVectorIndex
+from search.vector_index import VectorIndex
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(3)
+    ids = [f"s{i}" for i in range(400)]
+    # Variance falls off along the dimensions, as in Matryoshka embeddings.
+    vectors = (rng.normal(size=(400, 64)) * np.linspace(2.0, 0.2, 64)).astype(np.float32)
+    queries = vectors[:20] + rng.normal(scale=0.3, size=(20, 64)).astype(np.float32)
+    return ids, vectors, queries
+
+
+def _recall(index, exact, queries, k=10):
+    found = [len(set(exact.search(q, k)[0]) & set(index.search(q, k)[0])) / k for q in queries]
+    return float(np.mean(found))
+
+
+@pytest.mark.parametrize("mode, ratio", [("float16", 2), ("int8", 4)])
+def test_quantized_search_keeps_recall_in_less_memory(corpus, mode, ratio):
+    ids, vectors, queries = corpus
+    exact = VectorIndex(ids, vectors)
+    index = QuantizedVectorIndex.from_index(exact, mode=mode)
+
+    assert index.codes.nbytes * ratio == exact.matrix.nbytes
+    assert _recall(index, exact, queries) >= 0.95
+    _, exact_distances = exact.search(queries[0], 5)
+    _, distances = index.search(queries[0], 5)
+    assert distances == pytest.approx(exact_distances, abs=0.02)
+
+
+def test_truncated_first_pass_is_reranked_at_full_dimension(corpus):
+    ids, vectors, queries = corpus
+    exact = VectorIndex(ids, vectors)
+    index = QuantizedVectorIndex(ids, vectors, first_pass_dims=32, rerank_depth=150, exact_vectors=vectors)
+
+    result_ids, distances = index.search(queries[0], 200)
+    expected = dict(zip(*exact.search(queries[0], len(ids))))
+
+    assert len(result_ids) == 200
+    assert distances == pytest.approx([expected[i] for i in result_ids], abs=1e-5)
+    assert _recall(index, exact, queries) >= 0.95
+
+
+def test_search_many_and_row_restriction_match_single_searches(corpus):
+    ids, vectors, queries = corpus
+    index = QuantizedVectorIndex(ids, vectors, mode="int8")
+
+    for (many_ids, many_distances), query in zip(index.search_many(queries[:3], 5), queries[:3]):
+        single_ids, single_distances = index.search(query, 5)
+        assert many_ids == single_ids
+        assert many_distances == pytest.approx(single_distances, abs=1e-5)
+    restricted, _ = index.search(queries[0], 5, rows=np.array([7, 8, 9]))
+    assert restricted[0] in {"s7", "s8", "s9"} and set(restricted) == {"s7", "s8", "s9"}
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        QuantizedVectorIndex(["a"], [[1.0, 0.0]], mode="int4")
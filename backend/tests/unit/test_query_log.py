@@ -0,0 +1,215 @@
+"""Unit tests for write-behind query logging (functions/search/query_log.py).
+
+Behaviour under test: submitted records are written by the background worker
+in batches and each record's event is set once its batch is done, failed
+batches are retried, a full queue falls back to an inline write,
+`wait_until_written()` waits for one record only (and gives up after
+QUERY_LOG_WAIT_SECONDS), SIGTERM writes queued records before the previous
+handler runs, and the agent's `llmQuery` record is written before its docID
+is returned. Firestore is replaced by a small in-memory fake.
+"""
+
+import signal
+import threading
+
+import pytest
+
+from search import query_log
+from search.handler import QueryHandler
+from search.query_log import QueryLogWriter
+
+
+class _Ref:
+    def __init__(self, db, collection, doc_id):
+        self.db = db
+        self.path = (collection, doc_id)
+        self.id = doc_id
+
+    def set(self, data):
+        self.db.docs[self.path] = data
+
+
+class _Collection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            self.db.allocated += 1
+            doc_id = f"auto-{self.db.allocated}"
+        return _Ref(self.db, self.name, doc_id)
+
+
+class _Batch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref.path, data))
+
+    def commit(self):
+        self.db.gate.wait(timeout=5)
+        if self.db.failures:
+            self.db.failures -= 1
+            raise RuntimeError("unavailable")
+        self.db.commits.append(len(self.writes))
+        self.db.docs.update(dict(self.writes))
+
+
+class _FakeDb:
+    def __init__(self, failures=0):
+        self.docs = {}
+        self.commits = []
+        self.failures = failures
+        self.allocated = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def collection(self, name):
+        return _Collection(self, name)
+
+    def batch(self):
+        return _Batch(self)
+
+
+class _FirebaseManager:
+    def __init__(self, db):
+        self.firestore_client = db
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(mocker):
+    mocker.patch.object(query_log, "QUERY_LOG_RETRY_SECONDS", 0)
+
+
+def _writer(db):
+    writer = object.__new__(QueryLogWriter)
+    writer._setup(_FirebaseManager(db))
+    return writer
+
+
+def test_records_are_written_in_the_background_and_signal_when_done():
+    db = _FakeDb()
+    db.gate.clear()
+    writer = _writer(db)
+
+    first = writer.submit("userQuery", "s1", {"query_text": "a"})
+    second = writer.submit("userQuery", "s2", {"query_text": "b"})
+
+    assert db.docs == {}
+    assert not first.is_set()
+
+    db.gate.set()
+    assert first.wait(timeout=5) and second.wait(timeout=5)
+    assert db.docs[("userQuery", "s1")] == {"query_text": "a"}
+    assert db.docs[("userQuery", "s2")] == {"query_text": "b"}
+    assert sum(db.commits) == 2
+    writer.close()
+
+
+def test_failed_batches_are_retried():
+    db = _FakeDb(failures=2)
+    writer = _writer(db)
+
+    writer.submit("llmQuery", "d1", {"query_text": "a"})
+
+    assert writer.flush(timeout=5)
+    assert ("llmQuery", "d1") in db.docs
+    assert writer.stats()["written"] == 1
+    writer.close()
+
+
+def test_full_queue_writes_inline(mocker):
+    mocker.patch.object(query_log, "QUERY_LOG_MAX_PENDING", 1)
+    db = _FakeDb()
+    db.gate.clear()
+    writer = _writer(db)
+
+    writer.submit("userQuery", "s1", {"n": 1})  # picked up by the worker, blocked on commit
+    assert _wait_until(lambda: writer._queue.empty())
+    writer.submit("userQuery", "s2", {"n": 2})  # fills the queue
+    inline = writer.submit("userQuery", "s3", {"n": 3})  # no room: written inline
+
+    assert db.docs == {("userQuery", "s3"): {"n": 3}}
+    assert inline.is_set()
+    db.gate.set()
+    assert writer.flush(timeout=5)
+    assert len(db.docs) == 3
+    writer.close()
+
+
+def test_agent_query_is_written_before_its_doc_id_is_returned(mocker):
+    db = _FakeDb()
+    writer = _writer(db)
+    mocker.patch.object(query_log, "QueryLogWriter", return_value=writer)
+    mocker.patch.object(query_log, "QUERY_LOG_ASYNC", True)
+    handler = QueryHandler.__new__(QueryHandler)
+    QueryHandler.firebase_manager = _FirebaseManager(db)
+
+    doc_id = handler.save_llm_query("help", "session-1", [{"scheme_id": "a"}])
+
+    # filter_rerank reads the record back from Firestore, possibly on another instance.
+    assert doc_id == "auto-1"
+    assert db.docs[("llmQuery", doc_id)]["session_id"] == "session-1"
+    assert writer.stats()["queued"] == 0
+    writer.close()
+
+
+def test_a_request_waits_for_its_own_record_only(mocker):
+    db = _FakeDb()
+    writer = _writer(db)
+    done = threading.Event()
+    mocker.patch.object(writer, "_commit", side_effect=lambda records: done.wait(timeout=5))
+    writer.submit("userQuery", "other-request", {"query_text": "a"})  # stuck in commit
+    mine = threading.Event()
+    opener = threading.Timer(0.05, mine.set)
+    opener.start()
+
+    query_log.wait_until_written(mine)
+
+    assert mine.is_set() and not done.is_set()
+    done.set()
+    opener.join()
+    writer.close()
+
+
+def test_waiting_gives_up_after_the_timeout(mocker):
+    mocker.patch.object(query_log, "QUERY_LOG_WAIT_SECONDS", 0.05)
+    warning = mocker.patch.object(query_log.logger, "warning")
+
+    query_log.wait_until_written(threading.Event())
+
+    assert warning.call_count == 1
+
+
+def test_sigterm_writes_queued_records_then_calls_the_previous_handler(mocker):
+    db = _FakeDb()
+    db.gate.clear()
+    writer = _writer(db)
+    mocker.patch.object(QueryLogWriter, "_instance", writer)
+    received = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    try:
+        query_log.install_shutdown_flush()
+        writer.submit("userQuery", "s1", {"query_text": "a"})
+        opener = threading.Timer(0.05, db.gate.set)
+        opener.start()
+
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+
+        assert db.docs[("userQuery", "s1")] == {"query_text": "a"}
+        assert received == [signal.SIGTERM]
+        opener.join()
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+
+def _wait_until(condition, timeout=5.0):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        event.wait(0.01)
+    return False
@@ -0,0 +1,275 @@
+"""Unit tests for the in-memory scheme store (functions/search/scheme_store.py).
+
+Behaviour under test: the store loads every active scheme without scraped_text,
+answers ID/agency/area/type lookups from memory, reads unknown IDs through from
+Firestore and remembers the ones it does not keep (inactive or missing), picks
+up recently updated schemes with a delta poll and reloads on a background
+thread without holding up the request, and serves catalog pages in the same
+order and with the same cursors as the Firestore path. SCHEME_FIELDS, the
+inclusion mask for scheme reads, covers every field the frontend's `RawScheme`
+type and the approval form write, so a new field fails here instead of
+silently disappearing from responses.
+Firestore is replaced by a small in-memory fake.
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from new_scheme.approval_handler import extract_form_data
+from search import scheme_store
+from search.scheme_store import SchemeStore, get_scheme_store
+from utils.catalog_pagination import get_paginated_store_results
+
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+FRONTEND_TYPES = Path(__file__).resolve().parents[3] / "frontend" / "src" / "types" / "types.ts"
+# Left out of the mask on purpose: scraped_text never leaves the server, scheme_id is the document ID.
+UNMASKED_FIELDS = {"scraped_text", "scheme_id"}
+
+
+class _Snapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class _Query:
+    def __init__(self, db, filters=()):
+        self.db = db
+        self.filters = filters
+
+    def where(self, filter):
+        return _Query(self.db, self.filters + (filter,))
+
+    def select(self, field_paths):
+        return self
+
+    def document(self, doc_id):
+        return doc_id
+
+    def stream(self):
+        self.db.streams += 1
+        for doc_id, data in self.db.schemes.items():
+            if all(data.get(f.field_path) is not None and data[f.field_path] > f.value for f in self.filters):
+                yield _Snapshot(doc_id, data)
+
+
+class _FakeDb:
+    def __init__(self, schemes):
+        self.schemes = schemes
+        self.streams = 0
+        self.get_all_ids = []
+
+    def collection(self, name):
+        return _Query(self)
+
+    def get_all(self, refs, field_paths=None):
+        for ref in refs:
+            self.get_all_ids.append(ref)
+            yield _Snapshot(ref, self.schemes.get(ref))
+
+
+def _scheme(agency, minutes, areas=(), types=(), **extra):
+    return {
+        "agency": agency,
+        "planning_area": list(areas),
+        "scheme_type": list(types),
+        "last_scraped_update": BASE_TIME + timedelta(minutes=minutes),
+        "scraped_text": "very long page text",
+        **extra,
+    }
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db():
+    return _FakeDb(
+        {
+            "a": _scheme("Msf", 3, areas=["TAMPINES"], types=["Food"]),
+            "b": _scheme("Moh", 2, areas=["BEDOK"], types=["Health", "Food"]),
+            "c": _scheme("Msf", 2, types=["Housing"], status="active"),
+            "d": _scheme("Moh", 1, areas=["TAMPINES"]),
+            "e": _scheme("Msf", 4, types=["Housing"], status="inactive"),
+        }
+    )
+
+
+@pytest.fixture
+def store(db, mocker):
+    SchemeStore._instance = None
+    store = SchemeStore(mocker.MagicMock(firestore_client=db))
+    store._clock = _Clock()
+    store.loaded_at = store.polled_at = 0.0
+    yield store
+    SchemeStore._instance = None
+
+
+def _refresh(store):
+    """Run a due refresh to completion."""
+    if store.maybe_refresh():
+        store.refresh_thread.join(timeout=5)
+
+
+def test_store_loads_active_schemes_without_scraped_text(store):
+    scheme = store.get("c")
+
+    assert len(store) == 4
+    assert sorted(store.all_ids()) == ["a", "b", "c", "d"]
+    assert scheme["scheme_id"] == "c"
+    assert "scraped_text" not in scheme
+
+
+def test_inactive_schemes_are_read_through_but_not_indexed(store, db):
+    assert store.get("e")["status"] == "inactive"
+    assert store.get("e")["status"] == "inactive"
+
+    assert db.get_all_ids == ["e"]
+    assert "e" not in store.all_ids()
+    assert sorted(store.ids_by_agency("Msf")) == ["a", "c"]
+
+
+def test_lookups_by_agency_area_and_type(store):
+    assert sorted(store.ids_by_agency("Msf")) == ["a", "c"]
+    assert sorted(store.ids_by_planning_area("TAMPINES")) == ["a", "d"]
+    assert sorted(store.ids_by_scheme_type(["Food", "Housing"])) == ["a", "b", "c"]
+
+
+def test_returned_schemes_are_copies(store):
+    store.get("a")["agency"] = "changed"
+    assert store.get("a")["agency"] == "Msf"
+
+
+def test_unknown_ids_are_read_through_and_missing_reported(store, db):
+    db.schemes["new"] = _scheme("Cpf", 5)
+
+    schemes, missing = store.get_many(["new", "a", "ghost"])
+
+    assert [s["scheme_id"] for s in schemes] == ["new", "a"]
+    assert missing == ["ghost"]
+    assert db.get_all_ids == ["new", "ghost"]
+    # The read-through result is kept and the missing ID remembered, so the next lookups stay in memory.
+    store.get("new")
+    assert store.get_many(["ghost"]) == ([], ["ghost"])
+    assert db.get_all_ids == ["new", "ghost"]
+
+    # Until the next poll interval, when a missing ID is looked up again.
+    store._clock.now = scheme_store.SCHEME_STORE_POLL_SECONDS
+    _refresh(store)
+    store.get("ghost")
+    assert db.get_all_ids == ["new", "ghost", "ghost"]
+
+
+def test_delta_poll_picks_up_updated_schemes(store, db):
+    db.schemes["a"] = _scheme("Msf", 10, summary="updated")
+
+    store.get("a")
+    assert "summary" not in store.get("a")
+
+    store._clock.now = scheme_store.SCHEME_STORE_POLL_SECONDS
+    _refresh(store)
+    assert store.get("a")["summary"] == "updated"
+
+
+def test_delta_poll_drops_schemes_marked_inactive(store, db):
+    db.schemes["a"] = _scheme("Msf", 10, status="inactive")
+    store._clock.now = scheme_store.SCHEME_STORE_POLL_SECONDS
+
+    _refresh(store)
+
+    assert "a" not in store.all_ids()
+
+
+def test_full_reload_drops_deleted_schemes(store, db):
+    del db.schemes["d"]
+    store._clock.now = scheme_store.SCHEME_STORE_RELOAD_SECONDS
+
+    _refresh(store)
+
+    assert "d" not in store.all_ids()
+
+
+def test_due_reload_runs_in_the_background_once(store, db, mocker):
+    release = threading.Event()
+    reload = mocker.patch.object(store, "reload", side_effect=lambda: release.wait(timeout=5))
+    store._clock.now = scheme_store.SCHEME_STORE_RELOAD_SECONDS
+
+    # The request that crosses the interval is served from the current snapshot.
+    assert sorted(store.all_ids()) == ["a", "b", "c", "d"]
+    assert store.maybe_refresh() is False  # already running
+    release.set()
+    store.refresh_thread.join(timeout=5)
+
+    assert reload.call_count == 1
+
+
+def test_catalog_pages_follow_update_order_and_cursors(store):
+    first = get_paginated_store_results(store, store.all_ids(), limit=2)
+
+    assert [s["scheme_id"] for s in first.data] == ["a", "b"]
+    assert first.has_more
+    assert first.total_count == 4
+
+    second = get_paginated_store_results(store, store.all_ids(), cursor=first.next_cursor, limit=2)
+
+    # Same timestamp for b and c: ties break on ID, and the cursor page starts at c.
+    assert [s["scheme_id"] for s in second.data] == ["c", "d"]
+    assert not second.has_more
+    assert second.next_cursor is None
+
+
+def test_filtered_catalog_page(store):
+    page = get_paginated_store_results(store, store.ids_by_planning_area("TAMPINES"), limit=10)
+
+    assert [s["scheme_id"] for s in page.data] == ["a", "d"]
+    assert page.total_count == 2
+
+
+def test_get_scheme_store_returns_none_when_load_fails(mocker):
+    SchemeStore._instance = None
+    broken = mocker.MagicMock()
+    broken.firestore_client.collection.side_effect = RuntimeError("unavailable")
+    try:
+        assert get_scheme_store(broken) is None
+    finally:
+        SchemeStore._instance = None
+
+
+def test_get_scheme_store_respects_disable_flag(mocker, db):
+    SchemeStore._instance = None
+    mocker.patch.object(scheme_store, "SCHEME_STORE_ENABLED", False)
+
+    assert get_scheme_store(mocker.MagicMock(firestore_client=db)) is None
+    assert db.streams == 0
+
+
+def test_scheme_fields_cover_the_frontend_raw_scheme_type():
+    if not FRONTEND_TYPES.exists():
+        pytest.skip("frontend sources not checked out")
+    body = re.search(r"export interface RawScheme \{(.*?)\n\}", FRONTEND_TYPES.read_text(), re.S).group(1)
+    frontend_fields = set(re.findall(r"^\s*(\w+)\??:", body, re.M))
+
+    assert frontend_fields - UNMASKED_FIELDS - set(scheme_store.SCHEME_FIELDS) == set()
+
+
+def test_scheme_fields_cover_fields_written_on_approval():
+    # approval_handler stores the form under the schemes collection's names, plus the LLM-only fields.
+    renamed = {"scheme_name": "scheme", "scheme_url": "link", "image_url": "image"}
+    written = {renamed.get(field, field) for field in extract_form_data({})}
+    written |= {"summary", "search_booster", "service_area", "description"}
+
+    assert written - set(scheme_store.SCHEME_FIELDS) == set()
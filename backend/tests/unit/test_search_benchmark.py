@@ -0,0 +1,81 @@
+"""Unit tests for the offline search benchmark (functions/scripts/search_benchmark.py).
+
+Behaviour under test: the relevance metrics score rankings correctly, and a
+synthetic snapshot round-trips to disk and benchmarks end to end without any
+Firestore or Azure access, leaving the real SearchModel untouched. The
+quantization and backend reports compare each index with exact search.
+"""
+
+import pytest
+
+from scripts.search_benchmark import (
+    build_synthetic_snapshot,
+    load_snapshot,
+    ndcg_at_k,
+    recall_at_k,
+    run_backend_report,
+    run_benchmark,
+    run_quantization_report,
+)
+from search.retriever import SearchModel
+
+
+def test_recall_at_k():
+    relevant = {"a": 1, "b": 2, "c": 0}
+
+    assert recall_at_k(["a", "x", "b"], relevant, 2) == 0.5
+    assert recall_at_k(["a", "x", "b"], relevant, None) == 1.0
+    assert recall_at_k(["a"], {}, 5) == 0.0
+
+
+def test_ndcg_prefers_highly_relevant_first():
+    relevant = {"a": 2, "b": 1}
+
+    assert ndcg_at_k(["a", "b"], relevant, 2) == pytest.approx(1.0)
+    assert ndcg_at_k(["b", "a"], relevant, 2) < 1.0
+    assert ndcg_at_k(["x", "y"], relevant, 2) == 0.0
+
+
+def test_synthetic_snapshot_benchmarks_offline(tmp_path):
+    embeddings_before = SearchModel.embeddings
+    build_synthetic_snapshot(str(tmp_path), schemes_per_topic=8, dimension=32, queries_per_topic=1)
+    snapshot = load_snapshot(str(tmp_path))
+
+    results = run_benchmark(snapshot, ["weighted_sum", "rrf"], [0.5], [100], k=5, repeat=1)
+
+    assert [r.fusion for r in results] == ["weighted_sum", "rrf"]
+    for result in results:
+        assert result.queries == len(snapshot.queries)
+        assert result.p95_ms >= result.p50_ms > 0
+        assert 0.0 < result.ndcg_at_k <= 1.0
+    assert SearchModel.embeddings is embeddings_before
+
+
+def test_quantization_report_measures_recall_against_memory(tmp_path):
+    build_synthetic_snapshot(str(tmp_path), schemes_per_topic=8, dimension=32, queries_per_topic=1)
+    snapshot = load_snapshot(str(tmp_path))
+
+    results = run_quantization_report(snapshot, ["float16", "int8"], [0, 16], [5], repeat=1)
+
+    assert [(r.mode, r.first_pass_dims) for r in results] == [
+        ("float32", 32),
+        ("float16", 32),
+        ("float16", 16),
+        ("int8", 32),
+        ("int8", 16),
+    ]
+    by_mode = {(r.mode, r.first_pass_dims): r for r in results}
+    assert by_mode[("float32", 32)].recall_at_k == 1.0
+    assert by_mode[("int8", 32)].bytes_per_vector < by_mode[("float16", 32)].bytes_per_vector
+    assert by_mode[("float16", 32)].bytes_per_vector < by_mode[("float32", 32)].bytes_per_vector
+    assert all(r.recall_at_k >= 0.8 for r in results)
+
+
+def test_backend_report_measures_recall_against_exact_search(tmp_path):
+    build_synthetic_snapshot(str(tmp_path), schemes_per_topic=20, dimension=16, queries_per_topic=1)
+    snapshot = load_snapshot(str(tmp_path))
+
+    results = run_backend_report(snapshot, ["ivf"], [5, 50], repeat=1)
+
+    assert [(r.backend, r.k) for r in results] == [("exact", 5), ("ivf", 5), ("exact", 50), ("ivf", 50)]
+    assert all(r.rows == 200 and r.recall_at_k >= 0.8 for r in results)
@@ -0,0 +1,193 @@
+"""Unit tests for the bounded search result cache (functions/search/cache.py).
+
+Behaviour under test: the cache stays within its entry and memory budgets (an
+oversized value is not stored, but still drops the entry it would replace),
+expires entries after the TTL, normalizes queries so trivially different
+phrasings share an entry, and drops everything after a reindex. The reindex
+check runs on a background thread, one at a time, while searches keep using
+the current indexes.
+"""
+
+import threading
+
+import pandas as pd
+import pytest
+
+from search.cache import QueryResultCache, normalize_query
+from search.results import SearchResults
+from search.retriever import SearchModel
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query_ignores_case_whitespace_and_punctuation():
+    assert normalize_query("  Elderly   financial HELP?! ") == "elderly financial help"
+    assert normalize_query("elderly financial help") == "elderly financial help"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryResultCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")  # "b" is now the least recently used
+    cache["c"] = 3
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_budget_is_enforced():
+    cache = QueryResultCache(max_entries=100, max_bytes=250, sizeof=lambda value: 100)
+    for key in "abc":
+        cache[key] = key
+
+    assert len(cache) == 2
+    assert cache.total_bytes == 200
+
+
+def test_oversized_value_is_not_cached():
+    cache = QueryResultCache(max_bytes=10, sizeof=lambda value: 11)
+    cache["big"] = "value"
+
+    assert cache.get("big") is None
+    assert len(cache) == 0
+
+
+def test_oversized_replacement_drops_the_stale_value():
+    cache = QueryResultCache(max_bytes=10, sizeof=len)
+    cache["key"] = "old"
+    cache["key"] = "a much longer value"
+
+    assert cache.get("key") is None
+    assert cache.total_bytes == 0
+
+
+def test_entries_expire_after_ttl():
+    clock = _Clock()
+    cache = QueryResultCache(ttl_seconds=60, clock=clock)
+    cache["q"] = "ranked"
+
+    clock.now = 59
+    assert cache.get("q") == "ranked"
+    clock.now = 60
+    assert cache.get("q") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_generation_change_drops_all_entries():
+    cache = QueryResultCache()
+    cache.set_generation("gen-1")
+    cache["q"] = "ranked"
+
+    assert cache.set_generation("gen-1") is False
+    assert cache.get("q") == "ranked"
+    assert cache.set_generation("gen-2") is True
+    assert cache.get("q") is None
+
+
+def test_hit_and_miss_counters():
+    cache = QueryResultCache()
+    cache.get("missing")
+    cache["q"] = "ranked"
+    cache.get("q")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_dataframe_size_is_estimated_from_memory_usage():
+    cache = QueryResultCache()
+    frame = pd.DataFrame({"scheme_id": [f"s{i}" for i in range(100)]})
+    cache["frame"] = frame
+
+    assert cache.total_bytes >= 100
+
+
+@pytest.fixture
+def model(mocker):
+    mocker.patch.object(SearchModel, "initialise", return_value=None)
+    SearchModel._instance = None
+    SearchModel.initialised = True
+    m = SearchModel(mocker.MagicMock())
+    m.query_cache = QueryResultCache()
+    mocker.patch.object(
+        m,
+        "rank",
+        side_effect=lambda query_text, results, fusion=None: results.with_scores(combined_scores=results.vec_scores),
+    )
+    return m
+
+
+def test_equivalent_queries_share_a_cached_ranking(model, mocker):
+    search = mocker.patch.object(
+        model,
+        "search",
+        return_value=SearchResults("q", ["a"], [{"scheme_id": "a"}], [0.9]),
+    )
+
+    model.aggregate_and_rank_results("Elderly financial help?", 0.5)
+    model.aggregate_and_rank_results("elderly  financial help", 0.5)
+
+    search.assert_called_once()
+
+
+def test_switching_fusion_strategy_reuses_the_retrieved_pool(model, mocker):
+    search = mocker.patch.object(
+        model,
+        "search",
+        return_value=SearchResults("q", ["a"], [{"scheme_id": "a"}], [0.9]),
+    )
+
+    model.aggregate_and_rank_results("childcare", 0.5, fusion="weighted_sum")
+    model.aggregate_and_rank_results("childcare", 0.5, fusion="rrf")
+
+    search.assert_called_once()
+    assert [call.kwargs["fusion"] for call in model.rank.call_args_list] == ["weighted_sum", "rrf"]
+
+
+def test_reindex_generation_change_rebuilds_indexes(mocker):
+    mocker.patch.object(SearchModel, "generation_checked_at", 0.0)
+    mocker.patch.object(SearchModel, "index_generation", "gen-1")
+    mocker.patch("search.retriever.INDEX_GENERATION_CHECK_SECONDS", 0)
+    mocker.patch.object(SearchModel, "read_index_generation", return_value="gen-2")
+    load_indexes = mocker.patch.object(SearchModel, "load_indexes")
+
+    assert SearchModel.reload_if_reindexed() is True
+    load_indexes.assert_called_once_with("gen-2")
+
+
+def test_unchanged_generation_keeps_indexes(mocker):
+    mocker.patch.object(SearchModel, "generation_checked_at", 0.0)
+    mocker.patch.object(SearchModel, "index_generation", "gen-1")
+    mocker.patch("search.retriever.INDEX_GENERATION_CHECK_SECONDS", 0)
+    mocker.patch.object(SearchModel, "read_index_generation", return_value="gen-1")
+    load_indexes = mocker.patch.object(SearchModel, "load_indexes")
+
+    assert SearchModel.reload_if_reindexed() is False
+    load_indexes.assert_not_called()
+
+
+def test_due_refresh_rebuilds_once_in_the_background(mocker):
+    mocker.patch.object(SearchModel, "generation_checked_at", 0.0)
+    mocker.patch.object(SearchModel, "index_generation", "gen-1")
+    mocker.patch.object(SearchModel, "refresh_thread", None)
+    mocker.patch("search.retriever.INDEX_GENERATION_CHECK_SECONDS", 0)
+    release = threading.Event()
+    mocker.patch.object(SearchModel, "read_index_generation", side_effect=lambda: release.wait(2) and "gen-2")
+    load_indexes = mocker.patch.object(SearchModel, "load_indexes")
+
+    assert SearchModel.refresh_if_reindexed() is True
+    assert SearchModel.refresh_if_reindexed() is False
+    load_indexes.assert_not_called()
+
+    release.set()
+    SearchModel.refresh_thread.join(timeout=2)
+    load_indexes.assert_called_once_with("gen-2")
@@ -0,0 +1,51 @@
+"""Unit tests for score fusion strategies (functions/search/fusion.py).
+
+Behaviour under test: every strategy returns 0-1 scores aligned with the input
+arrays, a candidate strong on both signals beats one strong on a single
+signal, and unknown strategy names are rejected.
+"""
+
+import numpy as np
+import pytest
+
+from search.fusion import FUSION_STRATEGIES, fuse, resolve_fusion_strategy
+
+
+VEC = np.array([1.0, 0.9, 0.2, 0.0], dtype=np.float32)
+BM25 = np.array([0.0, 5.0, 4.0, 0.0], dtype=np.float32)
+
+
+@pytest.mark.parametrize("strategy", sorted(FUSION_STRATEGIES))
+def test_scores_are_bounded_and_aligned(strategy):
+    scores = fuse(VEC, BM25, strategy)
+
+    assert scores.shape == VEC.shape
+    assert scores.min() >= 0.0 and scores.max() <= 1.0 + 1e-6
+
+
+@pytest.mark.parametrize("strategy", sorted(FUSION_STRATEGIES))
+def test_agreement_between_signals_ranks_first(strategy):
+    scores = fuse(VEC, BM25, strategy)
+
+    # Candidate 1 is first on BM25 and second on vector similarity.
+    assert int(np.argmax(scores)) == 1
+    assert scores[3] == scores.min()
+
+
+def test_weighted_sum_keeps_the_original_weights():
+    scores = fuse(VEC, BM25, "weighted_sum")
+
+    assert scores[0] == pytest.approx(0.7)
+    assert scores[2] == pytest.approx(0.7 * 0.2 + 0.3 * 0.8)
+
+
+def test_rrf_ignores_candidates_without_term_overlap():
+    scores = fuse(np.array([0.5, 0.4]), np.array([0.0, 0.0]), "rrf")
+
+    assert scores.tolist() == [1.0, 0.0]
+
+
+def test_default_and_unknown_strategies():
+    assert resolve_fusion_strategy(None) == "weighted_sum"
+    with pytest.raises(ValueError):
+        resolve_fusion_strategy("borda")
@@ -0,0 +1,68 @@
+"""Unit tests for the array-backed search results (functions/search/results.py).
+
+Behaviour under test: ranking, thresholding, capping, de-duplication and field
+filters keep scheme dicts aligned with their scores, and only the returned
+slice is turned into records shaped like the old DataFrame rows.
+"""
+
+import json
+
+import numpy as np
+
+from search.results import SearchResults
+
+
+def _ranked():
+    ids = ["a", "b", "c", "a"]
+    schemes = [
+        {"scheme_id": "a", "agency": "MSF"},
+        {"scheme_id": "b", "agency": "MOH"},
+        {"scheme_id": "c", "agency": "MSF"},
+        {"scheme_id": "a", "agency": "MSF"},
+    ]
+    results = SearchResults("help", ids, schemes, [0.2, 0.9, 0.5, 0.1])
+    return results.with_scores(combined_scores=np.array([0.3, 0.9, 0.6, 0.1])).sorted_by_combined()
+
+
+def test_sorted_by_combined_keeps_schemes_aligned():
+    ranked = _ranked()
+
+    assert ranked.ids == ["b", "c", "a", "a"]
+    assert [s["scheme_id"] for s in ranked.schemes] == ranked.ids
+    assert ranked.vec_scores.tolist() == np.float32([0.9, 0.5, 0.2, 0.1]).tolist()
+
+
+def test_unique_above_and_head():
+    ranked = _ranked().unique()
+
+    assert ranked.ids == ["b", "c", "a"]
+    assert ranked.above(0.5).ids == ["b", "c"]
+    assert ranked.above(0.5).head(1).ids == ["b"]
+    assert ranked.above(0.95).empty
+
+
+def test_filter_by_scheme_field():
+    assert _ranked().unique().filter_by({"agency": ["MSF"]}).ids == ["c", "a"]
+
+
+def test_records_carry_scores_and_query_as_plain_values():
+    records = _ranked().head(1).to_records()
+
+    assert records == [
+        {
+            "scheme_id": "b",
+            "agency": "MOH",
+            "vec_similarity_score": records[0]["vec_similarity_score"],
+            "combined_scores": records[0]["combined_scores"],
+            "query": "help",
+        }
+    ]
+    assert isinstance(records[0]["combined_scores"], float)
+    json.dumps(records)
+
+
+def test_records_do_not_mutate_source_schemes():
+    ranked = _ranked()
+    ranked.to_records()[0]["agency"] = "changed"
+
+    assert ranked.schemes[0]["agency"] == "MOH"
@@ -7,7 +7,9 @@ live index is needed.
 
 import pytest
 
-from search.retriever import SearchModel, RETRIEVAL_LIMIT
+from search import scheme_store
+from search.retriever import SearchIndexes, SearchModel, RETRIEVAL_LIMIT, fetch_schemes_by_ids
+from search.vector_index import VectorIndex
 
 
 def _fake_doc(doc_id, distance):
@@ -31,6 +33,7 @@ def model(mocker):
     m.__class__.embeddings = mocker.MagicMock()
     m.__class__.embeddings.embed_query.return_value = [0.0, 0.0, 0.0]
     m.__class__.db = mocker.MagicMock()
+    mocker.patch.object(SearchModel, "indexes", SearchIndexes())
     return m
 
 
@@ -49,8 +52,8 @@ def test_search_preserves_real_distance_as_relevance(model, mocker):
         ],
     )
 
-    merged = model.search("a query")
-    scores = dict(zip(merged["scheme_id"], merged["vec_similarity_score"]))
+    results = model.search("a query")
+    scores = dict(zip(results.ids, results.vec_scores))
 
     assert scores["near"] > scores["far"]
 
@@ -74,3 +77,85 @@ def test_search_requests_full_pool_and_distance_field(model, mocker):
     _, kwargs = model.__class__.db.collection.return_value.find_nearest.call_args
     assert kwargs["limit"] == RETRIEVAL_LIMIT
     assert kwargs["distance_result_field"] == "vector_distance"
+
+
+def test_search_uses_in_process_index_when_loaded(model, mocker):
+    """With the in-process index loaded, retrieval never calls find_nearest."""
+    model.__class__.indexes = SearchIndexes(index=VectorIndex(["near", "far"], [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]))
+    model.__class__.embeddings.embed_query.return_value = [1.0, 0.1, 0.0]
+    mocker.patch.object(
+        model,
+        "fetch_schemes_batch",
+        return_value=[
+            {"scheme_id": "near", "search_booster": "x"},
+            {"scheme_id": "far", "search_booster": "y"},
+        ],
+    )
+
+    results = model.search("a query")
+    scores = dict(zip(results.ids, results.vec_scores))
+
+    assert scores["near"] > scores["far"]
+    model.__class__.db.collection.return_value.find_nearest.assert_not_called()
+
+
+def test_search_falls_back_to_find_nearest_when_index_fails(model, mocker):
+    """A broken in-process index degrades to Firestore rather than failing the search."""
+    model.__class__.indexes = SearchIndexes(index=mocker.MagicMock())
+    model.__class__.indexes.index.search.side_effect = ValueError("dimension mismatch")
+    model.__class__.db.collection.return_value.find_nearest.return_value.get.return_value = [
+        _fake_doc("a", 0.2)
+    ]
+    mocker.patch.object(
+        model, "fetch_schemes_batch", return_value=[{"scheme_id": "a", "search_booster": "x"}]
+    )
+
+    results = model.search("a query")
+
+    assert results.ids == ["a"]
+    model.__class__.db.collection.return_value.find_nearest.assert_called_once()
+
+
+class _FakeSchemesDb:
+    """Minimal Firestore client: document refs are ids, get_all returns snapshots."""
+
+    def __init__(self, schemes):
+        self.schemes = schemes
+        self.get_all_calls = []
+
+    def collection(self, name):
+        class _Collection:
+            def document(self, doc_id):
+                return doc_id
+
+        return _Collection()
+
+    def get_all(self, refs, field_paths=None):
+        self.get_all_calls.append((list(refs), field_paths))
+        for ref in refs:
+            data = self.schemes.get(ref)
+
+            class _Snapshot:
+                id = ref
+                exists = data is not None
+
+                def to_dict(self, data=data):
+                    return dict(data) if data is not None else None
+
+            yield _Snapshot()
+
+
+def test_fetch_schemes_by_ids_batches_reads_and_preserves_order(mocker):
+    mocker.patch.object(scheme_store, "SCHEME_STORE_ENABLED", False)
+    mocker.patch.object(scheme_store, "FETCH_CHUNK_SIZE", 2)
+    db = _FakeSchemesDb({"a": {"scheme": "A"}, "b": {"scheme": "B"}, "d": {"scheme": "D", "scraped_text": "big"}})
+    firebase_manager = mocker.MagicMock(firestore_client=db)
+
+    schemes, missing = fetch_schemes_by_ids(firebase_manager, ["d", "a", "x", " a ", "b"])
+
+    assert [s["scheme_id"] for s in schemes] == ["d", "a", "b"]
+    assert missing == ["x"]
+    assert "scraped_text" not in schemes[0]
+    # Four unique ids in two-item chunks -> two batched reads, not one per id.
+    assert sorted(len(refs) for refs, _ in db.get_all_calls) == [2, 2]
+    assert all("scraped_text" not in fields for _, fields in db.get_all_calls)
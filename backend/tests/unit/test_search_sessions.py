@@ -0,0 +1,193 @@
+"""Unit tests for snapshot-backed search pagination (functions/search/session_snapshots.py).
+
+Behaviour under test: the first page snapshots the ranked scheme IDs for the
+session and later pages are offset slices of that snapshot, hydrated without
+ranking again and in a stable order. A snapshot saved by another instance is
+written to Firestore before the first page returns and read back from there,
+with an `expire_at` Timestamp for the TTL policy; an expired one (including a
+legacy `created_at` record) falls back to ranking again.
+Later pages carry the same per-signal scores as the first. Cursors issued
+before snapshots existed keep working.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from search import session_results, session_snapshots
+from search.handler import QueryHandler
+from search.results import SearchResults
+from search.session_snapshots import SessionSnapshotStore
+from search.types import PaginatedSearchParams
+from utils.pagination import decode_cursor, encode_cursor
+
+
+SCHEMES = {f"s{i}": {"scheme_id": f"s{i}", "scheme": f"Scheme {i}"} for i in range(5)}
+
+
+class _Doc:
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Ref:
+    def __init__(self, docs, key):
+        self.docs = docs
+        self.key = key
+
+    def set(self, data):
+        self.docs[self.key] = data
+
+    def get(self):
+        return _Doc(self.docs.get(self.key))
+
+
+class _Db:
+    def __init__(self):
+        self.docs = {}
+
+    def collection(self, name):
+        db = self
+
+        class _Collection:
+            def document(self, doc_id):
+                return _Ref(db.docs, (name, doc_id))
+
+        return _Collection()
+
+
+class _FirebaseManager:
+    def __init__(self, db):
+        self.firestore_client = db
+
+
+def _ranked(ids):
+    scores = [1.0 - i / 8 for i in range(len(ids))]
+    results = SearchResults("help", ids, [SCHEMES[i] for i in ids], scores)
+    bm25 = [float(len(ids) - i) for i in range(len(ids))]
+    return results.with_scores(bm25_raw_scores=bm25, bm25_scores=[b / bm25[0] for b in bm25], combined_scores=scores)
+
+
+def _store(firebase_manager):
+    store = object.__new__(SessionSnapshotStore)
+    store._setup(firebase_manager)
+    return store
+
+
+@pytest.fixture
+def firebase_manager(mocker):
+    mocker.patch.object(
+        session_results,
+        "fetch_schemes_by_ids",
+        side_effect=lambda fm, ids: ([SCHEMES[i] for i in ids if i in SCHEMES], [i for i in ids if i not in SCHEMES]),
+    )
+    return _FirebaseManager(_Db())
+
+
+@pytest.fixture
+def handler(mocker, firebase_manager):
+    store = _store(firebase_manager)
+    mocker.patch("search.handler.get_session_snapshots", side_effect=lambda fm: store)
+    h = QueryHandler.__new__(QueryHandler)
+    h.search_model = mocker.MagicMock()
+    h.search_model.aggregate_and_rank_results.return_value = _ranked(["s0", "s1", "s2", "s3", "s4"])
+    QueryHandler.firebase_manager = firebase_manager
+    mocker.patch.object(h, "save_user_query")
+    h.store = store
+    return h
+
+
+def _page(handler, cursor=None):
+    return handler.predict_paginated(PaginatedSearchParams(query="help", limit=2, cursor=cursor))
+
+
+def test_later_pages_are_slices_of_the_first_ranking(handler):
+    first = _page(handler)
+    # A reindex reorders the ranking mid-session; the session keeps its order.
+    handler.search_model.aggregate_and_rank_results.return_value = _ranked(["s4", "s3", "s2", "s1", "s0"])
+    second = _page(handler, first["next_cursor"])
+    third = _page(handler, second["next_cursor"])
+
+    assert [r["scheme_id"] for r in first["data"] + second["data"] + third["data"]] == ["s0", "s1", "s2", "s3", "s4"]
+    assert handler.search_model.aggregate_and_rank_results.call_count == 1
+    assert decode_cursor(first["next_cursor"]) == {"session_id": first["sessionID"], "offset": 2}
+    assert second["sessionID"] == first["sessionID"] and second["total_count"] == 5
+    assert second["data"][0]["combined_scores"] == 0.75
+    assert third["has_more"] is False and third["next_cursor"] is None
+
+
+def test_snapshot_is_read_back_from_firestore_on_another_instance(handler, firebase_manager, mocker):
+    first = _page(handler)
+    other_instance = _store(firebase_manager)
+    mocker.patch("search.handler.get_session_snapshots", side_effect=lambda fm: other_instance)
+
+    second = _page(handler, first["next_cursor"])
+
+    assert [r["scheme_id"] for r in second["data"]] == ["s2", "s3"]
+    assert handler.search_model.aggregate_and_rank_results.call_count == 1
+
+
+def test_snapshot_is_stored_with_an_expire_at_timestamp(handler, firebase_manager):
+    before = datetime.now(timezone.utc)
+
+    first = _page(handler)
+
+    # Written inline, before the first page returns.
+    record = firebase_manager.firestore_client.docs[("searchSessions", first["sessionID"])]
+    ttl = timedelta(seconds=session_snapshots.SESSION_SNAPSHOT_TTL_SECONDS)
+    assert before + ttl <= record["expire_at"] <= datetime.now(timezone.utc) + ttl
+    assert "created_at" not in record
+
+
+@pytest.mark.parametrize(
+    "stale",
+    [
+        {"expire_at": datetime.now(timezone.utc) - timedelta(seconds=1)},
+        {"created_at": time.time() - session_snapshots.SESSION_SNAPSHOT_TTL_SECONDS - 1},
+    ],
+)
+def test_session_past_its_expiry_in_firestore_is_not_served(handler, firebase_manager, stale):
+    first = _page(handler)
+    docs = firebase_manager.firestore_client.docs
+    key = ("searchSessions", first["sessionID"])
+    record = {k: v for k, v in docs[key].items() if k != "expire_at"}
+    docs[key] = {**record, **stale}
+
+    assert _store(firebase_manager).load(first["sessionID"]) is None
+
+
+def test_every_page_has_the_same_record_fields(handler, firebase_manager, mocker):
+    first = _page(handler)
+    second = _page(handler, first["next_cursor"])
+    mocker.patch("search.handler.get_session_snapshots", side_effect=lambda fm: _store(firebase_manager))
+    third = _page(handler, second["next_cursor"])
+
+    assert set(second["data"][0]) == set(first["data"][0])
+    assert set(third["data"][0]) == set(first["data"][0])
+    assert second["data"][0]["vec_similarity_score"] == 0.75
+    assert third["data"][0]["bm25_raw_score"] == 1.0
+
+
+def test_expired_snapshot_ranks_again_at_the_offset(handler):
+    first = _page(handler)
+    handler.store.snapshots.clear()
+    handler.store.firebase_manager.firestore_client.docs.clear()
+
+    second = _page(handler, first["next_cursor"])
+
+    assert [r["scheme_id"] for r in second["data"]] == ["s2", "s3"]
+    assert handler.search_model.aggregate_and_rank_results.call_count == 2
+
+
+def test_cursors_from_before_snapshots_still_page(handler):
+    legacy_cursor = encode_cursor("s1", 0.875, "old-session")
+
+    page = _page(handler, legacy_cursor)
+
+    assert page["sessionID"] == "old-session"
+    assert [r["scheme_id"] for r in page["data"]] == ["s2", "s3"]
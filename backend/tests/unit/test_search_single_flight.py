@@ -0,0 +1,108 @@
+"""Unit tests for coalescing concurrent searches (functions/search/single_flight.py).
+
+Behaviour under test: concurrent cache misses for the same query wait on one
+in-flight retrieval and share its ranking (or its error), even when they ask
+for different thresholds, while different queries run independently. A waiter
+whose leader stalls past the timeout computes on its own. Retrieval is stubbed.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from search.cache import QueryResultCache
+from search.results import SearchResults
+from search.retriever import SearchModel
+from search.single_flight import SingleFlight
+
+
+@pytest.fixture
+def model(mocker):
+    mocker.patch.object(SearchModel, "initialise", return_value=None)
+    SearchModel._instance = None
+    SearchModel.initialised = True
+    m = SearchModel(mocker.MagicMock())
+    m.query_cache = QueryResultCache()
+    m.in_flight = SingleFlight()
+    mocker.patch.object(
+        m,
+        "rank",
+        side_effect=lambda query_text, results, fusion=None: results.with_scores(combined_scores=results.vec_scores),
+    )
+    return m
+
+
+def _blocking_search(model, mocker, release, error=None):
+    started = threading.Event()
+
+    def search(query_text, filters=None):
+        started.set()
+        release.wait(timeout=5)
+        if error is not None:
+            raise error
+        return SearchResults(query_text, ["a", "b"], [{"scheme_id": "a"}, {"scheme_id": "b"}], [0.9, 0.4])
+
+    return mocker.patch.object(model, "search", side_effect=search), started
+
+
+def _run_concurrently(calls, model, release, started):
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(model.aggregate_and_rank_results, *args) for args in calls]
+        started.wait(timeout=5)
+        # Let every caller reach the in-flight call before the leader finishes.
+        for _ in range(500):
+            if model.in_flight.stats()["coalesced"] >= len(calls) - 1:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_identical_queries_share_one_retrieval(model, mocker):
+    release = threading.Event()
+    search, started = _blocking_search(model, mocker, release)
+
+    calls = [("Elderly help?", 0.5), ("elderly help", 0.5), ("elderly help", 0.1)]
+
+    results = _run_concurrently(calls, model, release, started)
+
+    search.assert_called_once()
+    assert [r.ids for r in results] == [["a"], ["a"], ["a", "b"]]
+    assert model.in_flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 2, "timeouts": 0}
+
+
+def test_waiters_get_the_leaders_error(model, mocker):
+    release = threading.Event()
+    search, started = _blocking_search(model, mocker, release, error=RuntimeError("embedding API down"))
+
+    results = _run_concurrently([("help", 0.5), ("help", 0.5)], model, release, started)
+
+    search.assert_called_once()
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_different_queries_are_not_coalesced(model, mocker):
+    search = mocker.patch.object(
+        model, "search", side_effect=lambda q, filters=None: SearchResults(q, ["a"], [{"scheme_id": "a"}], [0.9])
+    )
+
+    model.aggregate_and_rank_results("childcare", 0.5)
+    model.aggregate_and_rank_results("eldercare", 0.5)
+
+    assert search.call_count == 2
+
+
+def test_waiter_computes_alone_after_the_timeout():
+    flight = SingleFlight(timeout_seconds=0.05)
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, "k", lambda: release.wait(timeout=5) and "leader")
+        while not len(flight):
+            threading.Event().wait(0.005)
+        assert flight.do("k", lambda: "waiter") == "waiter"
+        release.set()
+        assert leader.result() == "leader"
+
+    assert flight.stats()["timeouts"] == 1
@@ -0,0 +1,97 @@
+"""Unit tests for per-stage search timings (functions/search/timing.py).
+
+Behaviour under test: spans record nothing unless a collector is active,
+nested and repeated stages are recorded under their parent path with a count,
+the collector logs a summary on exit, and debug search requests return a
+`timings` block while ordinary requests do not.
+"""
+
+import pytest
+
+from search import timing
+from search.handler import QueryHandler
+from search.results import SearchResults
+from search.timing import collect_timings, current_timings, span, timed
+from search.types import PaginatedSearchParams, PredictParams
+
+
+@pytest.fixture(autouse=True)
+def timings_off(mocker):
+    mocker.patch.object(timing, "SEARCH_TIMINGS_ENABLED", False)
+    mocker.patch.object(timing, "SEARCH_TIMINGS_LANGFUSE", False)
+
+
+def test_spans_are_noops_without_a_collector():
+    with collect_timings("request") as timings:
+        with span("stage"):
+            assert current_timings() is None
+
+    assert timings is None
+
+
+def test_nested_and_repeated_stages_are_recorded_by_path():
+    @timed("fetch")
+    def fetch():
+        return "ok"
+
+    with collect_timings("request", force=True) as timings:
+        with span("search"):
+            with span("embed"):
+                pass
+            assert fetch() == "ok"
+            assert fetch() == "ok"
+
+    summary = timings.as_dict()
+    assert set(summary["stages"]) == {"search", "search/embed", "search/fetch"}
+    assert summary["stages"]["search/fetch"]["count"] == 2
+    assert summary["total_ms"] >= summary["stages"]["search"]["ms"]
+    assert current_timings() is None
+
+
+def test_nested_collector_reuses_the_outer_one(mocker):
+    report = mocker.patch.object(timing, "_report")
+
+    with collect_timings("outer", force=True) as outer:
+        with collect_timings("inner") as inner:
+            with span("stage"):
+                pass
+
+    assert inner is outer
+    assert "stage" in outer.as_dict()["stages"]
+    report.assert_called_once_with(outer)
+
+
+def test_stage_is_recorded_when_it_raises():
+    with collect_timings("request", force=True) as timings:
+        with pytest.raises(RuntimeError):
+            with span("boom"):
+                raise RuntimeError("failed")
+
+    assert timings.as_dict()["stages"]["boom"]["count"] == 1
+
+
+@pytest.fixture
+def handler(mocker):
+    """A QueryHandler with the search model and persistence stubbed."""
+    h = QueryHandler.__new__(QueryHandler)
+    h.search_model = mocker.MagicMock()
+    h.search_model.aggregate_and_rank_results.return_value = SearchResults(
+        "q", ["a"], [{"scheme_id": "a"}], [1.0]
+    )
+    QueryHandler.firebase_manager = mocker.MagicMock()
+    mocker.patch.object(h, "save_user_query")
+    mocker.patch.object(h, "save_llm_query", return_value="doc-1")
+    return h
+
+
+def test_debug_requests_return_timings(handler):
+    paginated = handler.predict_paginated(PaginatedSearchParams(query="q", debug=True))
+    agent = handler.predict_for_agent(PredictParams(query="q", debug=True))
+
+    assert {"retrieve_and_rank", "paginate", "save_user_query"} <= set(paginated["timings"]["stages"])
+    assert {"retrieve_and_rank", "save_llm_query"} <= set(agent["timings"]["stages"])
+
+
+def test_ordinary_requests_have_no_timings(handler):
+    assert "timings" not in handler.predict_paginated(PaginatedSearchParams(query="q"))
+    assert "timings" not in handler.predict_for_agent(PredictParams(query="q"))
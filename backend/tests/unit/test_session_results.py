@@ -0,0 +1,55 @@
+"""Unit tests for the compact session results format (functions/search/session_results.py).
+
+Behaviour under test: query records keep only ordered scheme IDs and scores,
+and reading them back re-hydrates full schemes from the scheme store in the
+stored order, dropping deleted schemes and leaving old-format records alone.
+"""
+
+from datetime import datetime, timezone
+
+from search import session_results
+from search.session_results import compact_results, hydrate_results
+
+
+RECORDS = [
+    {"scheme_id": "b", "scheme": "B", "combined_scores": 0.9, "query": "help"},
+    {"scheme_id": "a", "scheme": "A", "combined_scores": float("nan"), "query": "help"},
+]
+
+
+def test_compact_results_keeps_ids_and_scores_only():
+    compact = compact_results(RECORDS, index_generation=3)
+
+    assert compact == {
+        "results_format": "scheme_ids_v1",
+        "scheme_ids": ["b", "a"],
+        "scores": [0.9, None],
+        "index_generation": 3,
+    }
+
+
+def test_hydrate_restores_order_scores_and_query(mocker):
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    fetch = mocker.patch.object(
+        session_results,
+        "fetch_schemes_by_ids",
+        return_value=([{"scheme_id": "a", "scheme": "A", "created_at": created}, {"scheme_id": "b", "scheme": "B"}], ["gone"]),
+    )
+    record = {"query_text": "help", "session_id": "s1", **compact_results(RECORDS + [{"scheme_id": "gone"}])}
+
+    hydrated = hydrate_results("fm", record)
+
+    fetch.assert_called_once_with("fm", ["b", "a", "gone"])
+    assert [s["scheme_id"] for s in hydrated["schemes_response"]] == ["b", "a"]
+    assert hydrated["schemes_response"][0] == {"scheme_id": "b", "scheme": "B", "combined_scores": 0.9, "query": "help"}
+    assert hydrated["schemes_response"][1]["created_at"] == int(created.timestamp())
+    assert "combined_scores" not in hydrated["schemes_response"][1]
+    assert "scheme_ids" not in hydrated and hydrated["session_id"] == "s1"
+
+
+def test_old_format_records_pass_through(mocker):
+    fetch = mocker.patch.object(session_results, "fetch_schemes_by_ids")
+    record = {"query_text": "help", "schemes_response": [{"scheme_id": "a"}]}
+
+    assert hydrate_results("fm", record) is record
+    fetch.assert_not_called()
@@ -0,0 +1,82 @@
+"""Unit tests for the in-process exact vector index (functions/search/vector_index.py).
+
+Behaviour under test: the index returns the same `(ids, distances)` shape as
+Firestore's COSINE find_nearest, nearest first, so it can stand in for it.
+"""
+
+import math
+
+import pytest
+
+from search.vector_index import VectorIndex
+
+
+def _doc(doc_id, embedding):
+    class _Doc:
+        id = doc_id
+
+        def to_dict(self):
+            return {"embedding": embedding} if embedding is not None else {}
+
+    return _Doc()
+
+
+def test_results_are_ordered_nearest_first():
+    index = VectorIndex(["a", "b", "c"], [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    ids, distances = index.search([1.0, 0.2], limit=3)
+
+    assert ids == ["a", "c", "b"]
+    assert distances == sorted(distances)
+
+
+def test_distances_match_cosine_distance():
+    """Distance is 1 - cosine similarity, independent of vector magnitude."""
+    index = VectorIndex(["same", "orthogonal", "opposite"], [[2.0, 0.0], [0.0, 5.0], [-1.0, 0.0]])
+
+    ids, distances = index.search([3.0, 0.0], limit=3)
+    by_id = dict(zip(ids, distances))
+
+    assert math.isclose(by_id["same"], 0.0, abs_tol=1e-6)
+    assert math.isclose(by_id["orthogonal"], 1.0, abs_tol=1e-6)
+    assert math.isclose(by_id["opposite"], 2.0, abs_tol=1e-6)
+
+
+def test_limit_truncates_to_the_nearest():
+    index = VectorIndex([f"s{i}" for i in range(10)], [[1.0, i / 10] for i in range(10)])
+
+    ids, distances = index.search([1.0, 0.0], limit=3)
+
+    assert ids == ["s0", "s1", "s2"]
+    assert len(distances) == 3
+
+
+def test_limit_above_corpus_returns_everything():
+    index = VectorIndex(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+
+    ids, _ = index.search([1.0, 0.0], limit=1000)
+
+    assert ids == ["a", "b"]
+
+
+def test_dimension_mismatch_is_rejected():
+    index = VectorIndex(["a"], [[1.0, 0.0]])
+
+    with pytest.raises(ValueError):
+        index.search([1.0, 0.0, 0.0], limit=1)
+
+
+def test_from_documents_skips_docs_without_embeddings():
+    docs = [_doc("a", [1.0, 0.0]), _doc("missing", None), _doc("b", [0.0, 1.0])]
+
+    index = VectorIndex.from_documents(docs)
+
+    assert index.ids == ["a", "b"]
+    assert index.dimension == 2
+
+
+def test_empty_collection_builds_empty_index():
+    index = VectorIndex.from_documents([])
+
+    assert len(index) == 0
+    assert index.search([1.0, 0.0], limit=5) == ([], [])